@@ -0,0 +1,220 @@
+"""
+Cost-based admission control for the companies endpoint.
+
+Each uncached query gets a cost estimate from its compiled plan. Queries over
+COMPANY_QUERY_COST_BUDGET_MS are rejected (429) or, per
+COMPANY_QUERY_OVER_BUDGET, downgraded to a forced page that fits the budget.
+A downgrade only caps the output: when search, filter and sort alone are over
+budget the query is rejected. Per client, the number of queries and the
+estimated cost in flight are capped. Every decision is
+written to the ``company.admission`` logger (admits at DEBUG) for tuning.
+"""
+
+import json
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .instrumentation import increment
+from .plan import SERIALIZE_ROW_COST_US, QueryPlan, compile_query
+from .query import CompanyQuery
+from .queryset import SearchQuerySet
+
+logger = logging.getLogger('company.admission')
+
+ADMIT = 'admit'
+DOWNGRADE = 'downgrade'
+REJECT = 'reject'
+
+
+@dataclass
+class Decision:
+    action: str
+    cost_ms: float
+    reason: str = ''
+    page_size: int | None = None  # forced page size when downgraded
+
+
+class AdmissionController:
+    """Tracks the queries and estimated cost each client has in flight."""
+
+    def __init__(self):
+        self._queries: Counter[str] = Counter()
+        self._cost_ms: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def in_flight(self, client: str) -> tuple[int, float]:
+        with self._lock:
+            return self._queries[client], self._cost_ms[client]
+
+    def decide(
+        self,
+        client: str,
+        plan: QueryPlan | list[QueryPlan],
+        cost: dict[str, float],
+        pageable: bool = True,
+    ) -> Decision:
+        """
+        Decides on a query with the estimated ``cost`` (``QueryPlan.estimated_cost()``)
+        and, unless rejected, reserves it for ``client``. Only ``pageable``
+        responses can be downgraded to a forced page. A batch passes the plans
+        of all its queries with their summed cost.
+        """
+        budget = settings.COMPANY_QUERY_COST_BUDGET_MS
+        cost_ms = cost['total']
+        decision = Decision(ADMIT, cost_ms)
+        if budget is not None and cost_ms > budget:
+            decision = Decision(REJECT, cost_ms, 'over budget')
+            page_size = _fitting_page_size(budget, cost) if pageable else 0
+            if page_size and settings.COMPANY_QUERY_OVER_BUDGET == DOWNGRADE:
+                serialize_ms = page_size * SERIALIZE_ROW_COST_US / 1000
+                capped_ms = round(cost_ms - cost.get('serialize', 0) + serialize_ms, 3)
+                decision = Decision(DOWNGRADE, capped_ms, 'over budget', page_size)
+        with self._lock:
+            queries, in_flight = self._queries[client], self._cost_ms[client]
+            if decision.action != REJECT and queries:
+                if queries >= settings.COMPANY_CLIENT_MAX_CONCURRENT:
+                    decision = Decision(REJECT, cost_ms, 'too many concurrent queries')
+                elif in_flight + decision.cost_ms > settings.COMPANY_CLIENT_MAX_INFLIGHT_COST_MS:
+                    decision = Decision(REJECT, cost_ms, 'client cost in flight')
+            if decision.action != REJECT:
+                self._queries[client] += 1
+                self._cost_ms[client] += decision.cost_ms
+        _log(client, plan, cost_ms, decision, queries, in_flight)
+        return decision
+
+    def release(self, client: str, decision: Decision) -> None:
+        with self._lock:
+            self._queries[client] -= 1
+            self._cost_ms[client] -= decision.cost_ms
+            if self._queries[client] <= 0:
+                del self._queries[client], self._cost_ms[client]
+
+    @contextmanager
+    def admitted(
+        self,
+        client: str,
+        plan: QueryPlan | list[QueryPlan],
+        cost: dict[str, float],
+        pageable: bool = True,
+    ):
+        """``decide()``, releasing the reservation when the block exits."""
+        decision = self.decide(client, plan, cost, pageable)
+        if decision.action == REJECT:
+            yield decision
+            return
+        try:
+            yield decision
+        finally:
+            self.release(client, decision)
+
+
+controller = AdmissionController()
+
+
+def _fitting_page_size(budget: float, cost: dict[str, float]) -> int:
+    """Rows whose serialization fits the budget left after search, filter and sort (0: none)."""
+    left_ms = budget - (cost['total'] - cost.get('serialize', 0))
+    return max(0, min(settings.COMPANY_MAX_PAGE_SIZE, int(left_ms * 1000 / SERIALIZE_ROW_COST_US)))
+
+
+def admission(
+    client: str,
+    query: CompanyQuery,
+    companies: SearchQuerySet,
+    page_size: int | None = None,
+    pageable: bool = False,
+):
+    """
+    Admission context for ``query`` over ``companies`` on behalf of ``client``,
+    shared by every endpoint that runs queries: estimates the cost from the
+    compiled plan (serializing ``page_size`` rows, every match when None) and
+    yields the controller's ``Decision``, releasing its reservation on exit.
+    """
+    plan, cost = _estimate(query, companies, page_size)
+    return controller.admitted(client, plan, cost, pageable)
+
+
+def batch_admission(client: str, queries: list[CompanyQuery], companies: SearchQuerySet):
+    """
+    Admission context for a batch of ``queries`` run together over
+    ``companies``: one decision for the summed cost of its distinct queries
+    (every match serialized), so a batch gets the budget of a single query.
+    """
+    distinct = {(q.search, q.filter, q.sort): q for q in queries}.values()
+    estimates = [_estimate(query, companies, None) for query in distinct]
+    cost = Counter()
+    for _, query_cost in estimates:
+        cost.update(query_cost)
+    plans = [plan for plan, _ in estimates]
+    return controller.admitted(client, plans, dict(cost), pageable=False)
+
+
+def _estimate(
+    query: CompanyQuery,
+    companies: SearchQuerySet,
+    page_size: int | None,
+) -> tuple[QueryPlan, dict[str, float]]:
+    store = companies.store
+    listeners = store.listeners if store is not None else {}
+    plan = compile_query(
+        query, len(companies), listeners.get('value_counts'), listeners.get('indexes'),
+    )
+    sorts = listeners.get('sorts')
+    cost = plan.estimated_cost(
+        page_size=page_size,
+        sort_covered=sorts is not None and sorts.covers(plan.sort),
+    )
+    return plan, cost
+
+
+def over_budget_detail(decision: Decision) -> str:
+    return f'Estimated query cost of {decision.cost_ms} ms is over the limit.'
+
+
+def client_ident(request, user=None) -> str:
+    """
+    The user for authenticated requests, otherwise the client address as DRF
+    throttles see it. Async views pass ``user`` (from ``request.auser()``).
+    """
+    user = request.user if user is None else user
+    if user and user.is_authenticated:
+        return f'user:{user.pk}'
+    return BaseThrottle().get_ident(request)
+
+
+def _log(
+    client: str,
+    plan: QueryPlan | list[QueryPlan],
+    cost_ms: float,
+    decision: Decision,
+    queries: int,
+    in_flight: float,
+) -> None:
+    if decision.action != ADMIT:
+        increment(f'admission_{decision.action}s')
+    level = logging.DEBUG if decision.action == ADMIT else logging.WARNING
+    if not logger.isEnabledFor(level):
+        return
+    plans = plan if isinstance(plan, list) else [plan]
+    logger.log(
+        level,
+        json.dumps(
+            {
+                'client': client,
+                'normalized': ' ; '.join(p.normalized() for p in plans),
+                'total_rows': plans[0].total_rows,
+                'cost_ms': cost_ms,
+                'decision': decision.action,
+                'reason': decision.reason,
+                'page_size': decision.page_size,
+                'client_queries': queries,
+                'client_cost_ms': round(in_flight, 3),
+            }
+        ),
+    )
@@ -0,0 +1,60 @@
+from collections import Counter
+
+from .rows import Row
+from .store import Delta
+from .utils.common.fields import get_nested_field_generic
+
+
+class ValueCounts:
+    """
+    Precomputed value frequencies for low-cardinality fields, maintained from
+    store deltas. Used to estimate how many companies an equality predicate
+    selects without scanning.
+    """
+
+    def __init__(self, fields: list[str]):
+        self.fields = list(fields)
+        self.total = 0
+        self._counts: dict[str, Counter] = {f: Counter() for f in self.fields}
+
+    def count(self, field: str, value) -> int | None:
+        """Companies whose ``field`` equals ``value``, or None if not tracked."""
+        if field not in self._counts:
+            return None
+        return self._counts[field][value]
+
+    def values(self, field: str) -> dict:
+        return dict(self._counts.get(field, {}))
+
+    def rebuild(self, rows: list[Row]) -> None:
+        self.total = 0
+        self._counts = {f: Counter() for f in self.fields}
+        for row in rows:
+            self._add(row, 1)
+
+    def apply(self, delta: Delta) -> None:
+        for row in delta.deleted:
+            self._add(row, -1)
+        for old, new in delta.updated:
+            self._add(old, -1)
+            self._add(new, 1)
+        for row in delta.inserted:
+            self._add(row, 1)
+
+    def matches(self, rows: list[Row]) -> bool:
+        fresh = ValueCounts(self.fields)
+        fresh.rebuild(rows)
+        return fresh == self
+
+    def _add(self, row: Row, sign: int) -> None:
+        self.total += sign
+        for field, counter in self._counts.items():
+            value = get_nested_field_generic(row, field)
+            counter[value] += sign
+            if counter[value] <= 0:
+                del counter[value]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ValueCounts):
+            return NotImplemented
+        return self.total == other.total and self._counts == other._counts
@@ -1,11 +1,72 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
 from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from rest_framework.exceptions import APIException, Throttled, ValidationError
 from rest_framework.generics import GenericAPIView
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
-from .models import Company
+from . import query_log
+from .admission import (
+    REJECT,
+    Decision,
+    admission,
+    batch_admission,
+    client_ident,
+    over_budget_detail,
+)
+from .batch import BatchExecutor
+from .chunking import ChunkScheduler, max_unstreamed_rows
+from .dataset import get_companies, get_index, get_value_counts
+from .deadline import QueryTimeout, check_deadline, deadline, request_deadline
+from .instrumentation import increment, span
+from .plan import compile_query, explain
+from .projection import parse_fields, plan_loading
+from .query import CompanyQuery, any_match, count_matches, run_query
 from .queryset import SearchQuerySet
-from .serializers import CompanySerializer
-from .utils.common.fields import get_cache_key_from_request
+from .renderers import COLUMNAR_RENDERERS, to_columns
+from .serializers import BatchQuerySerializer, CompanySerializer
+from .slow_queries import log_if_slow
+from .utils.common.fields import get_cache_key, get_cache_key_from_request
+
+
+class CompanyPagination(PageNumberPagination):
+    """Only paginates when ``page`` or ``page_size`` is given, so plain requests keep a list."""
+
+    page_size = settings.COMPANY_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.COMPANY_MAX_PAGE_SIZE
+
+    # Set by admission control to downgrade a query to (smaller) forced pages.
+    page_size_cap = None
+
+    def get_page_size(self, request):
+        params = request.query_params
+        size = None
+        if self.page_query_param in params or self.page_size_query_param in params:
+            size = super().get_page_size(request)
+        if self.page_size_cap is not None:
+            size = self.page_size_cap if size is None else min(size, self.page_size_cap)
+        return size
+
+    def get_next_link(self):
+        return self._with_page_size(super().get_next_link())
+
+    def get_previous_link(self):
+        return self._with_page_size(super().get_previous_link())
+
+    def _with_page_size(self, link: str | None) -> str | None:
+        """Keeps a forced page size in the links, so later pages line up."""
+        if link is None or self.page_size_cap is None:
+            return link
+        return replace_query_param(link, self.page_size_query_param, self.page.paginator.per_page)
 
 
 class CompanyApi(GenericAPIView):
@@ -13,41 +74,358 @@ class CompanyApi(GenericAPIView):
     GET /api/v1/companies?sort=industry,-founded_year
 
     Returns sorted list of companies based on one or more fields.
-    Supports descending sort with a '-' prefix.
+    Supports descending sort with a '-' prefix. With ``page``/``page_size`` the
+    list is paginated as {"count", "next", "previous", "results"}.
+
+    Queries past COMPANY_QUERY_TIMEOUT_MS (or a lower ``timeout_ms``) stop
+    with 503, or return what matched so far with ``allow_partial=1``.
+
+    ``fields=name,financials`` limits each company to those fields.
+    Machine clients can ask for a columnar layout instead of nested JSON (see
+    ``company.renderers``) via ``Accept`` or ``?format=columnar|msgpack``.
     """
 
     serializer_class = CompanySerializer
+    pagination_class = CompanyPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, *COLUMNAR_RENDERERS]
 
     def get_queryset(self):
         pass
 
     def get(self, request, *args, **kwargs):
+        if 'HTTP_X_COMPANY_PREWARM' not in request.META:
+            query_log.record(request.query_params)
+        if request.query_params.get('explain') in ('1', 'true'):
+            return self.explain(request)
+        if request.query_params.get('count') in ('1', 'true'):
+            return self.count(request)
+        if request.query_params.get('exists') in ('1', 'true'):
+            return self.count(request, exists=True)
+
+        columnar = getattr(request.accepted_renderer, 'columnar', False)
         cache_key = get_cache_key_from_request(request)
-        cache_data = cache.get(cache_key)
+        if columnar:
+            # The same query params cache nested JSON (which count/exists read); keep the
+            # layouts apart with a path no request can have.
+            params = dict(request.query_params.items(), format=request.accepted_renderer.format)
+            cache_key = get_cache_key(f'{request.path}#columnar', params)
+        with span('cache'):
+            cache_data = cache.get(cache_key)
         if cache_data:
-            return Response(cache_data)
-
-        raw_search = self.request.query_params.get('search')
-        sort_param = self.request.query_params.get('sort')
-        filter_param = self.request.query_params.get('filter')
-        companies = Company.objects.all_with_related()
-
-        if raw_search:
-            # companies = companies.search(raw_search)
-            companies = companies.search_chunked(raw_search)
-            companies = SearchQuerySet(
-                [item for chunk in companies for item in chunk],
-            )
-        if filter_param:
-            # companies = companies.filter(filter_param)
-            companies = companies.filter_chunked(filter_param)
-            companies = SearchQuerySet(
-                [item for chunk in companies for item in chunk],
-            )
-        if sort_param:
-            companies = companies.sort(sort_param)
-
-        serializer = self.get_serializer(companies, many=True)
-
-        cache.set(cache_key, serializer.data, timeout=600)  # Cache for 10 minutes
-        return Response(serializer.data)
+            increment('cache_hits')
+            return Response(cache_data, headers={'X-Cache': 'HIT'})
+        increment('cache_misses')
+
+        start = time.perf_counter()
+        expires_at = _expires_at(request.query_params)
+        fields = _fields(request.query_params)
+        query = CompanyQuery.from_params(self.request.query_params)
+        errors = query.syntax_errors()
+        if errors:
+            raise ValidationError({k: [v] for k, v in errors.items()})
+        with span('load'):
+            companies = get_companies()
+        total_rows = len(companies)
+        headers = {'X-Cache': 'MISS'}
+        stages = []
+        stream = None
+        with ExitStack() as admitted:
+            decision = admitted.enter_context(self.admission(request, query, companies))
+            _admit(decision)
+            if decision.page_size is not None:
+                self.paginator.page_size_cap = decision.page_size
+                headers['X-Query-Downgraded'] = f'paginated to {decision.page_size} rows per page'
+            try:
+                with deadline(expires_at):
+                    companies = run_query(
+                        companies,
+                        query,
+                        observer=lambda stage, rows, seconds: stages.append(
+                            {'stage': stage, 'rows': rows, 'time_ms': round(seconds * 1000, 3)},
+                        ),
+                    )
+            except QueryTimeout as exc:
+                companies = _partial(request, exc, headers)
+
+            try:
+                with deadline(expires_at):  # paging a sort index walk is part of the sort
+                    page = self.paginate_queryset(companies)
+            except QueryTimeout as exc:
+                raise QueryTimedOut() from exc
+            scheduler = None
+            if page is None and request.accepted_renderer.format == 'json':
+                scheduler = _stream_scheduler(companies)
+            with span('serialize'):
+                rows = companies if page is None else page
+                if scheduler is not None:
+                    data = None  # serialized chunk by chunk while the response streams
+                    stream = _JsonStream(request, companies, fields, scheduler, expires_at, headers)
+                    # The stream holds the admission until Django closes the response.
+                    stream.reservation = admitted.pop_all()
+                elif columnar:
+                    data = to_columns(rows, fields)
+                else:
+                    data = self.get_serializer(rows, many=True, fields=fields).data
+                if page is not None:
+                    data = self.get_paginated_response(data).data
+
+        cacheable = 'X-Query-Downgraded' not in headers and 'X-Partial-Result' not in headers
+        if data is not None and cacheable:
+            cache.set(cache_key, data, timeout=600)  # Cache for 10 minutes
+        log_if_slow(
+            query,
+            time.perf_counter() - start,
+            total_rows,
+            len(companies),
+            stages,
+            get_value_counts(),
+            get_index(),
+        )
+        if stream is not None:
+            headers['X-Streamed'] = f'{stream.rows} rows'
+            return StreamingHttpResponse(stream, content_type='application/json', headers=headers)
+        return Response(data, headers=headers)
+
+    def admission(self, request, query: CompanyQuery, companies: SearchQuerySet, page_size=None):
+        """
+        Admission context for ``query`` over ``companies``: estimates its cost
+        from the compiled plan and yields the controller's ``Decision``.
+        Serialization is priced for the rows sent in one piece: one page, or
+        for an un-paginated JSON response the rows below the streaming
+        threshold (the rest streams chunk by chunk under the time budget).
+        """
+        pageable = page_size is None
+        if pageable:
+            page_size = self.paginator.get_page_size(request)
+            if page_size is None and request.accepted_renderer.format == 'json':
+                page_size = max_unstreamed_rows(companies)
+        return admission(client_ident(request), query, companies, page_size, pageable)
+
+    def count(self, request, exists: bool = False):
+        """
+        GET /api/v1/companies?filter=...&count=1   -> {"count": 12}
+        GET /api/v1/companies?filter=...&exists=1  -> {"exists": true}
+
+        Skips sorting and serialization. A cached response for the same query
+        answers directly; otherwise counts use the hash indexes where they
+        apply and ``exists`` stops at the first match.
+        """
+        params = {k: v for k, v in request.query_params.items() if k not in ('count', 'exists')}
+        expires_at = _expires_at(params)
+        query = CompanyQuery.from_params(params)
+        errors = query.syntax_errors()
+        if errors:
+            raise ValidationError({k: [v] for k, v in errors.items()})
+
+        cached = cache.get(get_cache_key(request.path, params))
+        if cached is not None:
+            increment('cache_hits')
+            total = cached['count'] if isinstance(cached, dict) else len(cached)
+            data = {'exists': total > 0} if exists else {'count': total}
+            return Response(data, headers={'X-Cache': 'HIT'})
+        increment('cache_misses')
+
+        with span('load'):
+            companies = get_companies()
+        headers = {'X-Cache': 'MISS'}
+        query = CompanyQuery(search=query.search, filter=query.filter)
+        with self.admission(request, query, companies, page_size=0) as decision:
+            _admit(decision)
+            try:
+                with deadline(expires_at):
+                    if exists:
+                        data = {'exists': any_match(companies, query)}
+                    else:
+                        data = {'count': count_matches(companies, query)}
+            except QueryTimeout as exc:
+                raise QueryTimedOut() from exc
+        return Response(data, headers=headers)
+
+    def explain(self, request):
+        """
+        GET /api/v1/companies?filter=...&explain=1
+
+        Returns the compiled plan with estimated vs actual rows and time per
+        stage instead of the companies. The query runs, so it is admitted and
+        timed out like one (without serialization).
+        """
+        params = {k: v for k, v in request.query_params.items() if k != 'explain'}
+        expires_at = _expires_at(params)
+        cached = cache.get(get_cache_key(request.path, params))
+        query = CompanyQuery.from_params(params)
+        errors = query.syntax_errors()
+        if errors:
+            raise ValidationError({k: [v] for k, v in errors.items()})
+
+        start = time.perf_counter()
+        companies = get_companies()
+        load_seconds = time.perf_counter() - start
+
+        with self.admission(request, query, companies, page_size=0) as decision:
+            _admit(decision)
+            plan = compile_query(query, len(companies), get_value_counts(), get_index())
+            try:
+                with deadline(expires_at):
+                    data = explain(plan, companies, load_seconds, 'hit' if cached else 'miss')
+            except QueryTimeout as exc:
+                raise QueryTimedOut() from exc
+        data['load_plan'] = plan_loading(query, _fields(params)).to_dict()
+        return Response(data)
+
+
+class QueryTimedOut(APIException):
+    status_code = 503
+    default_detail = 'The query did not finish within its time budget; retry with allow_partial=1.'
+    default_code = 'query_timeout'
+
+
+def _expires_at(params) -> float | None:
+    try:
+        return request_deadline(params)
+    except ValueError as exc:
+        raise ValidationError({'timeout_ms': [str(exc)]}) from exc
+
+
+def _fields(params) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(params.get('fields'))
+    except ValueError as exc:
+        raise ValidationError({'fields': [str(exc)]}) from exc
+
+
+def _stream_scheduler(companies: SearchQuerySet) -> ChunkScheduler | None:
+    """A scheduler for streaming ``companies`` when they are too large to serialize at once."""
+    scheduler = ChunkScheduler.for_rows(companies)
+    if len(companies) * scheduler.row_bytes <= settings.COMPANY_RESPONSE_MEMORY_BUDGET_BYTES:
+        return None
+    return scheduler
+
+
+class _JsonStream:
+    """
+    A JSON array of ``companies``, serialized and rendered a chunk at a time
+    under the request's deadline.
+
+    The first chunk is rendered up front, so errors and a projected timeout
+    surface before the 200 is sent. If the rest would pass the deadline at the
+    measured per-row cost, the request gets 503, or with allow_partial=1 the
+    leading rows that fit and X-Partial-Result. A deadline passed mid-stream
+    aborts the response instead of closing the array. Django calls ``close()``
+    when the response is done or dropped, which releases ``reservation``.
+    """
+
+    def __init__(self, request, companies, fields, scheduler: ChunkScheduler, expires_at, headers):
+        self.fields = fields
+        self.scheduler = scheduler
+        self.expires_at = expires_at
+        self.reservation = ExitStack()
+        self._renderer = JSONRenderer()
+        size = scheduler.next_size()
+        try:
+            with deadline(expires_at):
+                first = self._render(companies[:size])
+        except QueryTimeout as exc:
+            raise QueryTimedOut() from exc
+        if expires_at is not None and len(companies) > size:
+            left_ms = (expires_at - time.monotonic()) * 1000
+            if (len(companies) - size) * scheduler.row_ms > left_ms:
+                fit = size + max(0, int(left_ms / scheduler.row_ms)) if scheduler.row_ms else size
+                exc = QueryTimeout('serialize', partial=companies[:fit], scanned=fit)
+                companies = _partial(request, exc, headers)
+        self.rows = len(companies)
+        self._parts = self._stream(first, companies, size)
+
+    def __iter__(self):
+        return self._parts
+
+    def close(self) -> None:
+        self._parts.close()
+        self.reservation.close()
+
+    def _stream(self, first: bytes, companies, offset: int):
+        yield b'[' + first
+        separator = b',' if first else b''
+        for start, chunk in self.scheduler.chunks(companies[offset:]):
+            with deadline(self.expires_at):
+                check_deadline('serialize', offset + start)
+                body = self._render(chunk)
+            if body:
+                yield separator + body
+                separator = b','
+        yield b']'
+
+    def _render(self, chunk) -> bytes:
+        start = time.perf_counter()
+        body = self._renderer.render(CompanySerializer(chunk, many=True, fields=self.fields).data)
+        self.scheduler.record(len(chunk), time.perf_counter() - start)
+        return body[1:-1]
+
+
+def _partial(request, exc: QueryTimeout, headers: dict) -> SearchQuerySet:
+    """The rows ``exc`` carries when the client passed allow_partial=1; otherwise 503."""
+    if request.query_params.get('allow_partial') not in ('1', 'true') or exc.partial is None:
+        raise QueryTimedOut() from exc
+    increment('partial_results')
+    headers['X-Partial-Result'] = exc.describe()
+    return SearchQuerySet(exc.partial)
+
+
+def _admit(decision: Decision) -> None:
+    """Raises 429 for a rejected query."""
+    if decision.action == REJECT:
+        raise Throttled(detail=over_budget_detail(decision))
+
+
+class CompanyBatchApi(GenericAPIView):
+    """
+    POST /api/v1/companies/batch/
+    {"queries": [{"filter": "industry=Tech", "sort": "-founded_year"}, {"search": "country:Ger"}]}
+
+    Runs several search/filter/sort specs in one request and returns
+    {"results": [...]} with one company list per spec, in order. Each spec
+    shares the response cache with the equivalent GET /companies/ call; misses
+    are computed together over a single dataset load. The batch runs under one
+    deadline (COMPANY_QUERY_TIMEOUT_MS, or a lower ``?timeout_ms``) and stops
+    with 503 when it passes.
+    """
+
+    serializer_class = BatchQuerySerializer
+
+    def get_queryset(self):
+        pass
+
+    def post(self, request, *args, **kwargs):
+        batch = self.get_serializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        specs = [
+            {k: v for k, v in spec.items() if v}
+            for spec in batch.validated_data['queries']
+        ]
+
+        expires_at = _expires_at(request.query_params)
+        path = reverse('company')
+        cache_keys = [get_cache_key(path, spec) for spec in specs]
+        cached = cache.get_many(cache_keys)
+
+        queries = {
+            cache_key: CompanyQuery.from_params(spec)
+            for spec, cache_key in zip(specs, cache_keys)
+            if not cached.get(cache_key)
+        }
+        if queries:
+            companies = get_companies()
+            executor = BatchExecutor(companies)
+            client = client_ident(request)
+            # Admitted once, for all uncached specs: the batch gets one query's budget.
+            with batch_admission(client, list(queries.values()), companies) as decision:
+                _admit(decision)
+                try:
+                    with deadline(expires_at):
+                        for cache_key, query in queries.items():
+                            data = CompanySerializer(executor.run(query), many=True).data
+                            cache.set(cache_key, data, timeout=600)  # Cache for 10 minutes
+                            cached[cache_key] = data
+                except QueryTimeout as exc:
+                    raise QueryTimedOut() from exc
+
+        return Response({'results': [cached[cache_key] for cache_key in cache_keys]})
@@ -0,0 +1,93 @@
+from typing import Any
+
+from .deadline import check_deadline
+from .query import CompanyQuery
+from .queryset import SearchQuerySet
+from .utils.common.parsing import OPS, match, parse_query
+from .utils.filtering import parse_filter
+
+
+class BatchExecutor:
+    """
+    Runs many ``CompanyQuery`` objects over one loaded dataset, sharing work
+    between them:
+
+    - each distinct search/filter string is parsed once;
+    - each distinct condition is evaluated once per company, as a boolean
+      mask reused by every query containing it;
+    - identical search+filter (and sort) combinations are computed once.
+
+    Results are the same as ``run_query()`` for each query on its own. Under a
+    ``deadline()``, each query and each new condition mask checks it first.
+    """
+
+    def __init__(self, companies: SearchQuerySet):
+        self._rows = companies.to_list()
+        self._index = companies.index
+        self._search_plans: dict[str, list[dict]] = {}
+        self._filter_plans: dict[str, list] = {}
+        self._masks: dict[tuple, list[bool]] = {}
+        self._matches: dict[tuple, list[Any]] = {}
+        self._sorted: dict[tuple, SearchQuerySet] = {}
+
+    def run(self, query: CompanyQuery) -> SearchQuerySet:
+        key = (query.search, query.filter, query.sort)
+        if key not in self._sorted:
+            check_deadline('batch')
+            companies = SearchQuerySet(self._match(query))
+            self._sorted[key] = companies.sort(query.sort) if query.sort else companies
+        return self._sorted[key]
+
+    def _match(self, query: CompanyQuery) -> list[Any]:
+        key = (query.search, query.filter)
+        if key not in self._matches:
+            masks = []
+            if query.search:
+                masks.append(self._search_mask(query.search))
+            if query.filter:
+                masks.append(self._filter_mask(query.filter))
+            rows = self._rows
+            if masks:
+                mask = masks[0] if len(masks) == 1 else [a and b for a, b in zip(*masks)]
+                rows = [row for row, keep in zip(rows, mask) if keep]
+            self._matches[key] = rows
+        return self._matches[key]
+
+    def _search_mask(self, raw_query: str) -> list[bool]:
+        if raw_query not in self._search_plans:
+            self._search_plans[raw_query] = parse_query(raw_query)
+        conditions = self._search_plans[raw_query]
+        if not conditions:
+            return [True] * len(self._rows)
+        result = self._condition_mask(conditions[0])
+        for cond in conditions[1:]:
+            result = [a and b for a, b in zip(result, self._condition_mask(cond))]
+        return result
+
+    def _filter_mask(self, raw_query: str) -> list[bool]:
+        """Mirrors ``evaluate_filter``: left-to-right AND/OR over condition masks."""
+        if raw_query not in self._filter_plans:
+            self._filter_plans[raw_query] = parse_filter(raw_query)
+        result = None
+        op = None
+        for token in self._filter_plans[raw_query]:
+            if isinstance(token, dict):
+                mask = self._condition_mask(token)
+                if result is None:
+                    result = mask
+                elif op in ('AND', 'OR'):
+                    result = [OPS[op](a, b) for a, b in zip(result, mask)]
+            elif token in OPS:
+                op = token
+        return result if result is not None else [False] * len(self._rows)
+
+    def _condition_mask(self, cond: dict) -> list[bool]:
+        key = (cond['field'], cond['op'], type(cond['value']), cond['value'])
+        if key not in self._masks:
+            check_deadline('batch')
+            ids = self._index.lookup(cond) if self._index is not None else None
+            if ids is not None:
+                self._masks[key] = [row.id in ids for row in self._rows]
+            else:
+                self._masks[key] = [match(row, cond) for row in self._rows]
+        return self._masks[key]
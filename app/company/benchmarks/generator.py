@@ -0,0 +1,79 @@
+import random
+from collections.abc import Iterator
+
+from ..rows import DETAILS_COLUMNS, FINANCIAL_COLUMNS, CompanyRow, DetailsRow, FinancialRow
+
+COUNTRIES = ['USA', 'Germany', 'UK', 'France', 'Japan', 'India', 'Brazil', 'Canada', 'Spain', 'Italy']
+INDUSTRIES = ['Tech', 'Finance', 'Healthcare', 'Retail', 'Energy', 'Manufacturing', 'Media', 'Transport']
+SIZES = ['Small', 'Medium', 'Large']
+COMPANY_TYPES = ['Public', 'Private', 'Non-profit']
+CITIES = ['New York', 'Berlin', 'London', 'Paris', 'Tokyo', 'Mumbai', 'Sao Paulo', 'Toronto']
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'Dave', 'Erin', 'Frank', 'Grace', 'Heidi', 'Ivan', 'Judy']
+SYLLABLES = ['al', 'be', 'ga', 'del', 'ta', 'ze', 'ko', 'ri', 'no', 'vex', 'lum', 'tra', 'quin', 'sol']
+SUFFIXES = ['Corp', 'Group', 'Inc', 'Labs', 'Holdings', 'Systems', 'Partners']
+# Latest founding and financial year.
+LAST_YEAR = 2023
+
+
+def generate_companies(
+    count: int,
+    financials_per_company: int = 5,
+    seed: int = 0,
+) -> Iterator[tuple[dict, dict, list[dict]]]:
+    """
+    Yields ``(company, details, financials)`` field dicts for ``count`` synthetic
+    companies. The same ``seed`` always produces the same dataset.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        stem = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        founded_year = rng.randint(1900, LAST_YEAR)
+        company = {
+            'name': f'{stem} {rng.choice(SUFFIXES)}',
+            'country': rng.choice(COUNTRIES),
+            'industry': rng.choice(INDUSTRIES),
+            'founded_year': founded_year,
+        }
+        details = {
+            'company_type': rng.choice(COMPANY_TYPES),
+            'size': rng.choice(SIZES),
+            'ceo_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(SYLLABLES).capitalize()}',
+            'headquarters': rng.choice(CITIES),
+        }
+        revenue = int(rng.lognormvariate(14, 2))
+        # The last ``financials_per_company`` years, fewer for companies founded since.
+        first_year = max(founded_year, LAST_YEAR + 1 - financials_per_company)
+        financials = []
+        for year in range(first_year, LAST_YEAR + 1):
+            revenue = max(0, int(revenue * rng.uniform(0.8, 1.3)))
+            financials.append(
+                {
+                    'year': year,
+                    'revenue': revenue,
+                    'net_income': int(revenue * rng.uniform(-0.2, 0.3)),
+                }
+            )
+        yield company, details, financials
+
+
+def generate_rows(
+    count: int,
+    financials_per_company: int = 5,
+    seed: int = 0,
+) -> list[CompanyRow]:
+    """In-memory ``CompanyRow`` records for ``generate_companies()``, ids starting at 1."""
+    return [
+        CompanyRow(
+            company_id,
+            company['name'],
+            company['country'],
+            company['industry'],
+            company['founded_year'],
+            DetailsRow(*(details[c] for c in DETAILS_COLUMNS)),
+            tuple(FinancialRow(*(f[c] for c in FINANCIAL_COLUMNS)) for f in financials),
+        )
+        for company_id, (company, details, financials) in enumerate(
+            generate_companies(count, financials_per_company, seed),
+            start=1,
+        )
+    ]
@@ -0,0 +1,180 @@
+"""
+End-to-end load harness: replays a weighted query mix against the companies
+endpoints in-process (Django test clients, no network) at a fixed concurrency
+and reports latency percentiles, throughput, peak RSS and cache hit ratio.
+"""
+
+import asyncio
+import math
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.db import connections
+from django.test import AsyncClient, Client
+
+from ..models import Company, CompanyDetails, FinancialData
+from .generator import generate_companies
+
+INTERFACE_PATHS = {
+    'wsgi': '/api/v1/companies/',
+    'asgi': '/api/v1/companies/async/',
+}
+
+DEFAULT_MIX = [
+    {'params': {'search': 'industry:tech'}, 'weight': 3},
+    {
+        'params': {'filter': 'industry=Tech AND founded_year>=2000', 'sort': '-founded_year'},
+        'weight': 3,
+    },
+    {'params': {'filter': 'country=Germany OR details__size=Large', 'sort': 'name'}, 'weight': 2},
+    {'params': {'search': 'country=USA', 'sort': '-revenue'}, 'weight': 1},
+    {'params': {'search': 'name~Alko Corp'}, 'weight': 1},
+]
+
+
+@dataclass
+class Scenario:
+    interface: str  # 'wsgi' or 'asgi'
+    cache: str  # 'warm' reuses the response cache, 'cold' forces misses
+
+    @property
+    def name(self) -> str:
+        return f'{self.interface}-{self.cache}'
+
+
+def seed_database(
+    count: int,
+    financials_per_company: int,
+    seed: int,
+    batch_size: int = 1000,
+) -> None:
+    """Bulk-inserts ``count`` synthetic companies with details and financials."""
+    batch = []
+    for item in generate_companies(count, financials_per_company, seed):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            _insert(batch)
+            batch = []
+    if batch:
+        _insert(batch)
+
+
+def _insert(batch: list[tuple[dict, dict, list[dict]]]) -> None:
+    companies = Company.objects.bulk_create([Company(**company) for company, _, _ in batch])
+    CompanyDetails.objects.bulk_create(
+        [CompanyDetails(company=c, **details) for c, (_, details, _) in zip(companies, batch)],
+    )
+    FinancialData.objects.bulk_create(
+        [
+            FinancialData(company=c, **financial)
+            for c, (_, _, financials) in zip(companies, batch)
+            for financial in financials
+        ],
+    )
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(
+    scenario: Scenario,
+    mix: list[dict],
+    requests: int,
+    concurrency: int,
+    seed: int = 0,
+) -> dict:
+    rng = random.Random(seed)
+    plan = rng.choices(
+        [m['params'] for m in mix],
+        weights=[m.get('weight', 1) for m in mix],
+        k=requests,
+    )
+    if scenario.cache == 'cold':
+        # A unique throwaway parameter gives every request its own cache key.
+        plan = [dict(params, _nonce=i) for i, params in enumerate(plan)]
+
+    path = INTERFACE_PATHS[scenario.interface]
+    runner = _run_asgi if scenario.interface == 'asgi' else _run_wsgi
+    start = time.perf_counter()
+    samples = runner(path, plan, concurrency)
+    elapsed = time.perf_counter() - start
+    return summarize(scenario.name, samples, elapsed, concurrency)
+
+
+def summarize(
+    name: str,
+    samples: list[tuple[float, int, str]],
+    elapsed: float,
+    concurrency: int,
+) -> dict:
+    latencies = sorted(latency for latency, _, _ in samples)
+    hits = sum(1 for _, _, cache in samples if cache == 'HIT')
+    cached = sum(1 for _, _, cache in samples if cache in ('HIT', 'MISS'))
+    return {
+        'scenario': name,
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'errors': sum(1 for _, status, _ in samples if status >= 400),
+        'elapsed_s': elapsed,
+        'rps': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'cache_hit_ratio': hits / cached if cached else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _run_wsgi(path: str, plan: list[dict], concurrency: int) -> list[tuple[float, int, str]]:
+    def worker(params_list: list[dict]) -> list[tuple[float, int, str]]:
+        client = Client()
+        samples = []
+        try:
+            for params in params_list:
+                start = time.perf_counter()
+                response = client.get(path, params)
+                samples.append(
+                    (time.perf_counter() - start, response.status_code, response.get('X-Cache', '')),
+                )
+        finally:
+            connections.close_all()
+        return samples
+
+    shares = [plan[i::concurrency] for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return [sample for samples in pool.map(worker, shares) for sample in samples]
+
+
+def _run_asgi(path: str, plan: list[dict], concurrency: int) -> list[tuple[float, int, str]]:
+    async def worker(client: AsyncClient, params_list: list[dict]) -> list[tuple[float, int, str]]:
+        samples = []
+        for params in params_list:
+            start = time.perf_counter()
+            response = await client.get(path, params)
+            samples.append(
+                (time.perf_counter() - start, response.status_code, response.get('X-Cache', '')),
+            )
+        return samples
+
+    async def main() -> list[tuple[float, int, str]]:
+        client = AsyncClient()
+        shares = [plan[i::concurrency] for i in range(concurrency)]
+        results = await asyncio.gather(*(worker(client, share) for share in shares))
+        return [sample for samples in results for sample in samples]
+
+    return asyncio.run(main())
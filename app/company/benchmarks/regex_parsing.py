@@ -0,0 +1,91 @@
+"""
+The regex-based search/filter parsers replaced by ``utils.common.lexer``,
+kept unchanged as the baseline for the ``parse.*`` benchmarks. Not used to
+serve requests.
+"""
+
+import re
+
+from ..utils.common.fields import try_cast
+
+FILTER_PATTERN = re.compile(r'(?P<field>\w+)(?P<op>>=|<=|:|>|<|=|~)(?P<value>.+)')
+
+CONDITION_PATTERN = re.compile(
+    r'(\w+(?:>=|<=|:|=|>|<)(?:"[^"]+"|[^\s]+(?:\s[^\sANDOR][^\s]*)*))',
+)
+
+
+def parse_query(raw_query: str) -> list[dict]:
+    if not raw_query:
+        return []
+
+    conditions = []
+    for match in FILTER_PATTERN.finditer(raw_query):
+        field = match.group('field')
+        op = match.group('op')
+        value = match.group('value').strip()
+        if value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+        value = try_cast(value)
+        conditions.append({'field': field, 'op': op, 'value': value})
+
+    return conditions
+
+
+def extract_conditions(filter_string: str) -> list[str]:
+    if not filter_string:
+        return []
+    matches = []
+    idx = 0
+    while idx < len(filter_string):
+        m = CONDITION_PATTERN.match(filter_string, idx)
+        if not m:
+            idx += 1
+            continue
+        matches.append(m.group(1))
+        idx = m.end()
+        while idx < len(filter_string) and filter_string[idx] in ' &|':
+            idx += 1
+    return matches
+
+
+def parse_filter_expression(raw_query: str) -> list[str]:
+    if not raw_query:
+        return []
+    norm = re.sub(
+        r'\s+(AND|OR)\s+',
+        lambda m: f' {m.group(1).upper()} ',
+        raw_query,
+        flags=re.IGNORECASE,
+    )
+    tokens = []
+    parts = re.split(r'\s+(AND|OR)\s+', norm)
+    for part in parts:
+        if part in ('AND', 'OR'):
+            tokens.append(part)
+        elif part.strip():
+            tokens.extend(extract_conditions(part.strip()))
+    return tokens
+
+
+def strip_quotes(val: str) -> str:
+    if isinstance(val, str) and val.startswith('"') and val.endswith('"'):
+        return val[1:-1]
+    return val
+
+
+def tokens_to_conditions(tokens: list[str]) -> list:
+    result = []
+    for t in tokens:
+        if t in ('AND', 'OR'):
+            result.append(t)
+        else:
+            cond = parse_query(t)[0]
+            if isinstance(cond['value'], str):
+                cond['value'] = strip_quotes(cond['value'])
+            result.append(cond)
+    return result
+
+
+def parse_filter(raw_query: str) -> list:
+    return tokens_to_conditions(parse_filter_expression(raw_query))
@@ -0,0 +1,217 @@
+"""
+Micro-benchmarks for the search/filter/sort engine over synthetic rows.
+
+Each benchmark is a ``(name, setup)`` pair: ``setup(rows)`` prepares its inputs
+and returns the zero-argument callable that is timed.
+"""
+
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from django.conf import settings
+
+from ..indexes import HashIndex
+from ..queryset import SearchQuerySet
+from ..store import CompanyStore
+from ..utils.common.lexer import QuerySyntaxError, parse_filter, parse_search
+from ..utils.common.parsing import _compare, match, parse_query
+from ..utils.filtering import apply_filter
+from ..utils.searching import apply_search
+from ..utils.sorting import create_sort_key, merge_sort
+from . import regex_parsing
+from .generator import generate_rows
+
+Benchmark = tuple[str, Callable[[list], Callable[[], Any]]]
+
+OPERATOR_QUERIES = {
+    'contains': 'industry:tec',
+    'equals': 'industry=Tech',
+    'fuzzy': 'name~Alko Corp',
+    'gt': 'founded_year>1990',
+    'lt': 'founded_year<1950',
+    'gte_related': 'revenue>=1000000',
+    'lte_nested': 'details__size<=Large',
+}
+
+FILTER_QUERIES = {
+    'simple': 'industry=Tech',
+    'and': 'industry=Tech AND founded_year>=2000',
+    'or': 'industry=Tech OR country=Germany',
+    'mixed': 'industry=Tech AND revenue>1000000 OR details__size=Large AND country=USA',
+    'quoted': 'name="Alko Corp" OR details__ceo_name="Alice Be"',
+}
+
+# Parse-only inputs (independent of dataset size). 'adversarial' has no operator,
+# which made the regex pipeline retry its match at every index.
+PARSE_INPUTS = {
+    'typical': FILTER_QUERIES['mixed'],
+    'long': ' AND '.join(f'name="Company {i}" OR founded_year>={1900 + i}' for i in range(200)),
+    'adversarial': 'a' * 5000,
+}
+
+PARSERS = {
+    'lexer': {'search': parse_search, 'filter': parse_filter},
+    'regex': {'search': regex_parsing.parse_query, 'filter': regex_parsing.parse_filter},
+}
+
+SORT_SHAPES = {
+    'numeric': ['founded_year'],
+    'string': ['name'],
+    'descending': ['-founded_year'],
+    'multi': ['industry', '-founded_year', 'name'],
+    'related': ['-revenue'],
+}
+
+
+def _match_all(query: str) -> Callable[[list], Callable[[], Any]]:
+    cond = parse_query(query)[0]
+    return lambda rows: lambda: [match(row, cond) for row in rows]
+
+
+def _compare_all(op: str, value: Any, attr: Any) -> Callable[[list], Callable[[], Any]]:
+    return lambda rows: lambda: [_compare(attr, op, value) for _ in rows]
+
+
+def _search(query: str) -> Callable[[list], Callable[[], Any]]:
+    return lambda rows: lambda: apply_search(rows, parse_query(query))
+
+
+def _filter(query: str) -> Callable[[list], Callable[[], Any]]:
+    return lambda rows: lambda: apply_filter(rows, query)
+
+
+def _parse(parser: Callable[[str], Any], text: str) -> Callable[[list], Callable[[], Any]]:
+    def run():
+        try:
+            return parser(text)
+        except QuerySyntaxError:
+            return None
+
+    return lambda rows: run
+
+
+def _indexed_filter(query: str) -> Callable[[list], Callable[[], Any]]:
+    def setup(rows):
+        store = CompanyStore(rows)
+        store.add_listener('indexes', HashIndex(settings.COMPANY_INDEXED_FIELDS))
+        return lambda: SearchQuerySet(store.rows(), store=store).filter(query)
+
+    return setup
+
+
+def _sort_keys(fields: list[str]) -> Callable[[list], Callable[[], Any]]:
+    key = create_sort_key(fields)
+    return lambda rows: lambda: [key(row) for row in rows]
+
+
+def _merge_sort(fields: list[str]) -> Callable[[list], Callable[[], Any]]:
+    def setup(rows):
+        keys = {id(row): k for row, k in zip(rows, map(create_sort_key(fields), rows))}
+        return lambda: merge_sort(rows, key=lambda row: keys[id(row)])
+
+    return setup
+
+
+def default_benchmarks() -> list[Benchmark]:
+    benchmarks = []
+    for name, query in OPERATOR_QUERIES.items():
+        benchmarks.append((f'match.{name}', _match_all(query)))
+    benchmarks += [
+        ('compare.contains', _compare_all(':', 'tec', 'Technology')),
+        ('compare.equals', _compare_all('=', 'Tech', 'Tech')),
+        ('compare.fuzzy', _compare_all('~', 'Alko Corp', 'Alkori Corp')),
+        ('compare.range', _compare_all('>', 1000, 2000)),
+        ('search.one_condition', _search('industry:tech')),
+        ('search.three_conditions', _search('industry:tech country=USA founded_year>1950')),
+    ]
+    for name, query in FILTER_QUERIES.items():
+        benchmarks.append((f'filter.{name}', _filter(query)))
+        benchmarks.append((f'indexed_filter.{name}', _indexed_filter(query)))
+    for parser_name, parsers in PARSERS.items():
+        for kind, parser in parsers.items():
+            for name, text in PARSE_INPUTS.items():
+                benchmarks.append((f'parse.{kind}.{parser_name}.{name}', _parse(parser, text)))
+    for name, fields in SORT_SHAPES.items():
+        benchmarks.append((f'sort_key.{name}', _sort_keys(fields)))
+        benchmarks.append((f'merge_sort.{name}', _merge_sort(fields)))
+    return benchmarks
+
+
+def run_benchmarks(
+    sizes: list[int],
+    benchmarks: list[Benchmark] | None = None,
+    repeat: int = 3,
+    financials_per_company: int = 5,
+    seed: int = 0,
+    only: str | None = None,
+    log: Callable[[str], None] | None = None,
+) -> dict:
+    """
+    Times every benchmark at every size and returns a JSON-serializable report:
+    ``{'meta': {...}, 'results': [{'name', 'size', 'min_s', 'median_s', 'runs'}]}``.
+    """
+    benchmarks = benchmarks if benchmarks is not None else default_benchmarks()
+    if only:
+        benchmarks = [b for b in benchmarks if b[0].startswith(only)]
+
+    results = []
+    for size in sizes:
+        rows = generate_rows(size, financials_per_company, seed)
+        for name, setup in benchmarks:
+            fn = setup(rows)
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                runs.append(time.perf_counter() - start)
+            result = {
+                'name': name,
+                'size': size,
+                'min_s': min(runs),
+                'median_s': statistics.median(runs),
+                'runs': runs,
+            }
+            results.append(result)
+            if log:
+                log(f'{name:<36} n={size:<8} median={result["median_s"] * 1000:10.2f} ms')
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': seed,
+            'financials_per_company': financials_per_company,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_reports(current: dict, baseline: dict, threshold: float = 0.2) -> list[dict]:
+    """
+    Matches results by (name, size) and flags a regression when the current
+    median is more than ``threshold`` (fractional) slower than the baseline.
+    """
+    base = {(r['name'], r['size']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        previous = base.get((result['name'], result['size']))
+        if previous is None or not previous['median_s']:
+            continue
+        ratio = result['median_s'] / previous['median_s']
+        rows.append(
+            {
+                'name': result['name'],
+                'size': result['size'],
+                'baseline_s': previous['median_s'],
+                'current_s': result['median_s'],
+                'ratio': ratio,
+                'regression': ratio > 1 + threshold,
+            }
+        )
+    return rows
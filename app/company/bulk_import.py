@@ -0,0 +1,232 @@
+"""
+Streaming bulk import of companies with their details and financials.
+
+Records are read one at a time from CSV or JSON Lines and written in batches:
+each batch is one transaction with one ``bulk_create`` per model. Records
+with an ``id`` are upserted (details updated, financials replaced), records
+without one are inserted. Nothing goes through ``save()`` or model signals,
+so the company store is not updated row by row; callers rebuild it once at
+the end.
+
+JSON Lines: one company per line,
+``{"id": 1, "name": ..., "country": ..., "industry": ..., "founded_year": ...,
+"details": {"company_type": ..., ...} | null, "financials": [{"year": ..., ...}]}``.
+
+CSV: company columns, ``details__<field>`` and ``financials__<field>`` columns;
+one row per financial year, consecutive rows with the same ``id`` belong to
+the same company (without an ``id`` column every row is its own company).
+"""
+
+import csv
+import json
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import IO, Any, NamedTuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Company, CompanyDetails, FinancialData
+from .rows import COMPANY_COLUMNS, DETAILS_COLUMNS
+
+FORMATS = ('csv', 'jsonl')
+
+
+class RecordError(ValueError):
+    """An input record that cannot be imported; ``line`` is 1-based."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+class ImportRecord(NamedTuple):
+    line: int
+    company: dict[str, Any]
+    details: dict[str, Any] | None
+    financials: list[dict[str, Any]]
+
+
+@dataclass
+class ImportStats:
+    companies: int = 0
+    details: int = 0
+    financials: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def rows(self) -> int:
+        return self.companies + self.details + self.financials
+
+    def rate(self) -> float:
+        """Rows written per second so far."""
+        elapsed = time.perf_counter() - self._started
+        return self.rows / elapsed if elapsed else 0.0
+
+
+def read_records(lines: IO[str], fmt: str) -> Iterator[ImportRecord]:
+    """Parses ``lines`` (an open text file) lazily into ``ImportRecord``s."""
+    if fmt == 'jsonl':
+        return _read_jsonl(lines)
+    if fmt == 'csv':
+        return _read_csv(lines)
+    raise ValueError(f'Unknown format {fmt!r}; expected one of {", ".join(FORMATS)}.')
+
+
+def import_records(
+    records: Iterable[ImportRecord],
+    batch_size: int = 1000,
+    progress=None,
+) -> ImportStats:
+    """
+    Writes ``records`` in transactions of ``batch_size`` companies. Batches
+    committed before a ``RecordError`` stay written. ``progress(stats)`` is
+    called after every batch.
+    """
+    stats = ImportStats()
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _write_batch(batch, stats)
+            batch = []
+            if progress is not None:
+                progress(stats)
+    if batch:
+        _write_batch(batch, stats)
+        if progress is not None:
+            progress(stats)
+    _reset_sequences()
+    stats.seconds = time.perf_counter() - stats._started
+    return stats
+
+
+def _reset_sequences() -> None:
+    """Moves id sequences past explicitly imported ids (a no-op on SQLite)."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [Company, CompanyDetails, FinancialData],
+    )
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def _write_batch(batch: list[ImportRecord], stats: ImportStats) -> None:
+    now = timezone.now()
+    companies = [_build(Company, record, record.company, now) for record in batch]
+    upserts = [c for c in companies if c.pk is not None]
+    inserts = [c for c in companies if c.pk is None]
+    with transaction.atomic():
+        if upserts:
+            Company.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=[*COMPANY_COLUMNS[1:], 'updated_at'],
+            )
+            # Upserted companies get exactly the financials in the input.
+            # FinancialData has no dependents or signal-driven cleanup beyond
+            # the store, which is rebuilt after the import.
+            existing = FinancialData.objects.filter(company_id__in=[c.pk for c in upserts])
+            existing._raw_delete(existing.db)
+        if inserts:
+            Company.objects.bulk_create(inserts)  # sets pks on the objects
+
+        details = [
+            _build(CompanyDetails, record, dict(record.details, company=company), now)
+            for company, record in zip(companies, batch)
+            if record.details is not None
+        ]
+        CompanyDetails.objects.bulk_create(
+            details,
+            update_conflicts=True,
+            unique_fields=['company'],
+            update_fields=[*DETAILS_COLUMNS, 'updated_at'],
+        )
+        financials = [
+            _build(FinancialData, record, dict(financial, company=company), now)
+            for company, record in zip(companies, batch)
+            for financial in record.financials
+        ]
+        FinancialData.objects.bulk_create(financials)
+
+    stats.companies += len(companies)
+    stats.details += len(details)
+    stats.financials += len(financials)
+    stats.batches += 1
+
+
+def _build(model, record: ImportRecord, values: dict[str, Any], now):
+    """A validated, unsaved ``model`` instance from raw ``values``."""
+    instance = model(updated_at=now)
+    for name, value in values.items():
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise RecordError(record.line, f'unknown {model.__name__} field {name!r}') from None
+        if model_field.is_relation:
+            setattr(instance, name, value)
+            continue
+        try:
+            setattr(instance, model_field.attname, model_field.to_python(value))
+        except ValidationError as exc:
+            raise RecordError(record.line, f'{name}: {"; ".join(exc.messages)}') from None
+    missing = [
+        f.name
+        for f in model._meta.concrete_fields
+        if not (f.primary_key or f.has_default()) and getattr(instance, f.attname) in (None, '')
+    ]
+    if missing:
+        raise RecordError(record.line, f'missing {model.__name__} fields: {", ".join(missing)}')
+    return instance
+
+
+def _read_jsonl(lines: IO[str]) -> Iterator[ImportRecord]:
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            raise RecordError(line_no, f'invalid JSON ({exc})') from None
+        if not isinstance(data, dict):
+            raise RecordError(line_no, 'expected a JSON object')
+        details = data.pop('details', None)
+        financials = data.pop('financials', None) or []
+        yield ImportRecord(line_no, data, details, list(financials))
+
+
+def _read_csv(lines: IO[str]) -> Iterator[ImportRecord]:
+    reader = csv.DictReader(lines)
+    record = None
+    for row in reader:
+        line_no = reader.line_num
+        company, details, financial = {}, {}, {}
+        for column, value in row.items():
+            value = None if value == '' else value
+            if column.startswith('details__'):
+                details[column.removeprefix('details__')] = value
+            elif column.startswith('financials__'):
+                financial[column.removeprefix('financials__')] = value
+            else:
+                company[column] = value
+        same = record is not None and company.get('id') is not None
+        if same and company['id'] == record.company.get('id'):
+            if any(v is not None for v in financial.values()):
+                record.financials.append(financial)
+            continue
+        if record is not None:
+            yield record
+        record = ImportRecord(
+            line_no,
+            company,
+            details if any(v is not None for v in details.values()) else None,
+            [financial] if any(v is not None for v in financial.values()) else [],
+        )
+    if record is not None:
+        yield record
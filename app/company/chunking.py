@@ -0,0 +1,123 @@
+"""
+Adaptive chunk sizes for chunked search, filter and response streaming.
+
+A chunk is at most as many rows as fit COMPANY_CHUNK_MEMORY_BUDGET_BYTES at
+the rows' estimated size (which grows with their financials). The first
+chunk is a COMPANY_CHUNK_MIN_SIZE probe; after it, a chunk is also at most as
+many rows as the measured per-row cost gets through in COMPANY_CHUNK_TARGET_MS,
+so expensive predicates (``~``, related fields) get smaller chunks and
+deadline checks stay frequent.
+"""
+
+import sys
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from django.conf import settings
+
+from .rows import Row
+
+# Rows sampled (evenly spread) to estimate the size of a row.
+SIZE_SAMPLE = 32
+# Weight of the latest chunk in the moving per-row cost.
+COST_SMOOTHING = 0.5
+
+
+def estimate_row_bytes(rows: Sequence[Any]) -> int:
+    """Mean deep in-memory size of a sample of ``rows``, including details and financials."""
+    if not len(rows):
+        return 1
+    step = max(1, len(rows) // SIZE_SAMPLE)
+    sample = [rows[i] for i in range(0, len(rows), step)][:SIZE_SAMPLE]
+    return max(1, sum(_deep_size(row) for row in sample) // len(sample))
+
+
+def max_unstreamed_rows(rows: Sequence[Any]) -> int:
+    """Most rows an un-paginated JSON response serializes in one piece; larger ones stream."""
+    return settings.COMPANY_RESPONSE_MEMORY_BUDGET_BYTES // estimate_row_bytes(rows)
+
+
+def _deep_size(obj: Any) -> int:
+    size = sys.getsizeof(obj)
+    if isinstance(obj, Row):
+        size += sum(_deep_size(getattr(obj, name)) for name in obj._fields)
+    elif isinstance(obj, (tuple, list)):
+        size += sum(_deep_size(item) for item in obj)
+    return size
+
+
+class ChunkScheduler:
+    """
+    Sizes the chunks of one pass over a row list and keeps their statistics.
+    Consumers call ``record()`` after processing each chunk from ``chunks()``.
+    """
+
+    def __init__(
+        self,
+        row_bytes: int,
+        memory_budget: int | None = None,
+        target_ms: float | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+    ):
+        self.row_bytes = row_bytes
+        self.memory_budget = memory_budget or settings.COMPANY_CHUNK_MEMORY_BUDGET_BYTES
+        self.target_ms = target_ms or settings.COMPANY_CHUNK_TARGET_MS
+        self.min_size = min_size or settings.COMPANY_CHUNK_MIN_SIZE
+        self.max_size = max(self.min_size, max_size or settings.COMPANY_CHUNK_MAX_SIZE)
+        self._row_ms: float | None = None
+        self._sizes: list[int] = []
+        self._ms: list[float] = []
+
+    @classmethod
+    def for_rows(cls, rows: Sequence[Any], **kwargs) -> 'ChunkScheduler':
+        return cls(estimate_row_bytes(rows), **kwargs)
+
+    @classmethod
+    def fixed(cls, size: int) -> 'ChunkScheduler':
+        """Every chunk ``size`` rows (the old ``chunk_size`` behaviour)."""
+        return cls(1, min_size=size, max_size=size)
+
+    @property
+    def row_ms(self) -> float | None:
+        """Smoothed measured cost of one row in ms, None before the first chunk."""
+        return self._row_ms
+
+    def next_size(self) -> int:
+        size = self.memory_budget // self.row_bytes
+        if not self._sizes:
+            size = min(size, self.min_size)  # probe the per-row cost with a small chunk
+        elif self._row_ms:
+            size = min(size, int(self.target_ms / self._row_ms))
+        return min(self.max_size, max(self.min_size, size))
+
+    def chunks(self, data: Sequence[Any]) -> Iterator[tuple[int, Sequence[Any]]]:
+        """``(offset, rows)`` pairs covering ``data``, sized as the pass goes."""
+        start = 0
+        while start < len(data):
+            size = self.next_size()
+            yield start, data[start : start + size]
+            start += size
+
+    def record(self, rows: int, seconds: float) -> None:
+        """Reports that a chunk of ``rows`` took ``seconds`` to process."""
+        self._sizes.append(rows)
+        self._ms.append(seconds * 1000)
+        if rows:
+            row_ms = seconds * 1000 / rows
+            self._row_ms = (
+                row_ms if self._row_ms is None
+                else COST_SMOOTHING * row_ms + (1 - COST_SMOOTHING) * self._row_ms
+            )
+
+    def stats(self) -> dict:
+        return {
+            'chunks': len(self._sizes),
+            'rows': sum(self._sizes),
+            'min_size': min(self._sizes, default=0),
+            'max_size': max(self._sizes, default=0),
+            'row_bytes': self.row_bytes,
+            'peak_chunk_bytes': max(self._sizes, default=0) * self.row_bytes,
+            'max_chunk_ms': round(max(self._ms, default=0.0), 3),
+            'time_ms': round(sum(self._ms), 3),
+        }
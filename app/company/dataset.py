@@ -0,0 +1,233 @@
+import fcntl
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .aggregates import ValueCounts
+from .indexes import HashIndex
+from .models import Company
+from .queryset import SearchQuerySet
+from .result_cache import ResultCache
+from .snapshot import Snapshot, SnapshotError, write_snapshot
+from .sort_index import SortIndex
+from .store import CompanyStore, Delta
+
+_snapshot: Snapshot | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+_store: CompanyStore | None = None
+_refreshed_at = 0.0
+_store_lock = threading.RLock()
+
+
+def get_companies() -> SearchQuerySet:
+    """Returns the current company dataset of this process."""
+    store = get_store()
+    return SearchQuerySet(store.rows(), store=store)
+
+
+async def aget_companies() -> SearchQuerySet:
+    """
+    Async variant of ``get_companies()``. A loaded store with no refresh due is
+    returned straight from the event loop; loading or refreshing it runs the
+    ORM work in Django's sync thread.
+    """
+    store = _store
+    due = time.monotonic() - _refreshed_at >= settings.COMPANY_STORE_REFRESH_INTERVAL
+    if store is not None and not due:
+        return SearchQuerySet(store.rows(), store=store)
+    return await sync_to_async(get_companies)()
+
+
+def get_store() -> CompanyStore:
+    """
+    Returns this process's ``CompanyStore``, loading it on first use (from the
+    shared snapshot when COMPANY_SNAPSHOT_PATH is set, otherwise from the
+    database). Afterwards, at most once per COMPANY_STORE_REFRESH_INTERVAL, it
+    is caught up with ``refresh_store()``, or loaded afresh when that declines.
+    """
+    global _store, _refreshed_at
+    with _store_lock:
+        now = time.monotonic()
+        if _store is None:
+            _store = _load_store()
+            _refreshed_at = now
+        elif now - _refreshed_at >= settings.COMPANY_STORE_REFRESH_INTERVAL:
+            if refresh_store(_store) is None:
+                _store = _load_store()
+            _refreshed_at = now
+        return _store
+
+
+def reset_store() -> None:
+    """Drops the in-process store; the next ``get_store()`` reloads it."""
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def apply_changes(company_ids: set[int]) -> Delta:
+    """Reloads ``company_ids`` from the database into the store, if it is loaded."""
+    with _store_lock:
+        if _store is None or not company_ids:
+            return Delta()
+        return _store.apply(set(company_ids), Company.objects.rows(company_ids))
+
+
+def refresh_store(store: CompanyStore) -> Delta | None:
+    """
+    Catches ``store`` up with writes that did not reach it through signals:
+    rows stamped since COMPANY_STORE_REFRESH_LAG before the last check (a
+    transaction may stamp ``updated_at`` well before it commits) that it has
+    not seen yet, plus companies inserted or deleted without touching
+    ``updated_at``.
+
+    Returns None, leaving ``store`` as it is, when it should be loaded afresh
+    instead: more than COMPANY_STORE_FULL_RELOAD_FRACTION of it changed, or
+    (with COMPANY_SNAPSHOT_PATH) the current snapshot is not the one it was
+    loaded from.
+    """
+    if settings.COMPANY_SNAPSHOT_PATH and get_snapshot() is not store.source:
+        return None
+    checked_at = timezone.now()
+    if store.checked_at is None:
+        recent = frozenset()
+        ids = set(Company.objects.values_list('id', flat=True)) | store.ids()
+    else:
+        lag = timedelta(seconds=settings.COMPANY_STORE_REFRESH_LAG)
+        recent = Company.objects.changed_stamps(store.checked_at - lag)
+        ids = {company_id for _, _, company_id, _ in recent - store.recent}
+    if len(ids) > len(store) * settings.COMPANY_STORE_FULL_RELOAD_FRACTION:
+        return None
+    delta = store.apply(ids, Company.objects.rows(ids)) if ids else Delta()
+
+    if Company.objects.count() != len(store):
+        missing = set(Company.objects.values_list('id', flat=True)) ^ store.ids()
+        extra = store.apply(missing, Company.objects.rows(missing))
+        delta.inserted += extra.inserted
+        delta.updated += extra.updated
+        delta.deleted += extra.deleted
+    store.checked_at = checked_at
+    store.recent = recent
+    return delta
+
+
+def check_store(store: CompanyStore) -> dict[str, list]:
+    """
+    Diffs ``store`` and its listeners against a fresh database load.
+
+    Returns:
+        Dict with ``missing`` / ``extra`` / ``changed`` company ids and the names
+        of ``listeners`` that disagree with a rebuild. All empty when consistent.
+    """
+    fresh = {row.id: row for row in Company.objects.rows()}
+    stored = {row.id: row for row in store.rows()}
+    return {
+        'missing': sorted(fresh.keys() - stored.keys()),
+        'extra': sorted(stored.keys() - fresh.keys()),
+        'changed': sorted(i for i in fresh.keys() & stored.keys() if fresh[i] != stored[i]),
+        'listeners': sorted(
+            name for name, listener in store.listeners.items()
+            if not listener.matches(list(fresh.values()))
+        ),
+    }
+
+
+def repair_store(store: CompanyStore, report: dict[str, list]) -> None:
+    """Reloads the companies and rebuilds the listeners flagged by ``check_store``."""
+    ids = {*report['missing'], *report['extra'], *report['changed']}
+    with _store_lock:
+        if ids:
+            store.apply(ids, Company.objects.rows(ids))
+        for name in report['listeners']:
+            store.listeners[name].rebuild(store.rows())
+
+
+def get_value_counts() -> ValueCounts:
+    return get_store().listeners['value_counts']
+
+
+def get_index() -> HashIndex:
+    return get_store().listeners['indexes']
+
+
+def _load_store() -> CompanyStore:
+    checked_at = timezone.now()
+    lag = timedelta(seconds=settings.COMPANY_STORE_REFRESH_LAG)
+    # Stamps are taken before the rows, so a row changed in between is re-read.
+    recent = Company.objects.changed_stamps(checked_at - lag)
+    if settings.COMPANY_SNAPSHOT_PATH:
+        snapshot = get_snapshot()
+        if snapshot.version != Company.objects.dataset_version():
+            recent = frozenset()  # the snapshot is behind: re-read the whole window
+        store = CompanyStore(snapshot.rows(), checked_at, recent, source=snapshot)
+    else:
+        store = CompanyStore(Company.objects.rows(), checked_at, recent)
+    store.add_listener('value_counts', ValueCounts(settings.COMPANY_CATEGORICAL_FIELDS))
+    store.add_listener('indexes', HashIndex(settings.COMPANY_INDEXED_FIELDS))
+    store.add_listener('results', ResultCache(settings.COMPANY_RESULT_CACHE_MAX_IDS))
+    store.add_listener('sorts', SortIndex(settings.COMPANY_SORT_FIELDS, store))
+    return store
+
+
+def get_snapshot() -> Snapshot:
+    """
+    Returns this process's mapping of the snapshot. At most once per
+    COMPANY_SNAPSHOT_CHECK_INTERVAL the dataset version is compared with the
+    mapped file; a mismatch remaps a newer file or rebuilds it.
+    """
+    global _snapshot, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if _snapshot is None or now - _checked_at >= settings.COMPANY_SNAPSHOT_CHECK_INTERVAL:
+            _snapshot = _refresh(Path(settings.COMPANY_SNAPSHOT_PATH), _snapshot)
+            _checked_at = now
+        return _snapshot
+
+
+def build_snapshot(path: str | Path) -> Snapshot:
+    """Writes a fresh snapshot of the database to ``path`` and maps it."""
+    version = Company.objects.dataset_version()
+    write_snapshot(path, Company.objects.rows(), version)
+    return Snapshot(path)
+
+
+def _refresh(path: Path, current: Snapshot | None) -> Snapshot:
+    version = Company.objects.dataset_version()
+    if current is not None and current.version == version:
+        return current
+
+    snapshot = _open(path)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    # Only one worker rebuilds; the others wait and map its file.
+    with _build_lock(path):
+        snapshot = _open(path)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        return build_snapshot(path)
+
+
+def _open(path: Path) -> Snapshot | None:
+    try:
+        return Snapshot(path)
+    except (FileNotFoundError, SnapshotError):
+        return None
+
+
+@contextmanager
+def _build_lock(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f'{path.name}.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
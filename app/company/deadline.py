@@ -0,0 +1,73 @@
+"""
+Per-request time budget with cooperative cancellation.
+
+``deadline(expires_at)`` makes the current context's query work expire at a
+``time.monotonic()`` instant. Long loops (chunked search and filter, merge
+sort, sort index rank maps and permutation walks, streamed serialization)
+call ``check_deadline()`` between units of work, which raises
+``QueryTimeout`` once it has passed. Outside a deadline the check is a single
+context-variable lookup.
+"""
+
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_expires_at: ContextVar[float | None] = ContextVar('company_query_deadline', default=None)
+
+
+class QueryTimeout(Exception):
+    """
+    The request's deadline passed. ``partial`` holds the rows matched by the
+    time it was noticed (see ``run_query()``), ``scanned`` how many input rows
+    the interrupted stage had covered and ``stage`` which one it was.
+    """
+
+    def __init__(self, stage: str = '', partial: list | None = None, scanned: int | None = None):
+        super().__init__(f'query deadline exceeded during {stage or "query"}')
+        self.stage = stage
+        self.partial = partial
+        self.scanned = scanned
+
+    def describe(self) -> str:
+        """Short note on what ``partial`` covers, for the X-Partial-Result header."""
+        if self.stage == 'sort':
+            return 'timeout during sort; unsorted'
+        return f'timeout during {self.stage} after {self.scanned} rows'
+
+
+@contextmanager
+def deadline(expires_at: float | None):
+    """Runs the block with ``expires_at`` (monotonic seconds, or None for no limit) in effect."""
+    token = _expires_at.set(expires_at)
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+
+def check_deadline(stage: str = '', scanned: int | None = None) -> None:
+    """Raises ``QueryTimeout`` for ``stage`` (after ``scanned`` rows) once the deadline passed."""
+    expires_at = _expires_at.get()
+    if expires_at is not None and time.monotonic() >= expires_at:
+        raise QueryTimeout(stage, scanned=scanned)
+
+
+def request_deadline(params: Mapping[str, str]) -> float | None:
+    """
+    Deadline of a request starting now: COMPANY_QUERY_TIMEOUT_MS, or the lower
+    ``timeout_ms`` parameter. Raises ValueError for an invalid ``timeout_ms``.
+    """
+    timeout_ms = settings.COMPANY_QUERY_TIMEOUT_MS
+    if params.get('timeout_ms'):
+        try:
+            requested = int(params['timeout_ms'])
+        except ValueError:
+            requested = 0
+        if requested <= 0:
+            raise ValueError('Must be a positive number of milliseconds.')
+        timeout_ms = requested if timeout_ms is None else min(requested, timeout_ms)
+    return None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
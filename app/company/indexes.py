@@ -0,0 +1,164 @@
+from array import array
+from bisect import bisect_left, insort
+
+from .rows import Row
+from .store import CompanyStore, Delta
+from .utils.common.fields import get_nested_field_generic
+from .utils.common.parsing import match
+
+INDEXED_OPS = ('=', ':')
+
+
+class HashIndex:
+    """
+    Per-field hash indexes for low-cardinality fields: each value maps to the
+    sorted ids of the companies holding it, maintained from store deltas.
+
+    ``lookup()`` resolves ``=`` (one bucket) and ``:`` (every bucket whose
+    value contains the text) without touching the rows, with the same
+    results as ``match()``. Updates replace the changed buckets and swap the
+    field's mapping in one assignment, so readers never see a half-applied
+    delta.
+    """
+
+    def __init__(self, fields: list[str]):
+        self.fields = list(fields)
+        self._buckets: dict[str, dict] = {f: {} for f in self.fields}
+
+    def ids(self, field: str, value) -> array:
+        """Sorted ids of companies whose ``field`` equals ``value``."""
+        return self._buckets[field].get(value, array('q'))
+
+    def values(self, field: str) -> dict:
+        """Value -> number of companies, for a tracked field."""
+        return {value: len(ids) for value, ids in self._buckets.get(field, {}).items()}
+
+    def covers(self, cond: dict) -> bool:
+        return cond['field'] in self._buckets and cond['op'] in INDEXED_OPS
+
+    def lookup(self, cond: dict) -> set[int] | None:
+        """
+        Ids matching ``cond``, or None if the index cannot answer it (field not
+        indexed, or an operator other than ``=`` / ``:``).
+        """
+        if not self.covers(cond):
+            return None
+        buckets = self._buckets[cond['field']]
+        values = cond['value'] if isinstance(cond['value'], tuple) else (cond['value'],)
+        result = set()
+        for value in values:
+            if cond['op'] == ':' and isinstance(value, str):
+                needle = value.lower()
+                for key, ids in list(buckets.items()):
+                    if isinstance(key, str) and needle in key.lower():
+                        result.update(ids)
+            else:
+                result.update(buckets.get(value, ()))
+        return result
+
+    def rebuild(self, rows: list[Row]) -> None:
+        buckets = {f: {} for f in self.fields}
+        for row in rows:  # rows are in id order, so every bucket comes out sorted
+            for field, field_buckets in buckets.items():
+                value = get_nested_field_generic(row, field)
+                if value is not None:
+                    field_buckets.setdefault(value, array('q')).append(row.id)
+        self._buckets = buckets
+
+    def apply(self, delta: Delta) -> None:
+        removed = [(old.id, old) for old, _ in delta.updated] + [(r.id, r) for r in delta.deleted]
+        added = [(new.id, new) for _, new in delta.updated] + [(r.id, r) for r in delta.inserted]
+        for field in self.fields:
+            buckets = dict(self._buckets[field])
+            copied = set()
+
+            def bucket(value):
+                if value not in copied:
+                    buckets[value] = array('q', buckets.get(value, ()))
+                    copied.add(value)
+                return buckets[value]
+
+            for company_id, row in removed:
+                value = get_nested_field_generic(row, field)
+                if value is None:
+                    continue
+                ids = bucket(value)
+                i = bisect_left(ids, company_id)
+                if i < len(ids) and ids[i] == company_id:
+                    ids.pop(i)
+                if not ids:
+                    del buckets[value]
+                    copied.discard(value)
+            for company_id, row in added:
+                value = get_nested_field_generic(row, field)
+                if value is not None:
+                    insort(bucket(value), company_id)
+            self._buckets[field] = buckets
+
+    def matches(self, rows: list[Row]) -> bool:
+        fresh = HashIndex(self.fields)
+        fresh.rebuild(rows)
+        return fresh == self
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HashIndex):
+            return NotImplemented
+        return self._buckets == other._buckets
+
+
+def select(store: CompanyStore, expr: list) -> tuple[list[Row], int] | None:
+    """
+    Evaluates a filter expression (conditions and 'AND'/'OR', folded left to
+    right like ``evaluate_filter``) over every row of ``store`` as id sets.
+    Indexed conditions come straight from the ``'indexes'`` listener; the
+    others are matched only against the rows still in question.
+
+    Returns the matching rows in id order and the number of rows passed to
+    ``match()``, or None when no condition can use an index.
+    """
+    index = store.listeners.get('indexes')
+    if index is None:
+        return None
+    resolved = [index.lookup(token) if isinstance(token, dict) else None for token in expr]
+    if all(ids is None for ids in resolved):
+        return None
+
+    rows = store.rows()
+    scanned = 0
+    result = None
+    op = None
+    for token, ids in zip(expr, resolved):
+        if not isinstance(token, dict):
+            op = token
+            continue
+        if ids is None:
+            if result is None:
+                candidates = rows
+            elif op == 'AND':
+                candidates = [row for row in map(store.get, result) if row is not None]
+            else:
+                candidates = [row for row in rows if row.id not in result]
+            scanned += len(candidates)
+            ids = {row.id for row in candidates if match(row, token)}
+        if result is None:
+            result = ids
+        elif op == 'AND':
+            result &= ids
+        elif op == 'OR':
+            result |= ids
+
+    matched = [store.get(company_id) for company_id in sorted(result or ())]
+    return [row for row in matched if row is not None], scanned
+
+
+def search_expression(conditions: list[dict], index: HashIndex | None) -> list:
+    """
+    Search conditions as an AND chain for ``select()``, indexed conditions
+    first so ``match()`` only runs on rows they already selected.
+    """
+    expr = []
+    for cond in sorted(conditions, key=lambda c: not (index and index.covers(c))):
+        if expr:
+            expr.append('AND')
+        expr.append(cond)
+    return expr
@@ -0,0 +1,187 @@
+"""
+Lightweight per-stage timing for company queries.
+
+``span('search')`` times a stage of the current request and ``increment()``
+bumps a counter. Both are no-ops unless a request trace is active, which the
+``ServerTimingMiddleware`` only starts when COMPANY_INSTRUMENTATION_ENABLED is
+set, so the disabled cost is a single context-variable lookup.
+
+Recorded stages are returned in a ``Server-Timing`` header and aggregated
+per process into histograms and counters rendered by ``metrics.render()``.
+
+With memory tracing, tracemalloc runs while at least one traced request is
+in flight (unless something else started it). A stage's peak is how far the
+traced peak rose above the memory in use when the stage started. tracemalloc
+is process-wide, so this includes allocations of concurrent requests.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_NOOP = nullcontext()
+_trace: ContextVar['RequestTrace | None'] = ContextVar('company_request_trace', default=None)
+_memory_lock = threading.Lock()
+_memory_traces = 0  # in-flight traces with trace_memory
+_owns_tracemalloc = False  # whether the first of them started tracemalloc
+
+
+@dataclass
+class StageTiming:
+    name: str
+    duration_ms: float
+    peak_kb: float | None = None
+
+
+@dataclass
+class RequestTrace:
+    trace_memory: bool = False
+    stages: list[StageTiming] = field(default_factory=list)
+
+    def server_timing(self) -> str:
+        parts = []
+        for stage in self.stages:
+            part = f'{stage.name};dur={stage.duration_ms:.2f}'
+            if stage.peak_kb is not None:
+                part += f';desc="peak {stage.peak_kb:.0f}KB"'
+            parts.append(part)
+        return ', '.join(parts)
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'start', 'base')
+
+    def __init__(self, trace: RequestTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        if self.trace.trace_memory:
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        peak_kb = None
+        if self.trace.trace_memory:
+            peak_kb = max(0, tracemalloc.get_traced_memory()[1] - self.base) / 1024
+        self.trace.stages.append(StageTiming(self.name, duration_ms, peak_kb))
+        metrics.observe(self.name, duration_ms, peak_kb)
+        return False
+
+
+def span(name: str):
+    """Context manager timing stage ``name`` of the current request, if traced."""
+    trace = _trace.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name)
+
+
+def increment(counter: str, amount: int = 1) -> None:
+    """Adds ``amount`` to a process-wide counter, if the current request is traced."""
+    if _trace.get() is not None:
+        metrics.increment(counter, amount)
+
+
+def start_trace(trace_memory: bool = False) -> tuple[RequestTrace, object]:
+    """Starts tracing the current context; pass the token to ``end_trace()``."""
+    global _memory_traces, _owns_tracemalloc
+    if trace_memory:
+        with _memory_lock:
+            if not _memory_traces and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _owns_tracemalloc = True
+            _memory_traces += 1
+    trace = RequestTrace(trace_memory=trace_memory)
+    return trace, _trace.set(trace)
+
+
+def end_trace(token) -> None:
+    """Ends the trace; the last memory trace stops tracemalloc if one of them started it."""
+    global _memory_traces, _owns_tracemalloc
+    trace = _trace.get()
+    _trace.reset(token)
+    if trace is not None and trace.trace_memory:
+        with _memory_lock:
+            _memory_traces -= 1
+            if not _memory_traces and _owns_tracemalloc:
+                tracemalloc.stop()
+                _owns_tracemalloc = False
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.peak_kb: dict[str, float] = {}
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def observe(self, stage: str, duration_ms: float, peak_kb: float | None = None) -> None:
+        with self._lock:
+            self.histograms.setdefault(stage, Histogram()).observe(duration_ms)
+            if peak_kb is not None:
+                self.peak_kb[stage] = max(self.peak_kb.get(stage, 0.0), peak_kb)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.peak_kb.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for counter, value in sorted(self.counters.items()):
+                lines.append(f'# TYPE company_{counter}_total counter')
+                lines.append(f'company_{counter}_total {value}')
+
+            lines.append('# TYPE company_stage_duration_ms histogram')
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS, histogram.buckets):
+                    cumulative += count
+                    lines.append(
+                        f'company_stage_duration_ms_bucket{{stage="{stage}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'company_stage_duration_ms_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f'company_stage_duration_ms_sum{{stage="{stage}"}} {histogram.sum:.3f}')
+                lines.append(f'company_stage_duration_ms_count{{stage="{stage}"}} {histogram.count}')
+
+            if self.peak_kb:
+                lines.append('# TYPE company_stage_peak_memory_kb gauge')
+                for stage, peak in sorted(self.peak_kb.items()):
+                    lines.append(f'company_stage_peak_memory_kb{{stage="{stage}"}} {peak:.1f}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from company.dataset import build_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Writes the memory-mapped company dataset snapshot shared by the API workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=None,
+            help='Snapshot file to write (defaults to COMPANY_SNAPSHOT_PATH).',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.COMPANY_SNAPSHOT_PATH
+        if not path:
+            raise CommandError('Pass --path or set COMPANY_SNAPSHOT_PATH.')
+
+        snapshot = build_snapshot(path)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Wrote {snapshot.company_count} companies and '
+                f'{snapshot.financial_count} financial rows to {path} '
+                f'(version {snapshot.version}).'
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from company.dataset import check_store, get_store, repair_store
+
+
+class Command(BaseCommand):
+    help = (
+        'Loads a company store in this process and diffs it (rows and derived '
+        'indexes/aggregates) against the database. To check the store a running '
+        'worker serves, use GET /api/v1/store/check/ as a staff user.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Reload mismatching companies and rebuild mismatching listeners.',
+        )
+
+    def handle(self, *args, **options):
+        store = get_store()
+        report = check_store(store)
+        for key, values in report.items():
+            if values:
+                self.stdout.write(f'{key}: {", ".join(map(str, values))}')
+
+        if not any(report.values()):
+            self.stdout.write(self.style.SUCCESS(f'Store consistent ({len(store)} companies).'))
+            return
+
+        if not options['repair']:
+            raise CommandError('Store is inconsistent with the database.')
+
+        repair_store(store, report)
+        self.stdout.write(self.style.SUCCESS('Store repaired.'))
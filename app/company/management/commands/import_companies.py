@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from company.bulk_import import FORMATS, RecordError, import_records, read_records
+from company.dataset import build_snapshot, reset_store
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-imports companies with details and financials from CSV or JSON Lines '
+        '(streamed, batched bulk_create/upserts), then rebuilds the store/snapshot once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin.")
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='Input format (default: from the file extension).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000, help='Companies per transaction.'
+        )
+        parser.add_argument(
+            '--no-rebuild',
+            action='store_true',
+            help='Skip the store reset and snapshot rebuild after the import.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or _format_from_path(path)
+        if fmt is None:
+            raise CommandError('Pass --format for input without a .csv/.jsonl extension.')
+
+        def progress(stats):
+            self.stdout.write(
+                f'{stats.companies} companies, {stats.financials} financials '
+                f'({stats.rate():.0f} rows/s)'
+            )
+
+        lines = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            stats = import_records(read_records(lines, fmt), options['batch_size'], progress)
+        except RecordError as exc:
+            raise CommandError(f'{exc} (earlier batches were committed)') from exc
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {stats.companies} companies, {stats.details} details and '
+                f'{stats.financials} financials in {stats.seconds:.1f}s '
+                f'({stats.rows / stats.seconds if stats.seconds else 0:.0f} rows/s).'
+            )
+        )
+        if options['no_rebuild']:
+            return
+        # One rebuild for the whole import: bulk writes bypass the per-row signals.
+        reset_store()
+        if settings.COMPANY_SNAPSHOT_PATH:
+            snapshot = build_snapshot(settings.COMPANY_SNAPSHOT_PATH)
+            self.stdout.write(f'Rebuilt snapshot (version {snapshot.version}).')
+
+
+def _format_from_path(path: str) -> str | None:
+    suffix = Path(path).suffix.lower()
+    return {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(suffix)
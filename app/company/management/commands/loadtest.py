@@ -0,0 +1,89 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from company.benchmarks.load import (
+    DEFAULT_MIX,
+    INTERFACE_PATHS,
+    Scenario,
+    run_scenario,
+    seed_database,
+)
+from company.dataset import reset_store
+
+
+REPORTED_OPTIONS = ('companies', 'financials', 'requests', 'concurrency', 'seed')
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests the companies endpoints against a throwaway test database filled with '
+        'synthetic companies and reports latency percentiles, throughput, peak RSS and '
+        'cache hit ratio per scenario.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10000)
+        parser.add_argument('--financials', type=int, default=5, help='Financial rows per company.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--interfaces', default='wsgi,asgi', help='Comma-separated: wsgi, asgi.')
+        parser.add_argument('--cache', default='cold,warm', help='Comma-separated: cold, warm.')
+        parser.add_argument('--mix', default=None, help='JSON file: [{"params": {...}, "weight": n}].')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default=None, help='Write the JSON report to this file.')
+
+    def handle(self, *args, **options):
+        interfaces = [i for i in options['interfaces'].split(',') if i]
+        modes = [m for m in options['cache'].split(',') if m]
+        if not set(interfaces) <= INTERFACE_PATHS.keys() or not set(modes) <= {'cold', 'warm'}:
+            raise CommandError('Unknown interface or cache mode.')
+        mix = DEFAULT_MIX
+        if options['mix']:
+            with open(options['mix']) as f:
+                mix = json.load(f)
+
+        setup_test_environment()
+        # Never touch the real data: run against a throwaway test database.
+        old_name = connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            serialize=False,
+        )
+        try:
+            self.stdout.write(f'Seeding {options["companies"]} companies...')
+            seed_database(options['companies'], options['financials'], options['seed'])
+            reports = []
+            for interface in interfaces:
+                for mode in modes:
+                    cache.clear()
+                    reset_store()
+                    report = run_scenario(
+                        Scenario(interface, mode),
+                        mix,
+                        options['requests'],
+                        options['concurrency'],
+                        options['seed'],
+                    )
+                    reports.append(report)
+                    self.stdout.write(
+                        f'{report["scenario"]:<12} {report["rps"]:8.1f} req/s  '
+                        f'p50 {report["p50_ms"]:8.1f} ms  p95 {report["p95_ms"]:8.1f} ms  '
+                        f'p99 {report["p99_ms"]:8.1f} ms  hit {report["cache_hit_ratio"]:5.1%}  '
+                        f'rss {report["peak_rss_mb"]:7.1f} MB  errors {report["errors"]}'
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            report = {
+                'options': {key: options[key] for key in REPORTED_OPTIONS},
+                'scenarios': reports,
+            }
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {options["output"]}')
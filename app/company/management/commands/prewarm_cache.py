@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from company.prewarm import prewarm
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays the most frequent queries from the query log (COMPANY_QUERY_LOG_PATH) to fill '
+        'the response and result caches. The local-memory cache is per process, so this only '
+        'warms web workers sharing a cache backend; use COMPANY_PREWARM_ON_STARTUP otherwise.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=settings.COMPANY_PREWARM_TOP_N)
+        parser.add_argument(
+            '--budget',
+            type=float,
+            default=settings.COMPANY_PREWARM_BUDGET_S,
+            help='Seconds after which queries not yet started are skipped.',
+        )
+        parser.add_argument('--concurrency', type=int, default=settings.COMPANY_PREWARM_CONCURRENCY)
+
+    def handle(self, *args, **options):
+        if not settings.COMPANY_QUERY_LOG_PATH:
+            raise CommandError('Set COMPANY_QUERY_LOG_PATH to record and replay queries.')
+
+        report = prewarm(options['top'], options['budget'], options['concurrency'])
+        for params in report.failed:
+            self.stdout.write(f'failed: {params}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Warmed {len(report.warmed)} queries in {report.seconds:.1f}s '
+                f'({len(report.failed)} failed, {len(report.skipped)} skipped over budget).'
+            )
+        )
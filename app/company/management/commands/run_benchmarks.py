@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from company.benchmarks.suite import compare_reports, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the search/filter/sort micro-benchmarks over synthetic companies, '
+        'writes a JSON report and optionally compares it with a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000',
+            help='Comma-separated dataset sizes, e.g. 1000,10000,100000,1000000.',
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--financials', type=int, default=5, help='Financial rows per company.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--only', default=None, help='Run benchmarks whose name starts with this.')
+        parser.add_argument('--output', default=None, help='Write the JSON report to this file.')
+        parser.add_argument('--baseline', default=None, help='JSON report to compare against.')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Fractional slowdown that counts as a regression (default 0.2 = 20%%).',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        except ValueError as exc:
+            raise CommandError(f'Invalid --sizes: {options["sizes"]}') from exc
+
+        report = run_benchmarks(
+            sizes,
+            repeat=options['repeat'],
+            financials_per_company=options['financials'],
+            seed=options['seed'],
+            only=options['only'],
+            log=self.stdout.write,
+        )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f'Wrote {options["output"]}')
+
+        if not options['baseline']:
+            return
+        with open(options['baseline']) as f:
+            baseline = json.load(f)
+        comparison = compare_reports(report, baseline, options['threshold'])
+        for row in comparison:
+            line = (
+                f'{row["name"]:<28} n={row["size"]:<8} '
+                f'{row["baseline_s"] * 1000:10.2f} -> {row["current_s"] * 1000:10.2f} ms '
+                f'({row["ratio"]:.2f}x)'
+            )
+            self.stdout.write(self.style.ERROR(line) if row['regression'] else line)
+        regressions = [row for row in comparison if row['regression']]
+        if regressions:
+            raise CommandError(f'{len(regressions)} benchmark(s) regressed.')
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
@@ -1,6 +1,15 @@
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime
+
 from django.db import models
+from django.db.models import Count, Max
 
 from .queryset import SearchQuerySet
+from .rows import COMPANY_COLUMNS, DETAILS_COLUMNS, FINANCIAL_COLUMNS, CompanyRow, build_rows
+
+# Ids per ``id__in`` lookup; SQLite allows 999 query parameters on older builds.
+ROWS_BATCH_SIZE = 500
 
 
 class CompanyManager(models.Manager):
@@ -10,3 +19,74 @@ class CompanyManager(models.Manager):
                 self.select_related('details').prefetch_related('financials')
             )
         )
+
+    def all_as_rows(self):
+        """
+        Same dataset as ``all_with_related()``, loaded as compact ``CompanyRow``
+        records from two ``values_list()`` queries instead of model instances.
+        """
+        return SearchQuerySet(self.rows())
+
+    def rows(self, ids: Iterable[int] | None = None) -> list[CompanyRow]:
+        """
+        Loads ``CompanyRow`` records ordered by id, optionally only for ``ids``
+        (looked up ROWS_BATCH_SIZE at a time to stay under the database's
+        query parameter limit).
+        """
+        if ids is None:
+            return self._rows(self.order_by('id'), None)
+        ids = sorted(ids)
+        rows = []
+        for start in range(0, len(ids), ROWS_BATCH_SIZE):
+            rows.extend(self._rows(self.order_by('id'), ids[start : start + ROWS_BATCH_SIZE]))
+        return rows
+
+    def _rows(self, companies, ids: list[int] | None) -> list[CompanyRow]:
+        financials = self._related_model('financials').objects.order_by('company_id', 'id')
+        if ids is not None:
+            companies = companies.filter(id__in=ids)
+            financials = financials.filter(company_id__in=ids)
+
+        company_values = companies.values_list(
+            *COMPANY_COLUMNS,
+            *(f'details__{column}' for column in DETAILS_COLUMNS),
+        )
+        financial_values = financials.values_list('company_id', *FINANCIAL_COLUMNS)
+        return build_rows(company_values.iterator(), financial_values.iterator())
+
+    def changed_stamps(self, since: datetime) -> frozenset[tuple[str, int, int, datetime]]:
+        """
+        ``(table, pk, company_id, updated_at)`` of every company, details and
+        financial row stamped at or after ``since``.
+        """
+        companies = self.filter(updated_at__gte=since).values_list('id', 'updated_at')
+        stamps = {('company', pk, pk, stamp) for pk, stamp in companies}
+        for name in ('details', 'financials'):
+            related = self._related_model(name).objects.filter(updated_at__gte=since)
+            stamps.update(
+                (name, pk, company_id, stamp)
+                for pk, company_id, stamp in related.values_list('pk', 'company_id', 'updated_at')
+            )
+        return frozenset(stamps)
+
+    def dataset_version(self) -> str:
+        """
+        Cheap fingerprint of the company dataset (row counts, max ids and
+        latest ``updated_at`` of companies, details and financials). Changes
+        whenever rows are added, removed or saved.
+        """
+        parts = []
+        for model in self._tracked_models():
+            stats = model._default_manager.aggregate(
+                count=Count('id'),
+                max_id=Max('id'),
+                mark=Max('updated_at'),
+            )
+            parts.append(f"{stats['count']}:{stats['max_id']}:{stats['mark']}")
+        return hashlib.md5('/'.join(parts).encode()).hexdigest()
+
+    def _tracked_models(self) -> tuple[type[models.Model], ...]:
+        return self.model, self._related_model('details'), self._related_model('financials')
+
+    def _related_model(self, name: str) -> type[models.Model]:
+        return self.model._meta.get_field(name).related_model
@@ -0,0 +1,69 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import prewarm
+from .instrumentation import end_trace, metrics, start_trace
+
+
+class ServerTimingMiddleware:
+    """
+    Traces each request when COMPANY_INSTRUMENTATION_ENABLED is set and adds
+    the recorded stages as a ``Server-Timing`` header. Works under WSGI and
+    ASGI without forcing a sync/async switch.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.COMPANY_INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+        trace, token = start_trace(settings.COMPANY_INSTRUMENTATION_TRACEMALLOC)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_trace(token)
+        return self._finish(trace, response)
+
+    async def __acall__(self, request):
+        if not settings.COMPANY_INSTRUMENTATION_ENABLED:
+            return await self.get_response(request)
+        trace, token = start_trace(settings.COMPANY_INSTRUMENTATION_TRACEMALLOC)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_trace(token)
+        return self._finish(trace, response)
+
+    def _finish(self, trace, response):
+        if trace.stages:
+            response['Server-Timing'] = trace.server_timing()
+            metrics.increment('requests')
+        return response
+
+
+class PrewarmMiddleware:
+    """
+    Starts the startup cache prewarm (COMPANY_PREWARM_ON_STARTUP) on the first
+    request this worker process handles; see ``company.prewarm``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        prewarm.ensure_started()
+        return self.get_response(request)
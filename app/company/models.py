@@ -1,9 +1,29 @@
 from django.db import models
+from django.utils import timezone
 
 from .managers import CompanyManager
 
 
-class Company(models.Model):
+class TrackedModel(models.Model):
+    """
+    Stamps ``updated_at`` on every save. Writes that bypass ``save()`` (e.g.
+    ``QuerySet.update()``) must set it themselves so the company store's
+    high-water mark picks them up.
+    """
+
+    updated_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.updated_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        super().save(*args, **kwargs)
+
+
+class Company(TrackedModel):
     name = models.CharField(max_length=255)
     country = models.CharField(max_length=100)
     industry = models.CharField(max_length=100)
@@ -15,7 +35,7 @@ class Company(models.Model):
         return self.name
 
 
-class FinancialData(models.Model):
+class FinancialData(TrackedModel):
     company = models.ForeignKey(
         Company, related_name="financials", on_delete=models.CASCADE
     )
@@ -27,7 +47,7 @@ class FinancialData(models.Model):
         return f"{self.company.name} - {self.year}"
 
 
-class CompanyDetails(models.Model):
+class CompanyDetails(TrackedModel):
     company = models.OneToOneField(
         Company, related_name="details", on_delete=models.CASCADE
     )
@@ -0,0 +1,336 @@
+"""
+Compiled form of a ``CompanyQuery``: the condition trees that search and filter
+actually evaluate, with an access path and a selectivity estimate per
+predicate. Used for ``?explain=1``, the slow-query log and cost estimates.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Union
+
+from .aggregates import ValueCounts
+from .indexes import HashIndex
+from .query import CompanyQuery, run_query
+from .queryset import SearchQuerySet
+from .rows import COMPANY_COLUMNS
+from .utils.common.parsing import parse_query
+from .utils.filtering import parse_filter
+
+# Fallback fraction of rows a predicate keeps when no statistics apply.
+DEFAULT_SELECTIVITY = {
+    '=': 0.1,
+    ':': 0.2,
+    '~': 0.05,
+    '>': 1 / 3,
+    '<': 1 / 3,
+    '>=': 1 / 3,
+    '<=': 1 / 3,
+}
+
+# Estimated microseconds to evaluate a predicate on one row with ``match()``.
+OPERATOR_COST_US = {
+    '=': 2.0,
+    ':': 2.0,
+    '~': 45.0,  # difflib ratio per row
+    '>': 2.0,
+    '<': 2.0,
+    '>=': 2.0,
+    '<=': 2.0,
+}
+# Fields resolved through related rows (e.g. revenue over financials) cost this much more.
+RELATED_FIELD_FACTOR = 15
+# Per id returned by a hash index lookup.
+INDEX_ROW_COST_US = 0.2
+# Merge sort per row, per log2(rows) and sort field; maintained permutations per dataset row.
+SORT_ROW_COST_US = 9.0
+SORT_INDEX_ROW_COST_US = 0.3
+SERIALIZE_ROW_COST_US = 50.0
+
+
+@dataclass
+class Predicate:
+    field: str
+    op: str
+    value: Any
+    access: str = 'scan'
+    selectivity: float = 1.0
+
+    def to_dict(self) -> dict:
+        return {
+            'field': self.field,
+            'op': self.op,
+            'value': self.value,
+            'access': self.access,
+            'selectivity': round(self.selectivity, 4),
+        }
+
+    def cost_us(self, rows: float, total_rows: int) -> float:
+        """Estimated time to evaluate this predicate over ``rows`` candidate rows."""
+        if self.access == 'index':
+            return total_rows * self.selectivity * INDEX_ROW_COST_US
+        root = self.field.split('__')[0]
+        related = root not in COMPANY_COLUMNS and root != 'details'
+        per_row = OPERATOR_COST_US.get(self.op, 2.0) * (RELATED_FIELD_FACTOR if related else 1)
+        items = len(self.value) if isinstance(self.value, tuple) else 1
+        return rows * per_row * items
+
+    def normalized(self) -> str:
+        items = self.value if isinstance(self.value, tuple) else (self.value,)
+        items = [f'"{v}"' if isinstance(v, str) and (not v or ' ' in v) else str(v) for v in items]
+        value = f'[{",".join(items)}]' if isinstance(self.value, tuple) else items[0]
+        return f'{self.field}{self.op}{value}'
+
+
+@dataclass
+class BoolNode:
+    op: str  # 'AND' or 'OR'
+    left: 'Node'
+    right: 'Node'
+
+    @property
+    def selectivity(self) -> float:
+        left, right = self.left.selectivity, self.right.selectivity
+        if self.op == 'AND':
+            return left * right
+        return left + right - left * right
+
+    def predicates(self) -> list[Predicate]:
+        return _predicates(self.left) + _predicates(self.right)
+
+    def to_dict(self) -> dict:
+        return {
+            'op': self.op,
+            'selectivity': round(self.selectivity, 4),
+            'children': [self.left.to_dict(), self.right.to_dict()],
+        }
+
+    def normalized(self) -> str:
+        return f'{self.left.normalized()} {self.op} {self.right.normalized()}'
+
+
+Node = Union[Predicate, BoolNode]
+
+
+def _predicates(node: Node) -> list[Predicate]:
+    return node.predicates() if isinstance(node, BoolNode) else [node]
+
+
+@dataclass
+class QueryPlan:
+    query: CompanyQuery
+    total_rows: int
+    search: Node | None = None
+    filter: Node | None = None
+    sort: list[str] = field(default_factory=list)
+
+    def predicates(self) -> list[Predicate]:
+        return [p for node in (self.search, self.filter) if node for p in _predicates(node)]
+
+    def estimated_rows(self) -> dict[str, int]:
+        """Estimated rows out of each stage, in pipeline order."""
+        rows = float(self.total_rows)
+        estimates = {'load': self.total_rows}
+        if self.query.search:
+            rows *= self.search.selectivity if self.search else 1.0
+            estimates['search'] = round(rows)
+        if self.query.filter:
+            # An expression without parseable conditions matches nothing.
+            rows *= self.filter.selectivity if self.filter else 0.0
+            estimates['filter'] = round(rows)
+        if self.query.sort:
+            estimates['sort'] = round(rows)
+        return estimates
+
+    def estimated_cost(
+        self,
+        page_size: int | None = None,
+        sort_covered: bool = False,
+    ) -> dict[str, float]:
+        """
+        Estimated milliseconds per stage and in ``'total'``, from operator
+        costs, table size, index access and selectivity. ``page_size`` bounds
+        serialization (0: nothing is serialized); ``sort_covered`` means the sort uses maintained
+        permutations.
+        """
+        estimates = self.estimated_rows()
+        costs = {}
+        rows = float(self.total_rows)
+        if 'search' in estimates:
+            # An AND chain: indexed predicates narrow the rows the others check.
+            predicates = _predicates(self.search) if self.search else []
+            predicates = [p for p in predicates if p.access == 'index'] + [
+                p for p in predicates if p.access != 'index'
+            ]
+            costs['search'] = 0.0
+            for predicate in predicates:
+                costs['search'] += predicate.cost_us(rows, self.total_rows)
+                rows *= predicate.selectivity
+        if 'filter' in estimates:
+            # Every condition of the fold is evaluated on every row.
+            predicates = _predicates(self.filter) if self.filter else []
+            costs['filter'] = sum(p.cost_us(rows, self.total_rows) for p in predicates)
+            rows = estimates['filter']
+        if self.sort:
+            if sort_covered:
+                costs['sort'] = self.total_rows * SORT_INDEX_ROW_COST_US
+            else:
+                costs['sort'] = rows * math.log2(max(rows, 2)) * SORT_ROW_COST_US * len(self.sort)
+        serialized = rows if page_size is None else min(rows, page_size)
+        costs['serialize'] = serialized * SERIALIZE_ROW_COST_US
+        costs = {stage: us / 1000 for stage, us in costs.items()}
+        costs['total'] = sum(costs.values())
+        return {stage: round(ms, 3) for stage, ms in costs.items()}
+
+    def normalized(self) -> str:
+        """Canonical text of the query: same conditions -> same string."""
+        parts = []
+        if self.query.search:
+            parts.append(f'search={self.search.normalized() if self.search else ""}')
+        if self.query.filter:
+            parts.append(f'filter={self.filter.normalized() if self.filter else ""}')
+        if self.sort:
+            parts.append(f'sort={",".join(self.sort)}')
+        return '&'.join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            'search': self.search.to_dict() if self.search else None,
+            'filter': self.filter.to_dict() if self.filter else None,
+            'sort': self.sort,
+        }
+
+
+def compile_query(
+    query: CompanyQuery,
+    total_rows: int,
+    value_counts: ValueCounts | None = None,
+    index: HashIndex | None = None,
+) -> QueryPlan:
+    """
+    Builds the plan the pipeline will execute. Search conditions are an AND
+    chain; filter conditions are folded left to right exactly like
+    ``evaluate_filter`` (AND and OR have equal precedence). Conditions the
+    hash ``index`` can answer get the 'index' access path and an exact
+    selectivity.
+    """
+    plan = QueryPlan(query=query, total_rows=total_rows)
+    stats = (total_rows, value_counts, index)
+    if query.search:
+        plan.search = _and_chain([_predicate(c, *stats) for c in parse_query(query.search)])
+    if query.filter:
+        plan.filter = _fold(parse_filter(query.filter), stats)
+    if query.sort:
+        plan.sort = [f.strip() for f in query.sort.split(',') if f.strip()]
+    return plan
+
+
+def _and_chain(predicates: list[Predicate]) -> Node | None:
+    node = None
+    for predicate in predicates:
+        node = predicate if node is None else BoolNode('AND', node, predicate)
+    return node
+
+
+def _fold(tokens: list, stats: tuple) -> Node | None:
+    node = None
+    op = None
+    for token in tokens:
+        if isinstance(token, dict):
+            predicate = _predicate(token, *stats)
+            if node is None:
+                node = predicate
+            elif op in ('AND', 'OR'):
+                node = BoolNode(op, node, predicate)
+        elif token in ('AND', 'OR'):
+            op = token
+    return node
+
+
+def _predicate(
+    cond: dict,
+    total_rows: int,
+    value_counts: ValueCounts | None,
+    index: HashIndex | None,
+) -> Predicate:
+    predicate = Predicate(cond['field'], cond['op'], cond['value'])
+    if index is not None and index.covers(cond):
+        predicate.access = 'index'
+        predicate.selectivity = len(index.lookup(cond)) / total_rows if total_rows else 0.0
+    else:
+        predicate.selectivity = _estimate_selectivity(predicate, total_rows, value_counts)
+    return predicate
+
+
+def _estimate_selectivity(
+    predicate: Predicate,
+    total_rows: int,
+    value_counts: ValueCounts | None,
+) -> float:
+    items = predicate.value if isinstance(predicate.value, tuple) else (predicate.value,)
+    values = value_counts.values(predicate.field) if value_counts else {}
+    if values and total_rows and predicate.op in ('=', ':'):
+        matched = 0
+        for value in items:
+            if predicate.op == ':' and isinstance(value, str):
+                matched += sum(
+                    count for v, count in values.items()
+                    if isinstance(v, str) and value.lower() in v.lower()
+                )
+            else:
+                matched += values.get(value, 0)
+        return min(matched / total_rows, 1.0)
+    return min(DEFAULT_SELECTIVITY.get(predicate.op, 1.0) * len(items), 1.0)
+
+
+def explain(
+    plan: QueryPlan,
+    companies: SearchQuerySet,
+    load_seconds: float,
+    response_cache: str,
+) -> dict:
+    """
+    Executes ``plan`` (EXPLAIN ANALYZE style) and reports estimated vs actual
+    rows and time per stage, with chunk statistics for chunked scans. No
+    response is cached, but the matches go into the store's result cache as
+    for any query run (see ``run_query``).
+    """
+    estimates = plan.estimated_rows()
+    stages = [
+        {
+            'stage': 'load',
+            'estimated_rows': estimates['load'],
+            'actual_rows': len(companies),
+            'time_ms': round(load_seconds * 1000, 3),
+        },
+    ]
+
+    def observe(stage: str, rows: int, seconds: float) -> None:
+        stages.append(
+            {
+                'stage': stage,
+                'estimated_rows': estimates.get(stage),
+                'actual_rows': rows,
+                'time_ms': round(seconds * 1000, 3),
+            }
+        )
+
+    start = time.perf_counter()
+    result = run_query(companies, plan.query, observer=observe)
+    total_ms = load_seconds * 1000 + (time.perf_counter() - start) * 1000
+    for stage in stages:
+        if stage['stage'] in result.chunk_stats:
+            stage['chunks'] = result.chunk_stats[stage['stage']]
+    return {
+        'query': {
+            'search': plan.query.search,
+            'filter': plan.query.filter,
+            'sort': plan.query.sort,
+        },
+        'normalized': plan.normalized(),
+        'response_cache': response_cache,
+        'plan': plan.to_dict(),
+        'estimated_cost_ms': plan.estimated_cost(),
+        'stages': stages,
+        'total_time_ms': round(total_ms, 3),
+    }
@@ -0,0 +1,124 @@
+"""
+Replays the most frequent recorded queries after boot so the response cache
+and the store's result cache are warm before traffic arrives.
+
+With COMPANY_PREWARM_ON_STARTUP set, ``PrewarmMiddleware`` calls
+``ensure_started()`` on each worker's first request, which prewarms in a
+background thread; ``is_ready()`` stays False until it is done and the
+readiness endpoint reports that state. It is not started from
+``AppConfig.ready()``: under ``gunicorn --preload`` that runs in the master,
+and its thread does not survive the fork into the workers.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+
+from . import query_log
+from .api import CompanyApi
+from .dataset import get_store
+
+_ready = threading.Event()
+_started_pid: int | None = None
+_start_lock = threading.Lock()
+
+
+@dataclass
+class PrewarmReport:
+    warmed: list[dict] = field(default_factory=list)
+    failed: list[dict] = field(default_factory=list)
+    skipped: list[dict] = field(default_factory=list)  # not started within the time budget
+    seconds: float = 0.0
+
+
+def prewarm(top_n: int, budget_s: float, concurrency: int) -> PrewarmReport:
+    """
+    Runs the ``top_n`` most frequent recorded queries through the companies
+    endpoint, ``concurrency`` at a time. Queries not started within
+    ``budget_s`` seconds are skipped; running ones are not interrupted.
+    """
+    start = time.monotonic()
+    report = PrewarmReport()
+    queries = [params for params, _ in query_log.top_queries(top_n)]
+    if not queries:
+        return report
+    get_store()  # load once up front rather than in every worker
+    deadline = start + budget_s
+    main = threading.current_thread()
+
+    def warm(params: dict) -> None:
+        if time.monotonic() >= deadline:
+            report.skipped.append(params)
+            return
+        try:
+            ok = _replay(params)
+        except Exception:
+            ok = False
+        finally:
+            if threading.current_thread() is not main:
+                connection.close()
+        (report.warmed if ok else report.failed).append(params)
+
+    if concurrency <= 1:
+        for params in queries:
+            warm(params)
+    else:
+        with ThreadPoolExecutor(concurrency, thread_name_prefix='company-prewarm') as executor:
+            list(executor.map(warm, queries))
+    report.seconds = time.monotonic() - start
+    return report
+
+
+def start() -> threading.Thread:
+    """Prewarms with the COMPANY_PREWARM_* settings in the background, then marks ready."""
+
+    def run():
+        try:
+            prewarm(
+                settings.COMPANY_PREWARM_TOP_N,
+                settings.COMPANY_PREWARM_BUDGET_S,
+                settings.COMPANY_PREWARM_CONCURRENCY,
+            )
+        finally:
+            connection.close()
+            _ready.set()
+
+    _ready.clear()
+    thread = threading.Thread(target=run, name='company-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def ensure_started() -> None:
+    """Starts the startup prewarm once per process, when COMPANY_PREWARM_ON_STARTUP is set."""
+    global _started_pid
+    if not settings.COMPANY_PREWARM_ON_STARTUP or _started_pid == os.getpid():
+        return
+    with _start_lock:
+        if _started_pid != os.getpid():
+            _started_pid = os.getpid()
+            start()
+
+
+def is_ready() -> bool:
+    """False only while a startup prewarm is running or pending."""
+    return _ready.is_set() or not settings.COMPANY_PREWARM_ON_STARTUP
+
+
+def _replay(params: dict) -> bool:
+    request = RequestFactory().get(
+        reverse('company'), params, SERVER_NAME=_host(), HTTP_X_COMPANY_PREWARM='1',
+    )
+    return CompanyApi.as_view()(request).status_code == 200
+
+
+def _host() -> str:
+    hosts = [h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
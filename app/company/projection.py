@@ -0,0 +1,74 @@
+"""
+``fields=`` projection and the relation-aware load plan derived from it.
+
+A query needs a relation when one of its search/filter/sort fields resolves
+through it or the client asked for it. Field resolution mirrors matching:
+``details__size`` and ``size`` read details, ``financials__revenue`` and
+``revenue`` read financials, and an unknown field is looked up across every
+relation.
+"""
+
+from dataclasses import dataclass
+
+from .query import CompanyQuery
+from .rows import COMPANY_COLUMNS, DETAILS_COLUMNS, FINANCIAL_COLUMNS
+from .utils.common.lexer import parse_filter, parse_search
+
+RELATIONS = {'details': DETAILS_COLUMNS, 'financials': FINANCIAL_COLUMNS}
+# What CompanySerializer emits, in order.
+FIELDS = (*COMPANY_COLUMNS[1:], *RELATIONS)
+
+
+@dataclass(frozen=True)
+class LoadPlan:
+    """Company columns and relations a query and its projection read."""
+
+    columns: tuple[str, ...]
+    details: bool
+    financials: bool
+
+    def to_dict(self) -> dict:
+        return {
+            'columns': list(self.columns),
+            'details': self.details,
+            'financials': self.financials,
+        }
+
+
+def parse_fields(raw: str | None) -> tuple[str, ...] | None:
+    """``'name,financials'`` -> ``('name', 'financials')``; None or blank means every field."""
+    if not raw or not raw.strip():
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    if not fields:
+        raise ValueError(f'Name at least one field. Choose from {", ".join(FIELDS)}.')
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}. Choose from {", ".join(FIELDS)}.')
+    return tuple(f for f in FIELDS if f in fields)
+
+
+def plan_loading(query: CompanyQuery, fields: tuple[str, ...] | None = None) -> LoadPlan:
+    """The columns and relations needed to evaluate ``query`` and emit ``fields``."""
+    needed = set(FIELDS if fields is None else fields)
+    for name in _query_fields(query):
+        root = name.split('__')[0]
+        if root in COMPANY_COLUMNS or root in RELATIONS:
+            needed.add(root)
+            continue
+        related = [relation for relation, columns in RELATIONS.items() if root in columns]
+        needed.update(related or RELATIONS)
+    return LoadPlan(
+        columns=tuple(c for c in COMPANY_COLUMNS if c in needed or c == 'id'),
+        details='details' in needed,
+        financials='financials' in needed,
+    )
+
+
+def _query_fields(query: CompanyQuery) -> list[str]:
+    names = [c['field'] for c in parse_search(query.search)]
+    if query.filter:
+        names.extend(t['field'] for t in parse_filter(query.filter) if isinstance(t, dict))
+    if query.sort:
+        names.extend(f.strip().lstrip('-') for f in query.sort.split(',') if f.strip())
+    return names
@@ -0,0 +1,214 @@
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .chunking import ChunkScheduler
+from .deadline import QueryTimeout, check_deadline, deadline
+from .instrumentation import increment, span
+from .queryset import SearchQuerySet
+from .utils.common.lexer import QuerySyntaxError, parse_filter, parse_search
+from .utils.common.parsing import match
+from .utils.filtering import evaluate_filter
+
+
+@dataclass(frozen=True)
+class CompanyQuery:
+    """
+    One search/filter/sort request against the company dataset, independent
+    of how it arrived (query string, batch body, replay).
+    """
+
+    search: str | None = None
+    filter: str | None = None
+    sort: str | None = None
+
+    @classmethod
+    def from_params(cls, params: Mapping) -> 'CompanyQuery':
+        return cls(
+            search=params.get('search') or None,
+            filter=params.get('filter') or None,
+            sort=params.get('sort') or None,
+        )
+
+    def match_key(self) -> tuple:
+        """
+        Normalized search/filter: equal for queries selecting the same companies
+        however they are spelled (spacing, keyword case, search condition order).
+        """
+
+        def conditions(tokens):
+            return tuple(
+                (t['field'], t['op'], type(t['value']).__name__, t['value'])
+                if isinstance(t, dict) else t
+                for t in tokens
+            )
+
+        return (
+            tuple(sorted(conditions(parse_search(self.search)), key=repr)),
+            conditions(parse_filter(self.filter) if self.filter else []),
+        )
+
+    def syntax_errors(self) -> dict[str, str]:
+        """Parse errors by parameter, e.g. {'filter': 'expected AND or OR at position 14'}."""
+        errors = {}
+        for param, parse in (('search', parse_search), ('filter', parse_filter)):
+            try:
+                parse(getattr(self, param))
+            except QuerySyntaxError as exc:
+                errors[param] = str(exc)
+        return errors
+
+
+StageObserver = Callable[[str, int, float], None]
+
+
+def run_query(
+    companies: SearchQuerySet,
+    query: CompanyQuery,
+    observer: StageObserver | None = None,
+) -> SearchQuerySet:
+    """
+    Applies search, then filter, then sort to ``companies``.
+
+    When ``companies`` is a full store, the ids matching search+filter are
+    looked up in (and added to) its ``'results'`` cache first, so another sort
+    order or page of the same query only pays for the sort, and the sort uses
+    its ``'sorts'`` permutations.
+
+    ``observer(stage, rows_out, seconds)`` is called after each stage that ran.
+
+    Under a ``deadline()``, a ``QueryTimeout`` carries the rows matched so far
+    as ``partial``: matches among the rows scanned when search or filter was
+    interrupted, or all matches, unsorted, when sort was.
+    """
+    start = time.perf_counter()
+    store = companies.store
+    results = store.listeners.get('results') if store is not None else None
+    key = ids = None
+    if results is not None and (query.search or query.filter):
+        generation, key = store.generation, query.match_key()
+        ids = results.get(generation, key)
+        increment('result_cache_hits' if ids is not None else 'result_cache_misses')
+    if ids is not None:
+        companies = SearchQuerySet([row for row in map(store.get, ids) if row is not None])
+        _observe(observer, 'result_cache', companies, start)
+    else:
+        companies = _match(companies, query, observer, start)
+        if key is not None:
+            results.put(generation, key, companies.to_list())
+    start = time.perf_counter()
+    if query.sort:
+        sort_index = store.listeners.get('sorts') if store is not None else None
+        try:
+            companies = companies.sort(query.sort, sort_index)
+        except QueryTimeout as exc:
+            exc.partial = companies.to_list()  # all matches, unsorted
+            raise
+        _observe(observer, 'sort', companies, start)
+    return companies
+
+
+def _match(
+    companies: SearchQuerySet,
+    query: CompanyQuery,
+    observer: StageObserver | None,
+    start: float,
+) -> SearchQuerySet:
+    chunk_stats = {}
+    if query.search:
+        # companies = companies.search(query.search)
+        scheduler = ChunkScheduler.for_rows(companies)
+        try:
+            companies = _collect(companies.search_chunked(query.search, scheduler=scheduler))
+        except QueryTimeout as exc:
+            if query.filter:
+                exc.partial = _filter_partial(exc.partial, query.filter)
+            raise
+        stats = scheduler.stats()
+        if stats['chunks']:
+            chunk_stats['search'] = stats
+        start = _observe(observer, 'search', companies, start)
+    if query.filter:
+        # companies = companies.filter(query.filter)
+        scheduler = ChunkScheduler.for_rows(companies)
+        companies = _collect(companies.filter_chunked(query.filter, scheduler=scheduler))
+        stats = scheduler.stats()
+        if stats['chunks']:
+            chunk_stats['filter'] = stats
+        start = _observe(observer, 'filter', companies, start)
+    companies.chunk_stats = chunk_stats
+    return companies
+
+
+def _filter_partial(partial: list, raw_filter: str) -> list | None:
+    """
+    The filter applied to the rows a timed-out search got through, given
+    COMPANY_CHUNK_TARGET_MS (one chunk's time) past the deadline; None, so no
+    partial result, if it needs longer.
+    """
+    grace = time.monotonic() + settings.COMPANY_CHUNK_TARGET_MS / 1000
+    try:
+        with deadline(grace):
+            return _collect(SearchQuerySet(partial).filter_chunked(raw_filter)).to_list()
+    except QueryTimeout:
+        return None
+
+
+def _collect(chunks) -> SearchQuerySet:
+    """
+    Concatenates chunk results; on a timeout, the rows so far become its
+    ``partial``. Matches are references to the input rows, so this list costs
+    a pointer per match; the rows' serialized form is what ``CompanyApi``
+    streams in chunks once it would exceed COMPANY_RESPONSE_MEMORY_BUDGET_BYTES.
+    """
+    rows = []
+    try:
+        for chunk in chunks:
+            rows.extend(chunk)
+    except QueryTimeout as exc:
+        exc.partial = rows
+        raise
+    return SearchQuerySet(rows)
+
+
+def count_matches(companies: SearchQuerySet, query: CompanyQuery) -> int:
+    """Number of companies matching ``query``'s search and filter; sort is skipped."""
+    return len(run_query(companies, CompanyQuery(search=query.search, filter=query.filter)))
+
+
+def any_match(companies: SearchQuerySet, query: CompanyQuery) -> bool:
+    """
+    Whether any company matches ``query``'s search and filter. Uses the hash
+    indexes when a condition is indexed, otherwise stops at the first match.
+    """
+    conditions = parse_search(query.search)
+    expr = parse_filter(query.filter) if query.filter else None
+    index = companies.index
+    if index is not None and any(
+        isinstance(cond, dict) and index.covers(cond) for cond in conditions + (expr or [])
+    ):
+        return count_matches(companies, query) > 0
+
+    found = False
+    scanned = 0
+    with span('exists'):
+        for row in companies:
+            if not scanned % 500:
+                check_deadline('exists', scanned=scanned)
+            scanned += 1
+            if all(match(row, cond) for cond in conditions) and (
+                expr is None or evaluate_filter(row, expr)
+            ):
+                found = True
+                break
+    increment('rows_scanned', scanned)
+    return found
+
+
+def _observe(observer: StageObserver | None, stage: str, companies, start: float) -> float:
+    now = time.perf_counter()
+    if observer is not None:
+        observer(stage, len(companies), now - start)
+    return now
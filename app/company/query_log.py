@@ -0,0 +1,86 @@
+"""
+Frequencies of the companies queries this deployment serves.
+
+``record()`` counts each query's parameters in process; every
+COMPANY_QUERY_LOG_FLUSH_INTERVAL seconds the counts are merged into the JSON
+file at COMPANY_QUERY_LOG_PATH, shared by all workers and kept across
+restarts, so ``top_queries()`` can tell what to replay after a deploy.
+"""
+
+import fcntl
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from pathlib import Path
+
+from django.conf import settings
+
+# Parameters that select a different answer than the cached company list.
+IGNORED_PARAMS = ('explain', 'count', 'exists')
+
+_counts: Counter[str] = Counter()
+_flushed_at = time.monotonic()
+_lock = threading.Lock()
+
+
+def normalize(params: Mapping[str, str]) -> str:
+    """The parameters that make up a query's response cache key, as a stable string."""
+    kept = {k: v for k, v in params.items() if k not in IGNORED_PARAMS and v != ''}
+    return json.dumps(sorted(kept.items()))
+
+
+def record(params: Mapping[str, str]) -> None:
+    """Counts one request for ``params``. A no-op unless COMPANY_QUERY_LOG_PATH is set."""
+    global _flushed_at
+    if not settings.COMPANY_QUERY_LOG_PATH:
+        return
+    key = normalize(params)
+    with _lock:
+        _counts[key] += 1
+        now = time.monotonic()
+        if now - _flushed_at < settings.COMPANY_QUERY_LOG_FLUSH_INTERVAL:
+            return
+        pending = _counts.copy()
+        _counts.clear()
+        _flushed_at = now
+    flush(pending)
+
+
+def flush(pending: Counter[str] | None = None) -> None:
+    """Merges ``pending`` (default: this process's unflushed counts) into the log file."""
+    if pending is None:
+        with _lock:
+            pending = _counts.copy()
+            _counts.clear()
+    if not pending or not settings.COMPANY_QUERY_LOG_PATH:
+        return
+    path = Path(settings.COMPANY_QUERY_LOG_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f'{path.name}.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            counts = _read(path) + pending
+            kept = dict(counts.most_common(settings.COMPANY_QUERY_LOG_MAX_ENTRIES))
+            tmp = path.with_name(f'{path.name}.tmp')
+            tmp.write_text(json.dumps(kept))
+            tmp.replace(path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def top_queries(n: int) -> list[tuple[dict[str, str], int]]:
+    """The ``n`` most frequent recorded queries as (params, count), most frequent first."""
+    path = settings.COMPANY_QUERY_LOG_PATH
+    counts = _read(Path(path)) if path else Counter()
+    with _lock:
+        counts += _counts
+    return [(dict(json.loads(key)), count) for key, count in counts.most_common(n)]
+
+
+def _read(path: Path) -> Counter[str]:
+    try:
+        return Counter(json.loads(path.read_text()))
+    except (FileNotFoundError, ValueError):
+        return Counter()
@@ -1,14 +1,24 @@
+import time
 from typing import Any
 
+from .chunking import ChunkScheduler
+from .deadline import check_deadline
+from .indexes import search_expression, select
+from .instrumentation import increment, span
 from .utils.common.parsing import parse_query
-from .utils.filtering import apply_filter
+from .utils.filtering import apply_filter, parse_filter
 from .utils.searching import apply_search
 from .utils.sorting import create_sort_key, merge_sort
 
 
 class SearchQuerySet:
-    def __init__(self, data: list[Any]):
+    def __init__(self, data: list[Any], store=None, chunk_stats: dict | None = None):
+        # ``store``: the CompanyStore whose full row list ``data`` is, which lets
+        # search and filter answer indexed conditions without scanning.
+        # ``chunk_stats``: ``ChunkScheduler.stats()`` per chunked stage that produced ``data``.
         self._data = data
+        self._store = store
+        self.chunk_stats = chunk_stats or {}
 
     def __iter__(self):
         return iter(self._data)
@@ -20,34 +30,112 @@ class SearchQuerySet:
         return len(self._data)
 
     def to_list(self) -> list:
-        return self._data
+        return self._data if isinstance(self._data, list) else list(self._data)
 
     def chunked(self, chunk_size: int):
         for i in range(0, len(self._data), chunk_size):
             yield self._data[i : i + chunk_size]
 
     def search(self, raw_query: str) -> 'SearchQuerySet':
-        conditions = parse_query(raw_query)
-        filtered = apply_search(self._data, conditions)
+        with span('search'):
+            conditions = parse_query(raw_query)
+            indexed = self._select(search_expression(conditions, self.index))
+            if indexed is not None:
+                return SearchQuerySet(indexed)
+            filtered = apply_search(self._data, conditions)
+        increment('rows_scanned', len(self._data))
         return SearchQuerySet(filtered)
 
-    def search_chunked(self, raw_query: str, chunk_size: int = 500):
-        conditions = parse_query(raw_query)
-        for chunk in self.chunked(chunk_size):
-            filtered = apply_search(chunk, conditions)
-            yield SearchQuerySet(filtered)
+    def search_chunked(
+        self,
+        raw_query: str,
+        chunk_size: int | None = None,
+        scheduler: ChunkScheduler | None = None,
+    ):
+        # Without ``chunk_size``, chunks are sized by ``scheduler`` (by default
+        # one for these rows); it keeps the chunk statistics.
+        with span('search'):
+            conditions = parse_query(raw_query)
+            indexed = self._select(search_expression(conditions, self.index))
+            if indexed is not None:
+                yield SearchQuerySet(indexed)
+                return
+            scheduler = scheduler or self._scheduler(chunk_size)
+            for offset, chunk in scheduler.chunks(self._data):
+                check_deadline('search', scanned=offset)
+                start = time.perf_counter()
+                filtered = apply_search(chunk, conditions)
+                scheduler.record(len(chunk), time.perf_counter() - start)
+                increment('rows_scanned', len(chunk))
+                yield SearchQuerySet(filtered)
 
-    def sort(self, sort_param: str) -> 'SearchQuerySet':
-        sort_fields = [f.strip() for f in sort_param.split(',') if f.strip()] if sort_param else []
-        sort_key = create_sort_key(sort_fields)
-        sorted_data = merge_sort(self._data, key=sort_key)
-        return SearchQuerySet(sorted_data)
+    def sort(self, sort_param: str, sort_index=None) -> 'SearchQuerySet':
+        # ``sort_index``: a SortIndex over the store these rows come from; used
+        # instead of comparing sort keys when it maintains every sort field.
+        with span('sort'):
+            sort_fields = (
+                [f.strip() for f in sort_param.split(',') if f.strip()] if sort_param else []
+            )
+            sorted_data = sort_index.sort(self._data, sort_fields) if sort_index else None
+            if sorted_data is not None:
+                increment('sort_index_hits')
+            else:
+                sort_key = create_sort_key(sort_fields)
+                sorted_data = merge_sort(self._data, key=sort_key)
+        return SearchQuerySet(sorted_data, chunk_stats=self.chunk_stats)
 
     def filter(self, raw_query: str) -> 'SearchQuerySet':
-        filtered = apply_filter(self._data, raw_query)
+        with span('filter'):
+            indexed = self._select(parse_filter(raw_query)) if raw_query else None
+            if indexed is not None:
+                return SearchQuerySet(indexed)
+            filtered = apply_filter(self._data, raw_query)
+        increment('rows_scanned', len(self._data))
         return SearchQuerySet(filtered)
 
-    def filter_chunked(self, raw_query: str, chunk_size: int = 500):
-        for chunk in self.chunked(chunk_size):
-            filtered = apply_filter(chunk, raw_query)
-            yield SearchQuerySet(filtered)
+    def filter_chunked(
+        self,
+        raw_query: str,
+        chunk_size: int | None = None,
+        scheduler: ChunkScheduler | None = None,
+    ):
+        with span('filter'):
+            indexed = self._select(parse_filter(raw_query)) if raw_query else None
+            if indexed is not None:
+                yield SearchQuerySet(indexed)
+                return
+            scheduler = scheduler or self._scheduler(chunk_size)
+            for offset, chunk in scheduler.chunks(self._data):
+                check_deadline('filter', scanned=offset)
+                start = time.perf_counter()
+                filtered = apply_filter(chunk, raw_query)
+                scheduler.record(len(chunk), time.perf_counter() - start)
+                increment('rows_scanned', len(chunk))
+                yield SearchQuerySet(filtered)
+
+    @property
+    def store(self):
+        """The ``CompanyStore`` whose full row list this is, if any."""
+        return self._store
+
+    @property
+    def index(self):
+        """The backing store's ``HashIndex``, if this is a full store row list."""
+        return self._store.listeners.get('indexes') if self._store is not None else None
+
+    def _scheduler(self, chunk_size: int | None) -> ChunkScheduler:
+        if chunk_size:
+            return ChunkScheduler.fixed(chunk_size)
+        return ChunkScheduler.for_rows(self._data)
+
+    def _select(self, expr: list) -> list | None:
+        """Rows matching ``expr`` through the store's hash indexes, or None."""
+        if self._store is None:
+            return None
+        selected = select(self._store, expr)
+        if selected is None:
+            return None
+        rows, scanned = selected
+        increment('index_lookups')
+        increment('rows_scanned', scanned)
+        return rows
@@ -0,0 +1,78 @@
+"""
+Columnar output formats for machine clients of ``CompanyApi``.
+
+Selected with ``Accept: application/vnd.company.columnar+json`` (or
+``?format=columnar``) and ``Accept: application/msgpack``
+(``?format=msgpack``). Both carry the same
+layout, encoded straight from the rows without serializer instances::
+
+    {"length": 2,
+     "columns": {"name": [...], "country": [...], "industry": [...], "founded_year": [...],
+                 "details": {"company_type": [...], ...},
+                 "financials": {"offsets": [0, 2, 3], "year": [...], ...}}}
+
+Company ``i`` has ``details.<field>[i]`` (all null without details) and the
+financials ``offsets[i]:offsets[i + 1]`` of every financials column, as in an
+Arrow list column.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .rows import COMPANY_COLUMNS, DETAILS_COLUMNS, FINANCIAL_COLUMNS
+
+COLUMNS = COMPANY_COLUMNS[1:]  # the fields CompanySerializer emits
+
+
+def to_columns(rows: Iterable[Any], fields: tuple[str, ...] | None = None) -> dict:
+    """
+    The columnar layout for ``rows`` (``CompanyRow``-like records), limited to
+    the ``fields`` projection when given.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    columns = {
+        name: [getattr(row, name) for row in rows]
+        for name in COLUMNS
+        if fields is None or name in fields
+    }
+    if fields is None or 'details' in fields:
+        details = [row.details for row in rows]
+        columns['details'] = {
+            name: [None if d is None else getattr(d, name) for d in details]
+            for name in DETAILS_COLUMNS
+        }
+    if fields is None or 'financials' in fields:
+        financials = []
+        offsets = [0]
+        for row in rows:
+            financials.extend(row.financials)
+            offsets.append(len(financials))
+        columns['financials'] = {'offsets': offsets}
+        for name in FINANCIAL_COLUMNS:
+            columns['financials'][name] = [getattr(f, name) for f in financials]
+    return {'length': len(rows), 'columns': columns}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.company.columnar+json'
+    format = 'columnar'
+    columnar = True
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    columnar = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True)
+
+
+COLUMNAR_RENDERERS = [ColumnarJSONRenderer, MessagePackRenderer]
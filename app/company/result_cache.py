@@ -0,0 +1,62 @@
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from .rows import Row
+from .store import Delta
+
+
+class ResultCache:
+    """
+    Ids of the companies matching each normalized search/filter combination,
+    for one ``CompanyStore``. Entries are keyed by the store generation they
+    were computed at, and every delta clears the cache, so a result is never
+    served for a dataset it was not computed from.
+
+    Least recently used entries are evicted once more than ``max_ids`` ids
+    are held in total.
+    """
+
+    def __init__(self, max_ids: int):
+        self.max_ids = max_ids
+        self._entries: OrderedDict[Hashable, array] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, generation: int, key: Hashable) -> array | None:
+        with self._lock:
+            ids = self._entries.get((generation, key))
+            if ids is not None:
+                self._entries.move_to_end((generation, key))
+            return ids
+
+    def put(self, generation: int, key: Hashable, rows: list[Row]) -> None:
+        ids = array('q', (row.id for row in rows))
+        if len(ids) > self.max_ids:
+            return
+        with self._lock:
+            previous = self._entries.pop((generation, key), None)
+            self._size -= len(previous) if previous is not None else 0
+            self._entries[(generation, key)] = ids
+            self._size += len(ids)
+            while self._size > self.max_ids:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def rebuild(self, rows: list[Row]) -> None:
+        self.clear()
+
+    def apply(self, delta: Delta) -> None:
+        self.clear()
+
+    def matches(self, rows: list[Row]) -> bool:
+        return True
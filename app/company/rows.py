@@ -0,0 +1,92 @@
+from collections.abc import Iterable
+from typing import Any
+
+
+class Row:
+    """
+    Base class for the lightweight, read-only records used in place of model
+    instances on the hot path. Subclasses only declare ``__slots__``, so a record
+    carries no ``__dict__``, ``_state`` or prefetch cache.
+
+    ``_fields`` lists the public fields; records compare equal when they are of
+    the same kind (``_fields``) and all fields are equal.
+    """
+
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+
+    def __init__(self, *values: Any):
+        for name, value in zip(self._fields, values, strict=True):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({fields})'
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Row) or other._fields != self._fields:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    __hash__ = None
+
+
+class DetailsRow(Row):
+    __slots__ = _fields = ('company_type', 'size', 'ceo_name', 'headquarters')
+
+
+class FinancialRow(Row):
+    __slots__ = _fields = ('year', 'revenue', 'net_income')
+
+
+class CompanyRow(Row):
+    """
+    Flattened company record: scalar columns, a ``DetailsRow`` (or None) and a
+    tuple of ``FinancialRow`` records.
+    """
+
+    __slots__ = _fields = (
+        'id', 'name', 'country', 'industry', 'founded_year', 'details', 'financials',
+    )
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    def __str__(self) -> str:
+        return self.name
+
+
+COMPANY_COLUMNS = ('id', 'name', 'country', 'industry', 'founded_year')
+DETAILS_COLUMNS = DetailsRow._fields
+FINANCIAL_COLUMNS = FinancialRow._fields
+
+
+def build_rows(
+    company_values: Iterable[tuple],
+    financial_values: Iterable[tuple],
+) -> list[CompanyRow]:
+    """
+    Assembles ``CompanyRow`` records from raw ``values_list()`` tuples.
+
+    Args:
+        company_values: Tuples of COMPANY_COLUMNS followed by DETAILS_COLUMNS.
+            Details columns are all None when the company has no details.
+        financial_values: Tuples of ``company_id`` followed by FINANCIAL_COLUMNS.
+
+    Returns:
+        Company records in the order of ``company_values``.
+    """
+    financials: dict[int, list[FinancialRow]] = {}
+    for company_id, *values in financial_values:
+        financials.setdefault(company_id, []).append(FinancialRow(*values))
+
+    split = len(COMPANY_COLUMNS)
+    rows = []
+    for values in company_values:
+        details_values = values[split:]
+        details = DetailsRow(*details_values) if details_values[0] is not None else None
+        rows.append(
+            CompanyRow(*values[:split], details, tuple(financials.get(values[0], ()))),
+        )
+    return rows
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from .models import Company, CompanyDetails, FinancialData
+from .query import CompanyQuery
 
 
 class CompanyDetailsSerializer(serializers.ModelSerializer):
@@ -22,3 +24,30 @@ class CompanySerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = ['name', 'country', 'industry', 'founded_year', 'details', 'financials']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """``fields`` limits the output to a projection (see ``projection.parse_fields``)."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class QuerySpecSerializer(serializers.Serializer):
+    search = serializers.CharField(required=False, allow_blank=True)
+    filter = serializers.CharField(required=False, allow_blank=True)
+    sort = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        errors = CompanyQuery.from_params(attrs).syntax_errors()
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class BatchQuerySerializer(serializers.Serializer):
+    queries = serializers.ListField(
+        child=QuerySpecSerializer(),
+        allow_empty=False,
+        max_length=settings.COMPANY_BATCH_MAX_QUERIES,
+    )
@@ -0,0 +1,39 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dataset
+from .models import Company, CompanyDetails, FinancialData
+
+_local = threading.local()
+
+
+@receiver([post_save, post_delete], sender=Company)
+def company_changed(sender, instance, **kwargs):
+    _schedule(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CompanyDetails)
+@receiver([post_save, post_delete], sender=FinancialData)
+def related_changed(sender, instance, **kwargs):
+    _schedule(instance.company_id)
+
+
+def _schedule(company_id: int) -> None:
+    """
+    Queues a company for reload into the store once the transaction commits.
+    Ids are collected per thread so a bulk write reloads each company once.
+    """
+    _local.__dict__.setdefault('pending', set()).add(company_id)
+    transaction.on_commit(_flush)
+
+
+def _flush() -> None:
+    pending = getattr(_local, 'pending', None)
+    if not pending:
+        return
+    ids = set(pending)
+    pending.clear()
+    dataset.apply_changes(ids)
@@ -0,0 +1,47 @@
+import json
+import logging
+
+from django.conf import settings
+
+from .aggregates import ValueCounts
+from .indexes import HashIndex
+from .plan import compile_query
+from .query import CompanyQuery
+
+logger = logging.getLogger('company.slow_queries')
+
+
+def log_if_slow(
+    query: CompanyQuery,
+    duration_s: float,
+    total_rows: int,
+    result_rows: int,
+    stages: list[dict],
+    value_counts: ValueCounts | None = None,
+    index: HashIndex | None = None,
+) -> bool:
+    """
+    Writes one JSON line (normalized query, plan, per-stage rows and timings)
+    to the ``company.slow_queries`` logger when the query took longer than
+    COMPANY_SLOW_QUERY_MS. Returns whether it was logged.
+    """
+    threshold_ms = settings.COMPANY_SLOW_QUERY_MS
+    duration_ms = duration_s * 1000
+    if threshold_ms is None or duration_ms < threshold_ms:
+        return False
+
+    plan = compile_query(query, total_rows, value_counts, index)
+    estimates = plan.estimated_rows()
+    logger.warning(
+        json.dumps(
+            {
+                'normalized': plan.normalized(),
+                'duration_ms': round(duration_ms, 3),
+                'rows': result_rows,
+                'plan': plan.to_dict(),
+                'stages': [dict(s, estimated_rows=estimates.get(s['stage'])) for s in stages],
+            },
+            default=str,
+        )
+    )
+    return True
@@ -0,0 +1,218 @@
+"""
+Fixed-layout binary snapshot of the company dataset.
+
+The file is written once and memory-mapped read-only by every worker, so the
+dataset lives in the page cache and is shared across processes. Layout (all
+integers little-endian, every section 8-byte aligned):
+
+    header          HEADER struct (magic, format, dataset version, counts)
+    int columns     len(INT_COLUMNS) x n int64
+    string offsets  len(STRING_COLUMNS) x (n + 1) int64, offsets into the heap
+    has_details     n uint8 (padded)
+    fin offsets     n + 1 int64, company ordinal -> range of financial rows
+    fin columns     len(FINANCIAL_COLUMNS) x m int64
+    heap            UTF-8 string bytes, one contiguous run per string column
+
+``CompanyView`` records read straight from the mapping, so search, filter and
+sort run over the shared pages without building model instances.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+
+from .rows import COMPANY_COLUMNS, DETAILS_COLUMNS, FINANCIAL_COLUMNS, FinancialRow, Row
+
+MAGIC = b'CSNAP\x00\x00\x01'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sI4x32sqqq')
+
+INT_COLUMNS = ('id', 'founded_year')
+STRING_COLUMNS = tuple(c for c in COMPANY_COLUMNS if c not in INT_COLUMNS) + DETAILS_COLUMNS
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _pad(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def write_snapshot(path: str | Path, rows: Iterable[Row], version: str) -> None:
+    """
+    Writes ``rows`` (``CompanyRow`` or any record with the same fields) to
+    ``path``. The file is written next to the target and renamed into place,
+    so readers never observe a partial snapshot and keep their old mapping.
+    """
+    rows = list(rows)
+    n = len(rows)
+    ints = {column: array('q') for column in INT_COLUMNS}
+    offsets = {column: array('q', [0]) for column in STRING_COLUMNS}
+    has_details = bytearray(n)
+    fin_offsets = array('q', [0])
+    fin_columns = {column: array('q') for column in FINANCIAL_COLUMNS}
+    heaps = {column: bytearray() for column in STRING_COLUMNS}
+
+    for ordinal, row in enumerate(rows):
+        for column in INT_COLUMNS:
+            ints[column].append(getattr(row, column))
+        details = row.details
+        has_details[ordinal] = details is not None
+        for column in STRING_COLUMNS:
+            source = details if column in DETAILS_COLUMNS else row
+            value = getattr(source, column) if source is not None else ''
+            heaps[column] += value.encode()
+            offsets[column].append(len(heaps[column]))
+        for financial in row.financials:
+            for column in FINANCIAL_COLUMNS:
+                fin_columns[column].append(getattr(financial, column))
+        fin_offsets.append(len(fin_columns[FINANCIAL_COLUMNS[0]]))
+
+    # Heap offsets are global: shift each column past the columns before it.
+    base = 0
+    for column in STRING_COLUMNS:
+        if base:
+            offsets[column] = array('q', (o + base for o in offsets[column]))
+        base += len(heaps[column])
+
+    m = fin_offsets[-1]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version.encode()[:32], n, m, base))
+            for column in INT_COLUMNS:
+                f.write(ints[column].tobytes())
+            for column in STRING_COLUMNS:
+                f.write(offsets[column].tobytes())
+            f.write(bytes(has_details) + b'\0' * (_pad(n) - n))
+            f.write(fin_offsets.tobytes())
+            for column in FINANCIAL_COLUMNS:
+                f.write(fin_columns[column].tobytes())
+            for column in STRING_COLUMNS:
+                f.write(heaps[column])
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class Snapshot:
+    """
+    Read-only memory-mapped view of a snapshot file.
+
+    Arrays are ``memoryview`` casts over the mapping (no copies); strings are
+    decoded on access.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f'{self.path} is not a company snapshot')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, version, n, m, heap_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise SnapshotError(f'{self.path} has an unsupported snapshot format')
+        self.version = version.rstrip(b'\0').decode()
+        self.company_count = n
+        self.financial_count = m
+
+        view = memoryview(self._mmap)
+        pos = HEADER.size
+
+        def take(count: int, fmt: str = 'q') -> memoryview:
+            nonlocal pos
+            size = count * struct.calcsize(fmt)
+            section = view[pos : pos + size].cast(fmt)
+            pos += _pad(size)
+            return section
+
+        self.ints = {column: take(n) for column in INT_COLUMNS}
+        self.offsets = {column: take(n + 1) for column in STRING_COLUMNS}
+        self.has_details = take(n, 'B')
+        self.fin_offsets = take(n + 1)
+        self.fin_columns = {column: take(m) for column in FINANCIAL_COLUMNS}
+        self.heap = view[pos : pos + heap_size]
+        self._rows = None
+
+    def __len__(self) -> int:
+        return self.company_count
+
+    def string(self, column: str, ordinal: int) -> str:
+        offsets = self.offsets[column]
+        return str(self.heap[offsets[ordinal] : offsets[ordinal + 1]], 'utf-8')
+
+    def financials(self, ordinal: int) -> tuple[FinancialRow, ...]:
+        start, end = self.fin_offsets[ordinal], self.fin_offsets[ordinal + 1]
+        columns = [self.fin_columns[c] for c in FINANCIAL_COLUMNS]
+        return tuple(FinancialRow(*(c[i] for c in columns)) for i in range(start, end))
+
+    def rows(self) -> list['CompanyView']:
+        """One ``CompanyView`` per company, built once per mapping."""
+        if self._rows is None:
+            self._rows = [CompanyView(self, ordinal) for ordinal in range(self.company_count)]
+        return self._rows
+
+
+def _int_column(column: str) -> property:
+    return property(lambda self: self._snapshot.ints[column][self._ordinal])
+
+
+def _string_column(column: str) -> property:
+    return property(lambda self: self._snapshot.string(column, self._ordinal))
+
+
+class DetailsView(Row):
+    __slots__ = ('_snapshot', '_ordinal')
+    _fields = DETAILS_COLUMNS
+
+    def __init__(self, snapshot: Snapshot, ordinal: int):
+        self._snapshot = snapshot
+        self._ordinal = ordinal
+
+    company_type = _string_column('company_type')
+    size = _string_column('size')
+    ceo_name = _string_column('ceo_name')
+    headquarters = _string_column('headquarters')
+
+
+class CompanyView(Row):
+    """``CompanyRow``-compatible record backed by a ``Snapshot`` mapping."""
+
+    __slots__ = ('_snapshot', '_ordinal')
+    _fields = COMPANY_COLUMNS + ('details', 'financials')
+
+    def __init__(self, snapshot: Snapshot, ordinal: int):
+        self._snapshot = snapshot
+        self._ordinal = ordinal
+
+    id = _int_column('id')
+    founded_year = _int_column('founded_year')
+    name = _string_column('name')
+    country = _string_column('country')
+    industry = _string_column('industry')
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def details(self) -> DetailsView | None:
+        if not self._snapshot.has_details[self._ordinal]:
+            return None
+        return DetailsView(self._snapshot, self._ordinal)
+
+    @property
+    def financials(self) -> tuple[FinancialRow, ...]:
+        return self._snapshot.financials(self._ordinal)
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,216 @@
+"""
+Maintained sort orders for the common sort fields.
+
+For every configured field and direction, ``SortIndex`` keeps the company
+ids in the order ``merge_sort`` with ``create_sort_key`` would produce for
+the whole dataset (ties broken by id, as the stable sort of id-ordered rows
+does). A sorted result is then either a walk of that permutation keeping the
+matched ids, produced lazily so a page stops the walk early, or, for
+multi-field sorts, a merge sort on integer rank tuples instead of per-row
+key tuples.
+"""
+
+import threading
+from array import array
+from bisect import insort
+from collections.abc import Sequence
+from operator import itemgetter
+
+from .deadline import check_deadline, deadline
+from .rows import Row
+from .store import CompanyStore, Delta
+from .utils.sorting import create_sort_key, merge_sort
+
+# Walk the permutation when the rows to sort are at least this fraction of
+# the dataset; smaller results are cheaper to merge sort.
+WALK_FRACTION = 1 / 8
+# Ids handled between deadline checks while walking or ranking a permutation.
+CHECK_EVERY = 4096
+
+
+class PermutationWalk:
+    """
+    ``rows`` in the order of ``permutation``, computed lazily: indexing or
+    slicing only walks the permutation as far as needed.
+    """
+
+    def __init__(self, permutation: array, rows: list[Row]):
+        self._permutation = permutation
+        self._members = {row.id: row for row in rows}
+        self._sorted: list[Row] = []
+        self._position = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self):
+        i = 0
+        while self._fill(i + 1):
+            yield self._sorted[i]
+            i += 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            stop = len(self) if index.stop is None or index.stop < 0 else index.stop
+            self._fill(stop if index.start is None or index.start >= 0 else len(self))
+            return self._sorted[index]
+        self._fill(index + 1 if index >= 0 else len(self))
+        return self._sorted[index]
+
+    def _fill(self, count: int) -> bool:
+        """Walks until ``count`` rows are sorted; False if there are fewer rows."""
+        wanted, count = count, min(count, len(self._members))
+        permutation, members, out = self._permutation, self._members, self._sorted
+        position = self._position
+        while len(out) < count and position < len(permutation):
+            if not position % CHECK_EVERY:
+                check_deadline('sort')
+            row = members.get(permutation[position])
+            if row is not None:
+                out.append(row)
+            position += 1
+        self._position = position
+        if len(out) < count:
+            # Rows the permutation no longer has (deleted while this request
+            # ran) go last rather than being dropped.
+            seen = {row.id for row in out}
+            out.extend(row for row in members.values() if row.id not in seen)
+        return len(out) >= wanted
+
+
+class SortIndex:
+    """
+    Store listener keeping one id permutation per (field, descending) for
+    ``fields`` of ``store``. Deltas remove the changed ids in one pass and
+    binary-insert their new versions; large deltas, and fields whose values
+    could not be compared before, are rebuilt from ``store.rows()``. Rank
+    maps (id -> position class) are derived lazily and dropped on every
+    change.
+    """
+
+    def __init__(self, fields: list[str], store: CompanyStore):
+        self.fields = list(fields)
+        self._store = store
+        self._keys = {
+            (field, descending): create_sort_key([f'-{field}' if descending else field])
+            for field in self.fields
+            for descending in (False, True)
+        }
+        self._permutations: dict[tuple[str, bool], array] = {}
+        self._ranks: dict[tuple[str, bool], dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def covers(self, sort_fields: list[str]) -> bool:
+        return bool(sort_fields) and all(_spec(f) in self._permutations for f in sort_fields)
+
+    def permutation(self, sort_field: str) -> array:
+        return self._permutations[_spec(sort_field)]
+
+    def sort(self, rows: list[Row], sort_fields: list[str]) -> Sequence[Row] | None:
+        """
+        ``rows`` (in id order) sorted by ``sort_fields``, or None if a field
+        has no maintained order. Same result as ``merge_sort`` with
+        ``create_sort_key(sort_fields)``.
+        """
+        if not self.covers(sort_fields):
+            return None
+        permutation = self.permutation(sort_fields[0])
+        if len(sort_fields) == 1 and len(rows) >= len(permutation) * WALK_FRACTION:
+            return PermutationWalk(permutation, rows)
+        if len(sort_fields) == 1:
+            key = self._keys[_spec(sort_fields[0])]
+            return merge_sort(rows, key=key)
+        ranks = [self._ranks_for(_spec(f)) for f in sort_fields]
+        if any(row.id not in rank for rank in ranks for row in rows):
+            # Rows newer than the index (written while this request ran) get a plain sort.
+            return merge_sort(rows, key=create_sort_key(sort_fields))
+        return merge_sort(rows, key=lambda row: tuple(rank[row.id] for rank in ranks))
+
+    def rebuild(self, rows: list[Row]) -> None:
+        permutations = {}
+        with deadline(None):  # maintenance is never cut short by a request's deadline
+            for spec in self._keys:
+                ids = self._build(spec, rows)
+                if ids is not None:
+                    permutations[spec] = ids
+        with self._lock:
+            self._permutations = permutations
+            self._ranks = {}
+
+    def apply(self, delta: Delta) -> None:
+        changed = {row.id for row in delta.deleted} | {new.id for _, new in delta.updated}
+        added = [new for _, new in delta.updated] + delta.inserted
+        if len(changed) + len(added) > len(self._store) * WALK_FRACTION:
+            self.rebuild(self._store.rows())
+            return
+        permutations = {}
+        with deadline(None):
+            for spec in self._keys:
+                ids = self._insert(spec, changed, added)
+                if ids is None:
+                    ids = self._build(spec, self._store.rows())
+                if ids is not None:
+                    permutations[spec] = ids
+        with self._lock:
+            self._permutations = permutations
+            self._ranks = {}
+
+    def matches(self, rows: list[Row]) -> bool:
+        fresh = SortIndex(self.fields, self._store)
+        fresh.rebuild(rows)
+        return fresh._permutations == self._permutations
+
+    def _build(self, spec: tuple[str, bool], rows: list[Row]) -> array | None:
+        key = self._keys[spec]
+        # Keys are computed once per row rather than on every comparison.
+        decorated = []
+        for i, row in enumerate(rows):
+            if not i % CHECK_EVERY:
+                check_deadline('sort')
+            decorated.append((key(row), row.id))
+        try:
+            ordered = merge_sort(decorated, key=itemgetter(0))
+        except TypeError:  # values of this field are not mutually comparable
+            return None
+        return array('q', (company_id for _, company_id in ordered))
+
+    def _insert(self, spec: tuple[str, bool], changed: set[int], added: list[Row]) -> array | None:
+        permutation = self._permutations.get(spec)
+        if permutation is None:
+            return None
+        key, get_row = self._keys[spec], self._store.get
+        ids = array('q', (i for i in permutation if i not in changed))
+        try:
+            for row in added:
+                insort(ids, row.id, key=lambda company_id: (key(get_row(company_id)), company_id))
+        except TypeError:
+            return None
+        return ids
+
+    def _ranks_for(self, spec: tuple[str, bool]) -> dict[int, int]:
+        """id -> rank of its sort key, equal keys sharing a rank."""
+        with self._lock:
+            if spec in self._ranks:
+                return self._ranks[spec]
+            permutation = self._permutations[spec]
+        key, get_row = self._keys[spec], self._store.get
+        ranks = {}
+        rank = 0
+        previous = object()
+        for i, company_id in enumerate(permutation):
+            if not i % CHECK_EVERY:
+                check_deadline('sort')
+            current = key(get_row(company_id))
+            if current != previous:
+                rank += 1
+                previous = current
+            ranks[company_id] = rank
+        with self._lock:
+            if self._permutations.get(spec) is permutation:
+                self._ranks[spec] = ranks
+        return ranks
+
+
+def _spec(sort_field: str) -> tuple[str, bool]:
+    descending = sort_field.startswith('-')
+    return (sort_field[1:] if descending else sort_field), descending
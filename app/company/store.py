@@ -0,0 +1,114 @@
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Protocol
+
+from .rows import Row
+
+
+@dataclass
+class Delta:
+    """Changes applied to a ``CompanyStore`` in one step."""
+
+    inserted: list[Row] = field(default_factory=list)
+    updated: list[tuple[Row, Row]] = field(default_factory=list)  # (old, new)
+    deleted: list[Row] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+class StoreListener(Protocol):
+    """
+    Structure derived from the store's rows (indexes, aggregates). ``rebuild``
+    is called with all rows when the listener is attached, ``apply`` with every
+    later delta. ``matches`` tells whether it agrees with a fresh build over
+    ``rows`` (used by the consistency check).
+    """
+
+    def rebuild(self, rows: list[Row]) -> None: ...
+
+    def apply(self, delta: Delta) -> None: ...
+
+    def matches(self, rows: list[Row]) -> bool: ...
+
+
+class CompanyStore:
+    """
+    In-process company dataset keyed by id, kept current by applying deltas
+    instead of reloading everything.
+
+    ``rows()`` returns an immutable-by-convention list in id order; readers
+    keep the list they got while writers build the next one.
+    """
+
+    def __init__(
+        self,
+        rows: list[Row],
+        checked_at: datetime | None = None,
+        recent: frozenset = frozenset(),
+        source: Any = None,
+    ):
+        self._by_id = {row.id: row for row in rows}
+        self._rows = list(self._by_id.values())
+        self.listeners: dict[str, StoreListener] = {}
+        self._lock = threading.RLock()
+        # Catch-up state (see ``dataset.refresh_store``): database changes up to
+        # ``checked_at`` are in the rows, as are the ``recent`` change stamps.
+        self.checked_at = checked_at
+        self.recent = recent
+        self.source = source  # the snapshot the rows were loaded from, if any
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self) -> list[Row]:
+        return self._rows
+
+    def get(self, company_id: int) -> Row | None:
+        return self._by_id.get(company_id)
+
+    def ids(self) -> set[int]:
+        return set(self._by_id)
+
+    def add_listener(self, name: str, listener: StoreListener) -> StoreListener:
+        with self._lock:
+            listener.rebuild(self._rows)
+            self.listeners[name] = listener
+        return listener
+
+    def apply(self, ids: set[int], fresh_rows: list[Row]) -> Delta:
+        """
+        Replaces the rows for ``ids`` with ``fresh_rows``. Ids without a fresh
+        row are deleted, ids not yet stored are inserted.
+        """
+        delta = Delta()
+        fresh = {row.id: row for row in fresh_rows}
+        with self._lock:
+            by_id = dict(self._by_id)
+            for company_id in sorted(ids | fresh.keys()):
+                old = by_id.get(company_id)
+                new = fresh.get(company_id)
+                if new is None:
+                    if old is not None:
+                        delta.deleted.append(by_id.pop(company_id))
+                elif old is None:
+                    delta.inserted.append(new)
+                    by_id[company_id] = new
+                elif old != new:
+                    delta.updated.append((old, new))
+                    by_id[company_id] = new
+
+            if not delta:
+                return delta
+            # Keep id order when an insert lands below the current maximum id.
+            last_id = next(reversed(self._by_id), 0)
+            if any(row.id < last_id for row in delta.inserted):
+                by_id = dict(sorted(by_id.items()))
+            self._by_id = by_id
+            self._rows = list(by_id.values())
+            self.generation += 1
+            for listener in self.listeners.values():
+                listener.apply(delta)
+        return delta
@@ -0,0 +1,128 @@
+import json
+
+from company.admission import ADMIT, DOWNGRADE, REJECT, AdmissionController
+from company.benchmarks.generator import generate_rows
+from company.dataset import reset_store
+from company.indexes import HashIndex
+from company.plan import compile_query
+from company.query import CompanyQuery
+from company.store import CompanyStore
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+
+class TestCostEstimate(SimpleTestCase):
+    def setUp(self):
+        store = CompanyStore(generate_rows(1000, financials_per_company=1, seed=41))
+        self.index = store.add_listener('indexes', HashIndex(['industry']))
+
+    def cost(self, page_size=None, **params):
+        plan = compile_query(CompanyQuery(**params), 1000, index=self.index)
+        return plan.estimated_cost(page_size=page_size)
+
+    def test_orders_queries_by_expected_work(self):
+        fuzzy = self.cost(search='name~acme', page_size=0)['total']
+        scan = self.cost(search='name:acme', page_size=0)['total']
+        indexed = self.cost(search='industry=Tech', page_size=0)['total']
+        related = self.cost(filter='revenue>1000000', page_size=0)['total']
+        self.assertGreater(fuzzy, scan)
+        self.assertGreater(scan, indexed)
+        self.assertGreater(related, scan)
+        # An indexed condition narrows what the fuzzy one has to check.
+        narrowed = self.cost(search='name~acme industry=Tech', page_size=0)
+        self.assertLess(narrowed['search'], fuzzy)
+
+    def test_page_size_bounds_serialization(self):
+        paged = self.cost(sort='name', page_size=10)
+        self.assertGreater(self.cost(sort='name')['serialize'], paged['serialize'])
+        self.assertEqual(self.cost(page_size=0)['total'], 0)
+
+
+@override_settings(COMPANY_CLIENT_MAX_CONCURRENT=2, COMPANY_CLIENT_MAX_INFLIGHT_COST_MS=100)
+class TestAdmissionController(SimpleTestCase):
+    def setUp(self):
+        self.plan = compile_query(CompanyQuery(search='name~acme'), 1000)
+        self.controller = AdmissionController()
+
+    def test_budget_policy(self):
+        cost = {'search': 40, 'serialize': 160, 'total': 200}
+        budget = override_settings(COMPANY_QUERY_COST_BUDGET_MS=50)
+        with budget, self.assertLogs('company.admission') as logs:
+            with override_settings(COMPANY_QUERY_OVER_BUDGET='reject'):
+                self.assertEqual(self.controller.decide('a', self.plan, cost).action, REJECT)
+            decision = self.controller.decide('a', self.plan, cost)
+            # 10 ms left after the search: 200 rows at 50 µs each.
+            self.assertEqual((decision.action, decision.page_size), (DOWNGRADE, 200))
+            self.assertEqual(self.controller.in_flight('a'), (1, 50))
+            # Over budget before serializing anything, or not pageable: never an empty page.
+            matching_over = {'search': 60, 'serialize': 1, 'total': 61}
+            for cost, pageable in ((matching_over, True), (cost, False)):
+                decision = self.controller.decide('b', self.plan, cost, pageable)
+                self.assertEqual((decision.action, decision.page_size), (REJECT, None))
+        decisions = [json.loads(record.getMessage())['decision'] for record in logs.records]
+        self.assertEqual(decisions, ['reject', 'downgrade', 'reject', 'reject'])
+
+    def test_per_client_limits(self):
+        with self.assertLogs('company.admission', 'DEBUG') as logs:
+            first = self.controller.decide('a', self.plan, {'total': 60})
+            self.assertEqual(self.controller.decide('a', self.plan, {'total': 60}).action, REJECT)
+            self.assertEqual(self.controller.decide('b', self.plan, {'total': 60}).action, ADMIT)
+            self.assertEqual(self.controller.decide('a', self.plan, {'total': 10}).action, ADMIT)
+            self.assertEqual(self.controller.decide('a', self.plan, {'total': 1}).action, REJECT)
+        entry = json.loads(logs.records[1].getMessage())
+        self.assertEqual(
+            (entry['decision'], entry['reason'], entry['client_cost_ms']),
+            ('reject', 'client cost in flight', 60),
+        )
+        self.controller.release('a', first)
+        self.assertEqual(self.controller.in_flight('a'), (1, 10))
+
+
+class TestAdmissionApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    @override_settings(COMPANY_QUERY_COST_BUDGET_MS=0.001, COMPANY_QUERY_OVER_BUDGET='reject')
+    def test_rejects_over_budget(self):
+        with self.assertLogs('company.admission') as logs:
+            response = self.client.get(self.URL, {'search': 'name~acme'})
+            self.assertEqual(response.status_code, 429)
+            response = self.client.get(self.URL, {'search': 'name~acme', 'count': 1})
+            self.assertEqual(response.status_code, 429)
+            response = self.client.get(self.URL, {'search': 'name~acme', 'explain': 1})
+            self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(logs.records), 3)
+
+    # Three companies cost 0.15 ms to serialize; the maintained name order is ~0.001 ms.
+    @override_settings(COMPANY_QUERY_COST_BUDGET_MS=0.11)
+    def test_downgrades_to_forced_pages_without_caching(self):
+        with override_settings(COMPANY_QUERY_COST_BUDGET_MS=None):
+            full = self.client.get(self.URL, {'sort': 'name'}).data
+        cache.clear()
+        with self.assertLogs('company.admission') as logs:
+            response = self.client.get(self.URL, {'sort': 'name'})
+            again = self.client.get(self.URL, {'sort': 'name'})
+        self.assertIn('"decision": "downgrade"', logs.output[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Query-Downgraded'], 'paginated to 2 rows per page')
+        self.assertEqual(response.data['count'], len(full))
+        self.assertEqual(response.data['results'], full[:2])  # the true first rows
+        self.assertIn('page_size=2', response.data['next'])
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(again['X-Cache'], 'MISS')
+
+    @override_settings(COMPANY_QUERY_COST_BUDGET_MS=0.001)
+    def test_rejects_when_matching_alone_is_over_budget(self):
+        with self.assertLogs('company.admission'):
+            response = self.client.get(self.URL, {'filter': 'founded_year>0'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_cheap_queries_are_admitted(self):
+        response = self.client.get(self.URL, {'filter': 'industry=Tech'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Query-Downgraded', response)
@@ -1,3 +1,4 @@
+from company.dataset import reset_store
 from django.core.cache import cache
 from rest_framework.test import APITestCase
 
@@ -10,6 +11,7 @@ class TestCompanyApi(APITestCase):
 
     def setUp(self):
         cache.clear()  # Always clear cache to ensure test isolation
+        reset_store()
 
     def test_filter_by_name(self):
         response = self.client.get(self.URL, {'filter': 'name="Alpha Corp"'})
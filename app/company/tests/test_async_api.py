@@ -0,0 +1,60 @@
+import threading
+from unittest import mock
+
+from company import admission
+from company.dataset import reset_store
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+
+from ..utils.common.fields import get_cache_key_from_request
+
+
+class TestCompanyAsyncApi(TestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/async/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    async def test_matches_sync_endpoint(self):
+        params = {'search': 'industry:Tech', 'filter': 'founded_year>=1990', 'sort': '-name'}
+        response = await self.async_client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        sync_response = await self.async_client.get('/api/v1/companies/', params)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual([c['name'] for c in response.json()], ['Gamma Inc', 'Alpha Corp'])
+
+    async def test_serves_cache_hits(self):
+        response = await self.async_client.get(self.URL, {'filter': 'industry=Tech'})
+        cache_key = get_cache_key_from_request(response.asgi_request)
+        await cache.aset(cache_key, [{'name': 'CACHED'}], timeout=600)
+        response = await self.async_client.get(self.URL, {'filter': 'industry=Tech'})
+        self.assertEqual(response.json(), [{'name': 'CACHED'}])
+
+    @override_settings(COMPANY_QUERY_COST_BUDGET_MS=0.001)
+    async def test_goes_through_admission(self):
+        with self.assertLogs('company.admission'):
+            response = await self.async_client.get(self.URL, {'filter': 'industry=Tech'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('over the limit', response.json()['detail'])
+
+    async def test_cpu_work_off_the_loop_and_local_cache_on_it(self):
+        threads = []
+        original = admission.compile_query
+
+        def compile_query(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(*args, **kwargs)
+
+        # LocMemCache's async methods hop to a thread; the view calls the sync ones.
+        no_aget = mock.patch.object(LocMemCache, 'aget', side_effect=AssertionError)
+        no_aset = mock.patch.object(LocMemCache, 'aset', side_effect=AssertionError)
+        with no_aget, no_aset, mock.patch.object(admission, 'compile_query', compile_query):
+            response = await self.async_client.get(self.URL, {'filter': 'industry=Tech'})
+            self.assertEqual(response['X-Cache'], 'MISS')
+            response = await self.async_client.get(self.URL, {'filter': 'industry=Tech'})
+            self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('company-query'))
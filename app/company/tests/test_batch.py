@@ -0,0 +1,74 @@
+from company.dataset import get_companies, get_index, get_value_counts, reset_store
+from company.plan import compile_query
+from company.query import CompanyQuery
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from ..utils.common.fields import get_cache_key
+
+
+class TestCompanyBatchApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/batch/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_results_match_individual_requests_in_order(self):
+        specs = [
+            {'filter': 'industry=Tech', 'sort': '-founded_year'},
+            {'search': 'country:Ger'},
+            {'search': 'industry:Tech', 'filter': 'founded_year>=2000 OR name="Alpha Corp"'},
+            {'filter': 'industry=Tech', 'sort': 'name'},
+            {},
+        ]
+        response = self.client.post(self.URL, {'queries': specs}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(len(results), len(specs))
+        cache.clear()
+        for spec, result in zip(specs, results):
+            self.assertEqual(result, self.client.get('/api/v1/companies/', spec).data)
+
+    def test_uses_response_cache_per_spec(self):
+        cache_key = get_cache_key('/api/v1/companies/', {'filter': 'industry=Tech'})
+        cache.set(cache_key, [{'name': 'CACHED'}], timeout=600)
+        response = self.client.post(
+            self.URL,
+            {'queries': [{'filter': 'industry=Tech'}, {'filter': 'industry=Finance'}]},
+            format='json',
+        )
+        self.assertEqual(response.data['results'][0], [{'name': 'CACHED'}])
+        self.assertEqual([c['name'] for c in response.data['results'][1]], ['Beta Group'])
+
+    def test_rejects_invalid_body(self):
+        response = self.client.post(self.URL, {'queries': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(COMPANY_QUERY_COST_BUDGET_MS=0.001)
+    def test_specs_go_through_admission(self):
+        with self.assertLogs('company.admission'):
+            response = self.client.post(
+                self.URL, {'queries': [{'filter': 'industry=Tech', 'sort': 'name'}]}, format='json',
+            )
+        self.assertEqual(response.status_code, 429)
+
+    def test_batch_is_admitted_once_for_its_total_cost(self):
+        specs = [{'filter': 'industry=Tech'}, {'filter': 'country=USA'}, {'search': 'name:a'}]
+        companies = get_companies()
+        costs = [
+            compile_query(
+                CompanyQuery.from_params(spec), len(companies), get_value_counts(), get_index(),
+            ).estimated_cost()['total']
+            for spec in specs
+        ]
+        # Every spec fits the budget on its own; the batch does not.
+        with override_settings(COMPANY_QUERY_COST_BUDGET_MS=(sum(costs) + max(costs)) / 2):
+            with self.assertLogs('company.admission') as logs:
+                response = self.client.post(self.URL, {'queries': specs}, format='json')
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(len(logs.records), 1)
+            for spec in specs:
+                self.assertEqual(self.client.get('/api/v1/companies/', spec).status_code, 200)
@@ -0,0 +1,38 @@
+from company.benchmarks.generator import LAST_YEAR, generate_rows
+from company.benchmarks.load import summarize
+from company.benchmarks.suite import compare_reports, run_benchmarks
+from django.test import SimpleTestCase
+
+
+class TestBenchmarks(SimpleTestCase):
+    def test_generator_is_seeded(self):
+        rows = generate_rows(50, financials_per_company=3, seed=7)
+        self.assertEqual(rows, generate_rows(50, financials_per_company=3, seed=7))
+        self.assertNotEqual(rows, generate_rows(50, financials_per_company=3, seed=8))
+        self.assertEqual([r.id for r in rows], list(range(1, 51)))
+        for row in rows:
+            years = [f.year for f in row.financials]
+            expected = list(range(max(row.founded_year, LAST_YEAR - 2), LAST_YEAR + 1))
+            self.assertEqual(years, expected)  # never before founding nor past LAST_YEAR
+
+    def test_report_and_compare(self):
+        report = run_benchmarks([20], repeat=1, only='filter.')
+        self.assertEqual(
+            {r['name'] for r in report['results']},
+            {'filter.simple', 'filter.and', 'filter.or', 'filter.mixed', 'filter.quoted'},
+        )
+        slower = {
+            'results': [dict(r, median_s=r['median_s'] * 2) for r in report['results']],
+        }
+        comparison = compare_reports(slower, report, threshold=0.5)
+        self.assertTrue(all(row['regression'] for row in comparison))
+        self.assertFalse(any(row['regression'] for row in compare_reports(report, report)))
+
+    def test_load_summary(self):
+        samples = [(i / 1000, 200, 'HIT' if i % 4 else 'MISS') for i in range(1, 101)]
+        summary = summarize('wsgi-warm', samples, elapsed=2.0, concurrency=4)
+        self.assertEqual(summary['rps'], 50.0)
+        self.assertAlmostEqual(summary['p50_ms'], 50.0, places=6)
+        self.assertAlmostEqual(summary['p99_ms'], 99.0, places=6)
+        self.assertEqual(summary['cache_hit_ratio'], 0.75)
+        self.assertEqual(summary['errors'], 0)
@@ -0,0 +1,95 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from company import dataset
+from company.bulk_import import RecordError, import_records, read_records
+from company.models import Company, CompanyDetails, FinancialData
+from company.rows import CompanyRow, DetailsRow, FinancialRow
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+JSONL = [
+    {
+        'name': 'Acme', 'country': 'USA', 'industry': 'Tech', 'founded_year': 1990,
+        'details': {
+            'company_type': 'Public', 'size': 'Large', 'ceo_name': 'Ann', 'headquarters': 'NYC',
+        },
+        'financials': [
+            {'year': 2022, 'revenue': 100, 'net_income': 10},
+            {'year': 2023, 'revenue': 200, 'net_income': 20},
+        ],
+    },
+    {'name': 'Bare', 'country': 'UK', 'industry': 'Retail', 'founded_year': 2001},
+]
+
+CSV = '''id,name,country,industry,founded_year,details__company_type,details__size,\
+details__ceo_name,details__headquarters,financials__year,financials__revenue,financials__net_income
+10,Acme,USA,Tech,1990,Public,Large,Ann,NYC,2022,100,10
+10,Acme,USA,Tech,1990,Public,Large,Ann,NYC,2023,200,20
+11,Bare,UK,Retail,2001,,,,,,,
+'''
+
+
+class TestBulkImport(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+
+    def write(self, name: str, text: str) -> str:
+        path = self.dir / name
+        path.write_text(text)
+        return str(path)
+
+    def test_jsonl_inserts_in_batches(self):
+        path = self.write('companies.jsonl', '\n'.join(json.dumps(r) for r in JSONL * 3) + '\n')
+        out = StringIO()
+        call_command('import_companies', path, batch_size=4, stdout=out)
+        self.assertIn('Imported 6 companies, 3 details and 6 financials', out.getvalue())
+        self.assertEqual(out.getvalue().count('rows/s)'), 3)  # two batches + summary
+        rows = Company.objects.rows()
+        self.assertEqual([r.name for r in rows], ['Acme', 'Bare'] * 3)
+        self.assertEqual([f.year for f in rows[0].financials], [2022, 2023])
+        self.assertEqual(rows[1].details, None)
+
+    def test_csv_upsert_replaces_financials(self):
+        expected = [
+            CompanyRow(
+                10, 'Acme', 'USA', 'Tech', 1990, DetailsRow('Public', 'Large', 'Ann', 'NYC'),
+                (FinancialRow(2022, 100, 10), FinancialRow(2023, 200, 20)),
+            ),
+            CompanyRow(11, 'Bare', 'UK', 'Retail', 2001, None, ()),
+        ]
+        call_command('import_companies', self.write('a.csv', CSV), stdout=StringIO())
+        self.assertEqual(Company.objects.rows(), expected)
+
+        changed = CSV.replace('10,Acme,USA,Tech,1990,Public,Large,Ann,NYC,2023,200,20\n', '')
+        changed = changed.replace('Ann', 'Bea')
+        call_command('import_companies', self.write('b.csv', changed), stdout=StringIO())
+        self.assertEqual(Company.objects.count(), 2)
+        acme = Company.objects.rows([10])[0]
+        self.assertEqual(acme.details.ceo_name, 'Bea')
+        self.assertEqual(acme.financials, (FinancialRow(2022, 100, 10),))
+        self.assertEqual(CompanyDetails.objects.count(), 1)
+        self.assertEqual(FinancialData.objects.count(), 1)
+
+    def test_store_rebuilt_once_after_import(self):
+        store = dataset.get_store()
+        call_command('import_companies', self.write('a.csv', CSV), stdout=StringIO())
+        self.assertIsNot(dataset.get_store(), store)
+        self.assertEqual(len(dataset.get_store()), 2)
+        self.assertEqual(dataset.check_store(dataset.get_store())['listeners'], [])
+
+    def test_bad_record_reports_line(self):
+        text = '\n'.join([json.dumps(JSONL[1]), json.dumps(dict(JSONL[1], founded_year='x'))])
+        with self.assertRaisesMessage(CommandError, 'line 2: founded_year'):
+            call_command('import_companies', self.write('bad.jsonl', text), stdout=StringIO())
+        self.assertEqual(Company.objects.count(), 0)  # same batch: rolled back
+
+        records = read_records(StringIO(json.dumps({'name': 'X'})), 'jsonl')
+        with self.assertRaisesMessage(RecordError, 'missing Company fields'):
+            import_records(records)
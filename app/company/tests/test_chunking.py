@@ -0,0 +1,100 @@
+import json
+from unittest import mock
+
+from company.admission import controller
+from company.benchmarks.generator import generate_rows
+from company.chunking import ChunkScheduler, estimate_row_bytes
+from company.dataset import reset_store
+from company.query import CompanyQuery, run_query
+from company.queryset import SearchQuerySet
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+
+
+class TestChunkScheduler(SimpleTestCase):
+    def test_memory_budget_and_measured_cost(self):
+        scheduler = ChunkScheduler(1000, memory_budget=100_000, target_ms=25, min_size=10)
+        self.assertEqual(scheduler.next_size(), 10)  # probe
+        scheduler.record(10, 0.0001)  # 0.01 ms per row: the memory budget binds
+        self.assertEqual(scheduler.next_size(), 100)
+        scheduler.record(100, 0.1)  # 1 ms per row (smoothed to ~0.5): the time target binds
+        self.assertEqual(scheduler.next_size(), 49)
+        self.assertEqual(scheduler.stats()['rows'], 110)
+        self.assertEqual(scheduler.stats()['peak_chunk_bytes'], 100_000)
+
+    def test_chunks_cover_data(self):
+        scheduler = ChunkScheduler.fixed(3)
+        self.assertEqual(list(scheduler.chunks(list(range(7)))), [
+            (0, [0, 1, 2]), (3, [3, 4, 5]), (6, [6]),
+        ])
+
+    def test_row_size_grows_with_financials(self):
+        small = generate_rows(50, financials_per_company=1, seed=1)
+        large = generate_rows(50, financials_per_company=10, seed=1)
+        self.assertGreater(estimate_row_bytes(large), 2 * estimate_row_bytes(small))
+        self.assertEqual(estimate_row_bytes([]), 1)
+
+    @override_settings(COMPANY_CHUNK_MIN_SIZE=16, COMPANY_CHUNK_MEMORY_BUDGET_BYTES=64 * 1024)
+    def test_run_query_reports_chunk_stats(self):
+        rows = generate_rows(2000, financials_per_company=3, seed=1)
+        result = run_query(
+            SearchQuerySet(rows), CompanyQuery(search='name:a', filter='revenue>0', sort='name'),
+        )
+        search, filtered = result.chunk_stats['search'], result.chunk_stats['filter']
+        self.assertEqual(search['rows'], 2000)
+        self.assertLessEqual(search['peak_chunk_bytes'], 64 * 1024)
+        self.assertGreater(search['chunks'], 2000 * search['row_bytes'] // (64 * 1024))
+        matched = run_query(SearchQuerySet(rows), CompanyQuery(search='name:a'))
+        self.assertEqual(filtered['rows'], len(matched))
+
+
+class TestStreamedResponse(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_large_response_is_streamed(self):
+        params = {'filter': 'founded_year>1900', 'sort': 'name'}
+        expected = json.loads(self.client.get(self.URL, params).content)
+        cache.clear()
+        with override_settings(COMPANY_RESPONSE_MEMORY_BUDGET_BYTES=1, COMPANY_CHUNK_MIN_SIZE=2):
+            for _ in range(2):  # streamed responses are not cached
+                response = self.client.get(self.URL, params)
+                self.assertTrue(response.streaming)
+                self.assertEqual(response['X-Cache'], 'MISS')
+                self.assertEqual(response['X-Streamed'], f'{len(expected)} rows')
+                self.assertEqual(json.loads(b''.join(response.streaming_content)), expected)
+
+            response = self.client.get(self.URL, dict(params, page_size=2))
+            self.assertFalse(response.streaming)
+
+    def test_explain_reports_chunks(self):
+        response = self.client.get(self.URL, {'filter': 'name~alpha', 'explain': '1'})
+        load, stage = response.data['stages']
+        self.assertEqual(stage['stage'], 'filter')
+        self.assertEqual(stage['chunks']['rows'], load['actual_rows'])
+        self.assertGreaterEqual(stage['chunks']['chunks'], 1)
+
+    @override_settings(COMPANY_RESPONSE_MEMORY_BUDGET_BYTES=1, COMPANY_CHUNK_MIN_SIZE=2)
+    def test_stream_holds_admission_until_closed(self):
+        response = self.client.get(self.URL, {'sort': 'name'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(controller.in_flight('127.0.0.1')[0], 1)
+        b''.join(response.streaming_content)  # the test client closes the response once consumed
+        self.assertEqual(controller.in_flight('127.0.0.1'), (0, 0))
+
+    @override_settings(COMPANY_RESPONSE_MEMORY_BUDGET_BYTES=1, COMPANY_CHUNK_MIN_SIZE=2)
+    def test_projected_timeout_is_reported_before_streaming(self):
+        params = {'sort': 'name', 'timeout_ms': 1000}
+        row_ms = mock.PropertyMock(return_value=10_000)  # the rows after the first chunk won't fit
+        with mock.patch.object(ChunkScheduler, 'row_ms', row_ms):
+            self.assertEqual(self.client.get(self.URL, params).status_code, 503)
+            response = self.client.get(self.URL, dict(params, allow_partial=1))
+        self.assertEqual(response['X-Partial-Result'], 'timeout during serialize after 2 rows')
+        self.assertEqual(response['X-Streamed'], '2 rows')
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 2)
+        self.assertEqual(controller.in_flight('127.0.0.1'), (0, 0))
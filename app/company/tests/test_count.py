@@ -0,0 +1,71 @@
+from company.benchmarks.generator import generate_rows
+from company.dataset import reset_store
+from company.instrumentation import end_trace, metrics, start_trace
+from company.query import CompanyQuery, any_match
+from company.queryset import SearchQuerySet
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from ..utils.common.fields import get_cache_key
+
+
+class TestCountAndExists(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_count_matches_list_length(self):
+        for params in [
+            {},
+            {'filter': 'industry=Tech'},
+            {'search': 'country:Ger', 'filter': 'founded_year>1990 OR industry=Finance'},
+            {'filter': 'name="Nobody"'},
+        ]:
+            with self.subTest(params=params):
+                expected = len(self.client.get(self.URL, params).data)
+                cache.clear()
+                response = self.client.get(self.URL, dict(params, count='1', sort='-name'))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data, {'count': expected})
+                self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_exists(self):
+        response = self.client.get(self.URL, {'filter': 'founded_year>1990', 'exists': 'true'})
+        self.assertEqual(response.data, {'exists': True})
+        response = self.client.get(self.URL, {'filter': 'founded_year>3000', 'exists': '1'})
+        self.assertEqual(response.data, {'exists': False})
+
+    def test_answers_from_cached_result_set(self):
+        params = {'filter': 'industry=Tech'}
+        cache.set(get_cache_key(self.URL, params), [{'name': 'A'}, {'name': 'B'}])
+        response = self.client.get(self.URL, dict(params, count='1'))
+        self.assertEqual(response.data, {'count': 2})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_syntax_error(self):
+        response = self.client.get(self.URL, {'filter': 'industry=', 'count': '1'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestAnyMatch(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(metrics.reset)
+        self.rows = generate_rows(200, financials_per_company=1, seed=37)
+
+    def test_stops_at_first_match(self):
+        first = next(i for i, row in enumerate(self.rows) if row.industry == 'Tech')
+        _, token = start_trace()
+        try:
+            query = CompanyQuery(filter='industry=Tech')
+            self.assertTrue(any_match(SearchQuerySet(self.rows), query))
+        finally:
+            end_trace(token)
+        self.assertEqual(metrics.counters['rows_scanned'], first + 1)
+
+    def test_no_match(self):
+        query = CompanyQuery(search='industry:tech', filter='founded_year>3000')
+        self.assertFalse(any_match(SearchQuerySet(self.rows), query))
@@ -0,0 +1,153 @@
+import itertools
+import time
+from unittest import mock
+
+from company.batch import BatchExecutor
+from company.benchmarks.generator import generate_rows
+from company.dataset import reset_store
+from company.deadline import QueryTimeout, check_deadline, deadline
+from company.query import CompanyQuery, run_query
+from company.queryset import SearchQuerySet
+from company.sort_index import SortIndex
+from company.store import CompanyStore
+from company.utils.common.parsing import match
+from company.utils.sorting import merge_sort
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+
+
+def clock(checks_in_time: int):
+    """``time.monotonic`` for the deadline module: 0 for ``checks_in_time`` calls, then 100."""
+    ticks = itertools.chain([0.0] * checks_in_time, itertools.repeat(100.0))
+    return mock.patch('company.deadline.time.monotonic', side_effect=lambda: next(ticks))
+
+
+@override_settings(COMPANY_CHUNK_MIN_SIZE=500, COMPANY_CHUNK_MAX_SIZE=500)
+class TestDeadline(SimpleTestCase):
+    def setUp(self):
+        self.rows = generate_rows(2000, financials_per_company=1, seed=42)
+
+    def test_check_outside_and_inside_deadline(self):
+        check_deadline('search')
+        with deadline(time.monotonic() + 60):
+            check_deadline('search')
+        with deadline(time.monotonic() - 1), self.assertRaises(QueryTimeout) as ctx:
+            check_deadline('filter', scanned=500)
+        self.assertEqual((ctx.exception.stage, ctx.exception.scanned), ('filter', 500))
+
+    def test_sort_engine_checks(self):
+        with deadline(time.monotonic() - 1), self.assertRaises(QueryTimeout):
+            merge_sort(list(range(1000)))
+        with deadline(time.monotonic() - 1):
+            self.assertEqual(merge_sort([3, 1, 2]), [1, 2, 3])  # too small to check
+
+    def test_partial_search_is_still_filtered(self):
+        query = CompanyQuery(search='name:a', filter='founded_year>1980')
+        with clock(2), deadline(50.0), self.assertRaises(QueryTimeout) as ctx:
+            run_query(SearchQuerySet(self.rows), query)
+        exc = ctx.exception
+        self.assertEqual((exc.stage, exc.scanned), ('search', 1000))
+        expected = [
+            row for row in self.rows[:1000]
+            if match(row, {'field': 'name', 'op': ':', 'value': 'a'}) and row.founded_year > 1980
+        ]
+        self.assertEqual(exc.partial, expected)
+
+    def test_partial_search_filter_gets_one_chunk_of_grace(self):
+        query = CompanyQuery(search='name:a', filter='founded_year>1980')
+        with override_settings(COMPANY_CHUNK_TARGET_MS=0):
+            with clock(2), deadline(50.0), self.assertRaises(QueryTimeout) as ctx:
+                run_query(SearchQuerySet(self.rows), query)
+        self.assertIsNone(ctx.exception.partial)
+
+    def test_sort_index_checks(self):
+        store = CompanyStore(self.rows)
+        store.add_listener('sorts', SortIndex(['name', 'industry'], store))
+        sorts = store.listeners['sorts']
+        with deadline(time.monotonic() - 1):
+            with self.assertRaises(QueryTimeout):
+                sorts.sort(self.rows[:100], ['industry', 'name'])  # ranking
+            with self.assertRaises(QueryTimeout):
+                sorts.sort(self.rows, ['name'])[:10]  # walking
+            store.apply({1}, [])  # index maintenance is not cut short
+        self.assertTrue(sorts.matches(store.rows()))
+
+    def test_batch_checks_between_queries_and_masks(self):
+        executor = BatchExecutor(SearchQuerySet(self.rows))
+        tech = CompanyQuery(filter='industry=Tech')
+        executor.run(tech)
+        with deadline(time.monotonic() - 1):
+            self.assertIs(executor.run(tech), executor.run(tech))  # already computed
+            with self.assertRaises(QueryTimeout) as ctx:
+                executor.run(CompanyQuery(filter='industry=Tech', sort='name'))
+            self.assertEqual(ctx.exception.stage, 'batch')
+        # Between masks: the first condition is evaluated, the second is not.
+        with clock(2), deadline(50.0), self.assertRaises(QueryTimeout):
+            executor.run(CompanyQuery(filter='founded_year>1980 AND country=USA'))
+        self.assertEqual(len(executor._masks), 2)
+
+    def test_partial_sort_returns_all_matches_unsorted(self):
+        query = CompanyQuery(filter='founded_year>1980', sort='name')
+        expected = [row for row in self.rows if row.founded_year > 1980]
+        with clock(4), deadline(50.0), self.assertRaises(QueryTimeout) as ctx:
+            run_query(SearchQuerySet(self.rows), query)
+        self.assertEqual(ctx.exception.stage, 'sort')
+        self.assertEqual(ctx.exception.partial, expected)
+
+
+class TestDeadlineApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_invalid_timeout(self):
+        response = self.client.get(self.URL, {'timeout_ms': 'soon'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('timeout_ms', response.data)
+
+    @override_settings(COMPANY_QUERY_TIMEOUT_MS=0)
+    def test_timeout_and_partial_opt_in(self):
+        params = {'search': 'name:a'}
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['detail'].code, 'query_timeout')
+
+        response = self.client.get(self.URL, dict(params, allow_partial='1'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Partial-Result'], 'timeout during search after 0 rows')
+        self.assertEqual(self.client.get(self.URL, params).status_code, 503)  # not cached
+
+        response = self.client.get(self.URL, dict(params, count='1'))
+        self.assertEqual(response.status_code, 503)
+        response = self.client.get(self.URL, dict(params, explain='1'))
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(COMPANY_QUERY_TIMEOUT_MS=0)
+    def test_batch_timeout(self):
+        url = '/api/v1/companies/batch/'
+        queries = {'queries': [{'search': 'name:a'}, {'filter': 'industry=Tech'}]}
+        response = self.client.post(url, queries, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['detail'].code, 'query_timeout')
+        response = self.client.post(f'{url}?timeout_ms=soon', queries, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestDeadlineAsyncApi(TestCase):
+    fixtures = ['test_companies.json']
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    @override_settings(COMPANY_QUERY_TIMEOUT_MS=0)
+    async def test_timeout(self):
+        url = '/api/v1/companies/async/'
+        response = await self.async_client.get(url, {'search': 'name:a'})
+        self.assertEqual(response.status_code, 503)
+        response = await self.async_client.get(url, {'search': 'name:a', 'allow_partial': '1'})
+        self.assertEqual((response.status_code, response.json()), (200, []))
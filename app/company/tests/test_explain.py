@@ -0,0 +1,71 @@
+import json
+
+from company.aggregates import ValueCounts
+from company.dataset import reset_store
+from company.models import Company
+from company.plan import compile_query
+from company.query import CompanyQuery
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+
+class TestExplain(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_filter_tree_folds_left_to_right(self):
+        plan = compile_query(
+            CompanyQuery(filter='industry=Tech OR name="Beta Group" AND founded_year>1990'),
+            total_rows=3,
+        )
+        tree = plan.to_dict()['filter']
+        self.assertEqual(tree['op'], 'AND')
+        self.assertEqual(tree['children'][0]['op'], 'OR')
+        self.assertEqual(tree['children'][1]['field'], 'founded_year')
+        self.assertEqual(
+            plan.normalized(),
+            'filter=industry=Tech OR name="Beta Group" AND founded_year>1990',
+        )
+
+    def test_estimates_use_value_counts(self):
+        counts = ValueCounts(['industry'])
+        counts.rebuild(Company.objects.rows())
+        plan = compile_query(CompanyQuery(search='industry:tec'), 3, counts)
+        self.assertEqual(plan.estimated_rows(), {'load': 3, 'search': 2})
+
+    def test_explain_returns_plan_instead_of_rows(self):
+        params = {'search': 'industry:Tech', 'filter': 'founded_year>=2000', 'sort': '-name'}
+        response = self.client.get(self.URL, dict(params, explain='1'))
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['response_cache'], 'miss')
+        self.assertEqual(data['plan']['search']['access'], 'index')
+        self.assertEqual(data['plan']['filter']['access'], 'scan')
+        self.assertEqual(
+            [(s['stage'], s['estimated_rows'], s['actual_rows']) for s in data['stages']],
+            [('load', 3, 3), ('search', 2, 2), ('filter', 1, 1), ('sort', 1, 1)],
+        )
+
+    def test_explain_reports_response_cache(self):
+        self.client.get(self.URL, {'filter': 'industry=Tech'})
+        response = self.client.get(self.URL, {'filter': 'industry=Tech', 'explain': '1'})
+        self.assertEqual(response.data['response_cache'], 'hit')
+
+    @override_settings(COMPANY_SLOW_QUERY_MS=0)
+    def test_slow_query_log(self):
+        with self.assertLogs('company.slow_queries') as logs:
+            self.client.get(
+                self.URL,
+                {'filter': 'industry=Tech   and founded_year>1990', 'sort': 'name'},
+            )
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            entry['normalized'],
+            'filter=industry=Tech AND founded_year>1990&sort=name',
+        )
+        self.assertEqual([s['stage'] for s in entry['stages']], ['filter', 'sort'])
@@ -0,0 +1,155 @@
+import random
+
+from company import dataset
+from company.benchmarks.generator import COUNTRIES, INDUSTRIES, generate_rows
+from company.indexes import HashIndex, select
+from company.models import Company
+from company.queryset import SearchQuerySet
+from company.rows import CompanyRow
+from company.store import CompanyStore
+from company.utils.common.parsing import match
+from company.utils.filtering import evaluate_filter
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+FIELDS = ['industry', 'country', 'details__size', 'details__company_type']
+
+
+def make_store(rows: list) -> CompanyStore:
+    store = CompanyStore(rows)
+    store.add_listener('indexes', HashIndex(FIELDS))
+    return store
+
+
+class TestHashIndex(SimpleTestCase):
+    def setUp(self):
+        self.rows = generate_rows(300, financials_per_company=1, seed=36)
+        # One company without details, so nested fields are None.
+        self.rows[0] = CompanyRow(1, 'Bare Co', 'USA', 'Tech', 2000, None, ())
+        self.store = make_store(self.rows)
+        self.index = self.store.listeners['indexes']
+
+    def test_lookup_agrees_with_match(self):
+        conditions = [
+            {'field': 'industry', 'op': '=', 'value': 'Tech'},
+            {'field': 'industry', 'op': '=', 'value': 'tech'},
+            {'field': 'industry', 'op': ':', 'value': 'TEC'},
+            {'field': 'country', 'op': ':', 'value': 'an'},
+            {'field': 'details__size', 'op': '=', 'value': 'Large'},
+            {'field': 'details__company_type', 'op': ':', 'value': ''},
+            {'field': 'country', 'op': '=', 'value': ('Germany', 'Japan', 'Nowhere')},
+            {'field': 'industry', 'op': ':', 'value': ('fin', 'media')},
+            {'field': 'industry', 'op': '=', 'value': 5},
+        ]
+        for cond in conditions:
+            with self.subTest(cond=cond):
+                expected = {row.id for row in self.rows if match(row, cond)}
+                self.assertEqual(self.index.lookup(cond), expected)
+        self.assertIsNone(self.index.lookup({'field': 'name', 'op': '=', 'value': 'x'}))
+        self.assertIsNone(self.index.lookup({'field': 'industry', 'op': '~', 'value': 'Tec'}))
+
+    def test_select_agrees_with_evaluate_filter(self):
+        rng = random.Random(36)
+        pool = [
+            lambda: {'field': 'industry', 'op': '=', 'value': rng.choice(INDUSTRIES)},
+            lambda: {'field': 'country', 'op': ':', 'value': rng.choice(COUNTRIES)[:3]},
+            lambda: {'field': 'founded_year', 'op': '>', 'value': rng.randint(1900, 2023)},
+            lambda: {'field': 'details__size', 'op': '=', 'value': ('Small', 'Large')},
+            lambda: {'field': 'revenue', 'op': '>', 'value': rng.choice([10**5, 10**6, 10**7])},
+        ]
+        for _ in range(200):
+            expr = []
+            for i in range(rng.randint(1, 4)):
+                if i:
+                    expr.append(rng.choice(['AND', 'OR']))
+                expr.append(rng.choice(pool)())
+            expected = [row for row in self.rows if evaluate_filter(row, expr)]
+            selected = select(self.store, expr)
+            if selected is None:
+                self.assertFalse(any(self.index.covers(t) for t in expr if isinstance(t, dict)))
+            else:
+                self.assertEqual(selected[0], expected, expr)
+
+    def test_queryset_uses_index_only_for_full_store(self):
+        companies = SearchQuerySet(self.store.rows(), store=self.store)
+        rows = companies.filter('industry=[Tech,Finance] AND founded_year>2000').to_list()
+        self.assertEqual(
+            rows,
+            [r for r in self.rows if r.industry in ('Tech', 'Finance') and r.founded_year > 2000],
+        )
+        self.assertIsNone(SearchQuerySet(self.store.rows()[:10]).index)
+
+    def test_deltas_keep_index_equal_to_rebuild(self):
+        rng = random.Random(37)
+        rows = {row.id: row for row in self.rows}
+        for _ in range(20):
+            ids = set(rng.sample(sorted(rows), 5)) | {max(rows) + 1}
+            fresh = []
+            for company_id in ids:
+                if rng.random() < 0.3:
+                    rows.pop(company_id, None)
+                    continue
+                row = CompanyRow(
+                    company_id, f'Co {company_id}', rng.choice(COUNTRIES),
+                    rng.choice(INDUSTRIES), 2000, None, (),
+                )
+                rows[company_id] = row
+                fresh.append(row)
+            self.store.apply(ids, fresh)
+            self.assertTrue(self.index.matches(self.store.rows()))
+
+
+class TestIndexSync(TestCase):
+    fixtures = ['test_companies.json']
+
+    def setUp(self):
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+        self.index = dataset.get_index()
+
+    def test_signals_update_buckets(self):
+        tech = list(self.index.ids('industry', 'Tech'))
+        with self.captureOnCommitCallbacks(execute=True):
+            company = Company.objects.create(
+                name='Delta', country='USA', industry='Tech', founded_year=2020,
+            )
+        self.assertEqual(list(self.index.ids('industry', 'Tech')), tech + [company.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            company.industry = 'Retail'
+            company.save()
+        self.assertEqual(list(self.index.ids('industry', 'Tech')), tech)
+        self.assertEqual(list(self.index.ids('industry', 'Retail')), [company.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            company.delete()
+        self.assertNotIn('Retail', self.index.values('industry'))
+        self.assertEqual(dataset.check_store(dataset.get_store())['listeners'], [])
+
+
+class TestInListApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        dataset.reset_store()
+
+    def test_in_list_filter_and_search(self):
+        expected = set(
+            Company.objects.filter(industry__in=['Tech', 'Finance']).values_list('name', flat=True),
+        )
+        for params in [
+            {'filter': 'industry=[Tech, Finance]'},
+            {'search': 'industry=[Tech,Finance]'},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(self.URL, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual({c['name'] for c in response.data}, expected)
+
+    def test_list_needs_equality_operator(self):
+        response = self.client.get(self.URL, {'filter': 'founded_year>[1990,2000]'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('at position 13', response.data['filter'][0])
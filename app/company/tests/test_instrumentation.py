@@ -0,0 +1,55 @@
+import tracemalloc
+
+from company.dataset import reset_store
+from company.instrumentation import metrics, span
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+
+class TestInstrumentation(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+        metrics.reset()
+
+    def test_disabled_by_default(self):
+        response = self.client.get(self.URL, {'filter': 'industry=Tech'})
+        self.assertNotIn('Server-Timing', response)
+        self.assertIs(span('search').__enter__(), None)  # shared no-op context
+        self.assertEqual(metrics.counters, {})
+
+    @override_settings(COMPANY_INSTRUMENTATION_ENABLED=True)
+    def test_server_timing_and_metrics(self):
+        params = {'search': 'industry:tech', 'filter': 'founded_year>1990', 'sort': 'name'}
+        response = self.client.get(self.URL, params)
+        stages = [part.split(';')[0] for part in response['Server-Timing'].split(', ')]
+        self.assertEqual(stages, ['cache', 'load', 'search', 'filter', 'sort', 'serialize'])
+
+        self.client.get(self.URL, params)
+        self.assertEqual(metrics.counters['cache_hits'], 1)
+        self.assertEqual(metrics.counters['cache_misses'], 1)
+        # industry:tech comes from the hash index; only the filter scans its 2 rows.
+        self.assertEqual(metrics.counters['index_lookups'], 1)
+        self.assertEqual(metrics.counters['rows_scanned'], 2)
+
+        body = self.client.get('/api/v1/metrics/').content.decode()
+        self.assertIn('company_cache_hits_total 1', body)
+        self.assertIn('company_stage_duration_ms_count{stage="search"} 1', body)
+
+    @override_settings(
+        COMPANY_INSTRUMENTATION_ENABLED=True,
+        COMPANY_INSTRUMENTATION_TRACEMALLOC=True,
+    )
+    def test_tracemalloc_peaks(self):
+        response = self.client.get(self.URL, {'sort': '-name'})
+        self.assertIn('desc="peak', response['Server-Timing'])
+        self.assertFalse(tracemalloc.is_tracing())  # stopped with the last traced request
+
+        tracemalloc.start()  # started elsewhere: left running
+        self.addCleanup(tracemalloc.stop)
+        self.client.get(self.URL, {'sort': 'name'})
+        self.assertTrue(tracemalloc.is_tracing())
@@ -0,0 +1,205 @@
+import random
+from unittest import mock
+
+from company.benchmarks import regex_parsing
+from company.dataset import reset_store
+from company.utils.common import lexer
+from company.utils.common.fields import try_cast
+from company.utils.common.lexer import QuerySyntaxError, parse_filter, parse_search, tokenize
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+FIELDS = ['name', 'industry', 'country', 'founded_year', 'details__size', 'revenue']
+OPERATORS = ['>=', '<=', ':', '>', '<', '=', '~']
+WORDS = ['Tech', 'Alpha', 'Corp', 'and', 'or', 'x>y', '1999', '2.5', 'Big-Co', 'true']
+ALPHABET = 'ab_1 ="<>:~ANDORandor\t'
+# The lexer's regexes; every character it scans goes through one of them.
+SCANNERS = ('_SPACES', '_WORD', '_FIELD')
+
+
+class CountingPattern:
+    """Wraps a compiled pattern, counting calls and the characters its matches cover."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.steps = 0
+
+    def match(self, text, *bounds):
+        found = self.pattern.match(text, *bounds)
+        self.steps += 1 + found.end() - found.start()
+        return found
+
+
+def render(expr: list) -> str:
+    parts = []
+    for token in expr:
+        if isinstance(token, str):
+            parts.append(token)
+        else:
+            parts.append(f'{token["field"]}{token["op"]}{token["raw"]}')
+    return ' '.join(parts)
+
+
+def random_condition(rng: random.Random, keywords: bool) -> tuple[dict, dict]:
+    words = rng.choices(WORDS, k=rng.randint(1, 3))
+    if keywords:
+        words = [w for w in words if w.upper() not in ('AND', 'OR')] or ['Tech']
+    # Later words must not look like the start of another condition.
+    words = words[:1] + [w for w in words[1:] if w != 'x>y']
+    value = ' '.join(words)
+    raw = f'"{value}"' if rng.random() < 0.3 else value
+    field, op = rng.choice(FIELDS), rng.choice(OPERATORS)
+    expected = {'field': field, 'op': op, 'value': try_cast(value)}
+    return {'field': field, 'op': op, 'raw': raw}, expected
+
+
+class TestLexer(SimpleTestCase):
+    def test_filter_examples(self):
+        self.assertEqual(
+            parse_filter('name=Alpha Corp and founded_year>=2000 OR country:"New Zealand"'),
+            [
+                {'field': 'name', 'op': '=', 'value': 'Alpha Corp'},
+                'AND',
+                {'field': 'founded_year', 'op': '>=', 'value': 2000},
+                'OR',
+                {'field': 'country', 'op': ':', 'value': 'New Zealand'},
+            ],
+        )
+
+    def test_search_splits_conditions_on_field_op(self):
+        self.assertEqual(
+            parse_search('industry:Tech revenue>500000 name~Alko Corp'),
+            [
+                {'field': 'industry', 'op': ':', 'value': 'Tech'},
+                {'field': 'revenue', 'op': '>', 'value': 500000},
+                {'field': 'name', 'op': '~', 'value': 'Alko Corp'},
+            ],
+        )
+
+    def test_blank_input(self):
+        self.assertEqual(parse_filter(''), [])
+        self.assertEqual(parse_filter('   '), [])
+        self.assertEqual(parse_search(None), [])
+
+    def test_error_positions(self):
+        cases = [
+            ('industry', 'expected an operator', 8),
+            ('industry=', 'expected a value', 9),
+            ('name="Alpha', 'unterminated quoted value', 5),
+            ('name="Alpha"Corp', 'expected whitespace after quoted value', 12),
+            ('industry=Tech country=USA', 'expected AND or OR', 14),
+            ('OR industry=Tech', 'expected a condition before OR', 0),
+            ('industry=Tech AND', 'expected a condition after AND', 17),
+            ('industry=Tech AND =x', 'expected a field name', 18),
+        ]
+        for text, message, position in cases:
+            with self.subTest(text=text):
+                with self.assertRaises(QuerySyntaxError) as ctx:
+                    parse_filter(text)
+                self.assertTrue(ctx.exception.message.startswith(message), ctx.exception)
+                self.assertEqual(ctx.exception.position, position)
+                self.assertIn(f'at position {position}', str(ctx.exception))
+
+    def test_matches_regex_pipeline_on_well_formed_filters(self):
+        for text in [
+            'industry=Tech',
+            'name="Alpha Corp"',
+            'industry=Tech AND founded_year>=2000',
+            'industry=Tech OR name="Beta Group"',
+            'details__company_type=Public',
+            'revenue>1000000',
+            'name=Alpha Corp',
+            'industry=Tech AND revenue>1000000 OR details__size=Large AND country=USA',
+        ]:
+            with self.subTest(text=text):
+                self.assertEqual(parse_filter(text), regex_parsing.parse_filter(text))
+
+    def test_round_trip_random_expressions(self):
+        rng = random.Random(35)
+        for _ in range(500):
+            expr, expected = [], []
+            for i in range(rng.randint(1, 5)):
+                if i:
+                    op = rng.choice(['AND', 'OR'])
+                    expr.append(rng.choice([op, op.lower()]))
+                    expected.append(op)
+                raw, cond = random_condition(rng, keywords=True)
+                expr.append(raw)
+                expected.append(cond)
+            text = render(expr)
+            self.assertEqual(parse_filter(text), expected, text)
+
+            conditions = [random_condition(rng, keywords=False) for _ in range(rng.randint(1, 4))]
+            text = render([raw for raw, _ in conditions])
+            self.assertEqual(parse_search(text), [cond for _, cond in conditions], text)
+
+    def test_fuzz_only_raises_syntax_errors(self):
+        rng = random.Random(36)
+        for _ in range(3000):
+            text = ''.join(rng.choices(ALPHABET, k=rng.randint(0, 40)))
+            for parse in (parse_search, parse_filter):
+                try:
+                    result = parse(text)
+                except QuerySyntaxError as exc:
+                    self.assertTrue(0 <= exc.position <= len(text), (text, exc))
+                else:
+                    self.assertIsInstance(result, list)
+
+    def test_tokens_cover_input_in_order(self):
+        rng = random.Random(37)
+        for _ in range(300):
+            text = ''.join(rng.choices(ALPHABET, k=rng.randint(0, 40)))
+            try:
+                tokens = tokenize(text)
+            except QuerySyntaxError:
+                continue
+            positions = [t.position for t in tokens]
+            self.assertEqual(positions, sorted(positions), text)
+
+    def test_parse_work_is_linear(self):
+        def steps(text: str) -> int:
+            patterns = {name: CountingPattern(getattr(lexer, name)) for name in SCANNERS}
+            with mock.patch.multiple(lexer, **patterns):
+                for parse in (parse_search, parse_filter):
+                    try:
+                        parse(text)
+                    except QuerySyntaxError:
+                        pass
+            return sum(pattern.steps for pattern in patterns.values())
+
+        for build in (
+            lambda n: 'a' * n,
+            lambda n: 'name=' + 'w ' * n,
+            lambda n: 'a=' + 'b=' * n,
+            lambda n: ' AND '.join(['industry=Tech'] * n),
+        ):
+            small, large = steps(build(2000)), steps(build(32000))
+            # 16x the input; quadratic behaviour would be ~256x the characters scanned.
+            self.assertLess(large, small * 17)
+
+
+class TestSyntaxErrorsApi(APITestCase):
+    fixtures = ['test_companies.json']
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_bad_filter_returns_400_with_position(self):
+        response = self.client.get('/api/v1/companies/', {'filter': 'industry=Tech country=USA'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['filter'], ['expected AND or OR at position 14'])
+
+        response = self.client.get('/api/v1/companies/async/', {'search': 'industry'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('at position 8', response.json()['search'][0])
+
+    def test_bad_batch_spec_returns_400(self):
+        response = self.client.post(
+            '/api/v1/companies/batch/',
+            {'queries': [{'filter': 'industry=Tech'}, {'filter': 'industry=Tech AND'}]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('at position 17', str(response.data))
@@ -0,0 +1,96 @@
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from company import dataset, prewarm, query_log
+from company.utils.common.fields import get_cache_key
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+
+class TestPrewarm(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(
+            COMPANY_QUERY_LOG_PATH=str(Path(tmp.name) / 'queries.json'),
+            COMPANY_QUERY_LOG_FLUSH_INTERVAL=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        started = mock.patch.object(prewarm, '_started_pid', os.getpid())  # no startup prewarm
+        started.start()
+        self.addCleanup(started.stop)
+        cache.clear()
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+
+    def test_records_normalized_frequencies(self):
+        for params in [
+            {'filter': 'industry=Tech', 'sort': 'name'},
+            {'sort': 'name', 'filter': 'industry=Tech', 'count': '1'},
+            {'search': 'country:Ger', 'explain': '1'},
+            {'search': 'country:Ger', 'filter': ''},
+            {'filter': 'industry=Tech', 'sort': 'name'},
+        ]:
+            self.client.get(self.URL, params)
+        self.assertEqual(
+            query_log.top_queries(5),
+            [({'filter': 'industry=Tech', 'sort': 'name'}, 3), ({'search': 'country:Ger'}, 2)],
+        )
+
+    def test_replays_top_queries_into_cache(self):
+        for _ in range(2):
+            self.client.get(self.URL, {'filter': 'founded_year>1990', 'sort': '-name'})
+        self.client.get(self.URL, {'filter': 'industry=Tech'})
+        self.client.get(self.URL, {'filter': 'industry='})
+        cache.clear()
+
+        report = prewarm.prewarm(top_n=2, budget_s=60, concurrency=1)
+        self.assertEqual(len(report.warmed), 2)
+        key = get_cache_key(self.URL, {'filter': 'founded_year>1990', 'sort': '-name'})
+        self.assertIsNotNone(cache.get(key))
+        # Replays are not counted as traffic.
+        self.assertEqual(query_log.top_queries(1)[0][1], 2)
+
+        report = prewarm.prewarm(top_n=3, budget_s=0, concurrency=1)
+        self.assertEqual((len(report.warmed), len(report.skipped)), (0, 3))
+
+    def test_command_reports_failures(self):
+        self.client.get(self.URL, {'filter': 'industry='})
+        out = StringIO()
+        call_command('prewarm_cache', top=5, concurrency=1, stdout=out)
+        self.assertIn('Warmed 0 queries', out.getvalue())
+        self.assertIn('1 failed', out.getvalue())
+
+    def test_ready_endpoint(self):
+        url = reverse('ready')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with override_settings(COMPANY_PREWARM_ON_STARTUP=True):
+            prewarm._ready.clear()
+            self.addCleanup(prewarm._ready.set)
+            response = self.client.get(url)
+            self.assertEqual((response.status_code, response.json()), (503, {'ready': False}))
+            prewarm._ready.set()
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_starts_on_first_request_of_each_process(self):
+        prewarm._started_pid = None
+        with mock.patch.object(prewarm, 'start') as start:
+            self.client.get(reverse('ready'))
+            start.assert_not_called()
+            with override_settings(COMPANY_PREWARM_ON_STARTUP=True):
+                self.client.get(reverse('ready'))
+                self.client.get(self.URL)
+                self.assertEqual(start.call_count, 1)
+                prewarm._started_pid = -1  # as if forked from a process that had started it
+                self.client.get(self.URL)
+                self.assertEqual(start.call_count, 2)
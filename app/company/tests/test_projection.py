@@ -0,0 +1,69 @@
+import json
+
+from company.dataset import reset_store
+from company.projection import LoadPlan, parse_fields, plan_loading
+from company.query import CompanyQuery
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+
+class TestLoadPlan(SimpleTestCase):
+    def test_parse_fields(self):
+        self.assertIsNone(parse_fields(None))
+        self.assertIsNone(parse_fields(' '))
+        self.assertEqual(parse_fields('financials, name'), ('name', 'financials'))
+        with self.assertRaisesMessage(ValueError, 'Unknown fields: id'):
+            parse_fields('name,id')
+        with self.assertRaisesMessage(ValueError, 'Name at least one field'):
+            parse_fields(' , ')
+
+    def test_company_columns_only(self):
+        query = CompanyQuery(search='country:Ger', filter='founded_year>2000', sort='-name')
+        self.assertEqual(
+            plan_loading(query, ('name',)),
+            LoadPlan(('id', 'name', 'country', 'founded_year'), details=False, financials=False),
+        )
+
+    def test_relations_from_query_and_projection(self):
+        self.assertEqual(plan_loading(CompanyQuery(sort='-revenue'), ('name',)).financials, True)
+        self.assertEqual(plan_loading(CompanyQuery(sort='-revenue'), ('name',)).details, False)
+        plan = plan_loading(CompanyQuery(filter='details__size=Large OR industry=Tech'))
+        self.assertEqual((plan.details, plan.financials), (True, True))  # no projection
+        plan = plan_loading(CompanyQuery(filter='size=Large'), ('details',))
+        self.assertEqual((plan.details, plan.financials), (True, False))
+        # Unknown fields are looked up across every relation.
+        plan = plan_loading(CompanyQuery(search='employees:5'), ('name',))
+        self.assertEqual((plan.details, plan.financials), (True, True))
+
+
+class TestProjectionApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_fields(self):
+        params = {'filter': 'industry=Tech', 'sort': 'name'}
+        full = self.client.get(self.URL, params).data
+        response = self.client.get(self.URL, dict(params, fields='name,financials'))
+        self.assertEqual(
+            response.data, [{'name': c['name'], 'financials': c['financials']} for c in full],
+        )
+        response = self.client.get(self.URL, dict(params, fields='name', format='columnar'))
+        self.assertEqual(set(json.loads(response.content)['columns']), {'name'})
+
+    def test_invalid_fields(self):
+        for fields in ('name,ceo', ','):
+            response = self.client.get(self.URL, {'fields': fields})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('fields', response.data)
+
+    def test_explain_reports_load_plan(self):
+        response = self.client.get(self.URL, {'sort': 'revenue', 'fields': 'name', 'explain': '1'})
+        self.assertEqual(
+            response.data['load_plan'],
+            {'columns': ['id', 'name'], 'details': False, 'financials': True},
+        )
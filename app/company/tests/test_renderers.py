@@ -0,0 +1,77 @@
+import json
+
+import msgpack
+from company.dataset import reset_store
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+COLUMNAR = 'application/vnd.company.columnar+json'
+
+
+def from_columns(data: dict) -> list[dict]:
+    """The nested ``CompanySerializer`` layout rebuilt from the columnar one."""
+    columns = data['columns']
+    details, financials = columns.pop('details'), columns.pop('financials')
+    offsets = financials.pop('offsets')
+    rows = []
+    for i in range(data['length']):
+        row = {name: values[i] for name, values in columns.items()}
+        row['details'] = {name: values[i] for name, values in details.items()}
+        if row['details']['company_type'] is None:
+            row['details'] = None
+        row['financials'] = [
+            {name: values[j] for name, values in financials.items()}
+            for j in range(offsets[i], offsets[i + 1])
+        ]
+        rows.append(row)
+    return rows
+
+
+class TestColumnarOutput(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        reset_store()
+
+    def test_columnar_matches_nested_json(self):
+        params = {'filter': 'founded_year>1990', 'sort': 'name'}
+        expected = json.loads(self.client.get(self.URL, params).content)
+        self.assertTrue(any(row['financials'] for row in expected))
+
+        response = self.client.get(self.URL, params, HTTP_ACCEPT=COLUMNAR)
+        self.assertEqual(response['Content-Type'], COLUMNAR)
+        self.assertEqual(response['X-Cache'], 'MISS')  # not the cached nested JSON
+        self.assertEqual(from_columns(json.loads(response.content)), expected)
+
+        response = self.client.get(self.URL, dict(params, format='columnar'))
+        self.assertEqual(from_columns(json.loads(response.content)), expected)
+        response = self.client.get(self.URL, params, HTTP_ACCEPT=COLUMNAR)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_count_after_columnar_response(self):
+        params = {'filter': 'industry=Tech', 'format': 'columnar'}
+        self.assertEqual(json.loads(self.client.get(self.URL, params).content)['length'], 2)
+        response = self.client.get(self.URL, dict(params, count='1'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {'count': 2})
+
+    def test_paginated_columnar(self):
+        response = self.client.get(self.URL, {'sort': 'name', 'page_size': 2, 'format': 'columnar'})
+        data = json.loads(response.content)
+        self.assertEqual(data['results']['length'], 2)
+        self.assertEqual(len(data['results']['columns']['name']), 2)
+        self.assertIn('next', data)
+
+    def test_errors_use_negotiated_format(self):
+        response = self.client.get(self.URL, {'filter': 'name=', 'format': 'columnar'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filter', json.loads(response.content))
+
+    def test_msgpack(self):
+        params = {'sort': '-founded_year'}
+        expected = json.loads(self.client.get(self.URL, params).content)
+        response = self.client.get(self.URL, params, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(from_columns(msgpack.unpackb(response.content)), expected)
@@ -0,0 +1,82 @@
+from company import dataset
+from company.benchmarks.generator import generate_rows
+from company.models import Company
+from company.query import CompanyQuery
+from company.result_cache import ResultCache
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+
+class TestResultCache(SimpleTestCase):
+    def test_lru_eviction_by_total_ids(self):
+        rows = generate_rows(10, financials_per_company=0)
+        results = ResultCache(max_ids=10)
+        results.put(0, 'a', rows[:4])
+        results.put(0, 'b', rows[:4])
+        self.assertEqual(list(results.get(0, 'a')), [1, 2, 3, 4])  # 'a' is now most recent
+        results.put(0, 'c', rows[:4])
+        self.assertIsNone(results.get(0, 'b'))
+        self.assertIsNotNone(results.get(0, 'a'))
+        results.put(0, 'huge', rows + rows)  # larger than the whole cache: not stored
+        self.assertIsNone(results.get(0, 'huge'))
+        self.assertIsNone(results.get(1, 'a'))  # other generation
+
+    def test_match_key_normalizes_spelling(self):
+        def key(**params):
+            return CompanyQuery(**params).match_key()
+
+        self.assertEqual(
+            key(filter='industry=Tech   and founded_year>1990', sort='name'),
+            key(filter='industry=Tech AND founded_year>1990'),
+        )
+        self.assertEqual(key(search='a=1 b:x'), key(search='b:x  a=1'))
+        self.assertNotEqual(key(filter='a=1 OR b=2'), key(filter='b=2 OR a=1'))
+        self.assertNotEqual(key(filter='a=1'), key(filter='a="1.0"'))
+        self.assertNotEqual(key(search='a=1'), key(filter='a=1'))
+
+
+class TestResultCacheApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+
+    def stages(self, params):
+        response = self.client.get(self.URL, dict(params, explain='1'))
+        return [stage['stage'] for stage in response.data['stages']]
+
+    def test_other_sort_reuses_matching_ids(self):
+        self.client.get(self.URL, {'filter': 'founded_year>1990', 'sort': 'name'})
+        self.assertEqual(
+            self.stages({'filter': 'founded_year>1990 ', 'sort': '-name'}),
+            ['load', 'result_cache', 'sort'],
+        )
+
+    def test_dataset_change_invalidates(self):
+        params = {'filter': 'founded_year>1990'}
+        before = len(self.client.get(self.URL, params).data)
+        with self.captureOnCommitCallbacks(execute=True):
+            Company.objects.create(name='Zeta', country='UK', industry='Tech', founded_year=2021)
+        self.assertEqual(self.stages(params), ['load', 'filter'])
+        cache.clear()
+        self.assertEqual(len(self.client.get(self.URL, params).data), before + 1)
+
+    def test_pagination(self):
+        everything = self.client.get(self.URL, {'sort': 'name'}).data
+        first = self.client.get(self.URL, {'sort': 'name', 'page_size': 2}).data
+        self.assertEqual(first['count'], len(everything))
+        self.assertEqual(first['results'], everything[:2])
+        self.assertIsNone(first['previous'])
+
+        second = self.client.get(self.URL, {'sort': 'name', 'page_size': 2, 'page': 2}).data
+        self.assertEqual(second['results'], everything[2:4])
+
+        response = self.client.get(self.URL, {'sort': 'name', 'page': 99})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(self.URL, {'page_size': 2, 'page': 2, 'count': 1})
+        self.assertEqual(response.data, {'count': len(everything)})
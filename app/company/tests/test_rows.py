@@ -0,0 +1,61 @@
+from company.models import Company
+from company.rows import CompanyRow, DetailsRow, FinancialRow
+from company.serializers import CompanySerializer
+from company.utils.common.parsing import parse_query
+from company.utils.filtering import apply_filter
+from company.utils.searching import apply_search
+from django.test import TestCase
+
+
+class TestCompanyRows(TestCase):
+    fixtures = ['test_companies.json']
+
+    def setUp(self):
+        self.rows = Company.objects.all_as_rows().to_list()
+        self.companies = list(
+            Company.objects.select_related('details').prefetch_related('financials'),
+        )
+
+    def test_rows_are_slotted_records(self):
+        self.assertTrue(all(isinstance(r, CompanyRow) for r in self.rows))
+        self.assertFalse(hasattr(self.rows[0], '__dict__'))
+        self.assertIsInstance(self.rows[0].details, DetailsRow)
+        self.assertTrue(all(isinstance(f, FinancialRow) for f in self.rows[0].financials))
+
+    def test_rows_match_model_instances(self):
+        self.assertEqual([r.pk for r in self.rows], sorted(c.pk for c in self.companies))
+        for company in self.companies:
+            row = next(r for r in self.rows if r.pk == company.pk)
+            self.assertEqual(row.name, company.name)
+            self.assertEqual(row.details.ceo_name, company.details.ceo_name)
+            self.assertEqual(
+                [(f.year, f.revenue) for f in row.financials],
+                [(f.year, f.revenue) for f in company.financials.all()],
+            )
+
+    def test_serializer_output_matches(self):
+        by_pk = sorted(self.companies, key=lambda c: c.pk)
+        self.assertEqual(
+            CompanySerializer(self.rows, many=True).data,
+            CompanySerializer(by_pk, many=True).data,
+        )
+
+    def test_search_and_filter_on_rows(self):
+        for conds in ('details__size=Large', 'revenue>1000000', 'industry:tech'):
+            self.assertEqual(
+                [r.pk for r in apply_search(self.rows, parse_query(conds))],
+                sorted(c.pk for c in apply_search(self.companies, parse_query(conds))),
+            )
+        filtered = apply_filter(self.rows, 'industry=Tech OR name="Beta Group"')
+        self.assertEqual(
+            [r.pk for r in filtered],
+            sorted(c.pk for c in apply_filter(self.companies, 'industry=Tech OR name="Beta Group"')),
+        )
+
+    def test_sort_on_rows(self):
+        names = [r.name for r in Company.objects.all_as_rows().sort('-revenue,name')]
+        expected = [
+            c.name
+            for c in Company.objects.all_with_related().sort('-revenue,name')
+        ]
+        self.assertEqual(names, expected)
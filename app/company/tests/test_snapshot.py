@@ -0,0 +1,78 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from company import dataset
+from company.models import Company, FinancialData
+from company.serializers import CompanySerializer
+from company.snapshot import CompanyView, Snapshot, write_snapshot
+from company.utils.filtering import apply_filter
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class TestSnapshot(TestCase):
+    fixtures = ['test_companies.json']
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'companies.snap'
+        self.rows = Company.objects.rows()
+        dataset._snapshot = None
+        self.addCleanup(setattr, dataset, '_snapshot', None)
+
+    def test_round_trip(self):
+        write_snapshot(self.path, self.rows, 'v1')
+        snapshot = Snapshot(self.path)
+        self.assertEqual(snapshot.version, 'v1')
+        self.assertEqual(len(snapshot), len(self.rows))
+        self.assertTrue(all(isinstance(v, CompanyView) for v in snapshot.rows()))
+        self.assertEqual(snapshot.rows(), self.rows)
+        self.assertEqual(
+            CompanySerializer(snapshot.rows(), many=True).data,
+            CompanySerializer(self.rows, many=True).data,
+        )
+
+    def test_filter_and_sort_over_views(self):
+        write_snapshot(self.path, self.rows, 'v1')
+        views = Snapshot(self.path).rows()
+        query = 'details__company_type=Public AND revenue>1000000'
+        self.assertEqual(
+            [v.pk for v in apply_filter(views, query)],
+            [r.pk for r in apply_filter(self.rows, query)],
+        )
+
+    def test_build_snapshot_command(self):
+        call_command('build_snapshot', path=str(self.path), stdout=StringIO())
+        snapshot = Snapshot(self.path)
+        self.assertEqual(snapshot.version, Company.objects.dataset_version())
+        self.assertEqual(snapshot.financial_count, FinancialData.objects.count())
+
+    def test_rebuilds_on_version_change(self):
+        with override_settings(
+            COMPANY_SNAPSHOT_PATH=str(self.path),
+            COMPANY_SNAPSHOT_CHECK_INTERVAL=0,
+        ):
+            self.assertEqual(len(dataset.get_snapshot()), Company.objects.count())
+            Company.objects.create(name='Delta', country='USA', industry='Tech', founded_year=2020)
+            names = [c.name for c in dataset.get_snapshot().rows()]
+        self.assertIn('Delta', names)
+
+    def test_store_maps_the_current_snapshot(self):
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+        with override_settings(
+            COMPANY_SNAPSHOT_PATH=str(self.path),
+            COMPANY_SNAPSHOT_CHECK_INTERVAL=0,
+            COMPANY_STORE_REFRESH_INTERVAL=0,
+        ):
+            first = dataset.get_store()
+            self.assertTrue(all(isinstance(row, CompanyView) for row in first.rows()))
+            self.assertIs(dataset.get_store(), first)  # unchanged snapshot: caught up in place
+            Company.objects.create(name='Delta', country='USA', industry='Tech', founded_year=2020)
+            companies = dataset.get_companies()
+        self.assertIsNot(companies.store, first)
+        self.assertIs(companies.store.source, dataset._snapshot)
+        self.assertIn('Delta', [row.name for row in companies])
+        self.assertTrue(all(isinstance(row, CompanyView) for row in companies))
@@ -0,0 +1,99 @@
+import random
+
+from company import dataset
+from company.benchmarks.generator import COUNTRIES, INDUSTRIES, generate_rows
+from company.queryset import SearchQuerySet
+from company.rows import CompanyRow
+from company.sort_index import PermutationWalk, SortIndex
+from company.store import CompanyStore
+from company.utils.sorting import create_sort_key, merge_sort
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+FIELDS = ['name', 'founded_year', 'industry', 'revenue']
+
+
+def make_store(rows: list) -> CompanyStore:
+    store = CompanyStore(rows)
+    store.add_listener('sorts', SortIndex(FIELDS, store))
+    return store
+
+
+class TestSortIndex(SimpleTestCase):
+    def setUp(self):
+        self.rows = generate_rows(300, financials_per_company=2, seed=39)
+        self.store = make_store(self.rows)
+        self.sorts = self.store.listeners['sorts']
+
+    def assertSortsLikeMergeSort(self, rows, sort_fields):
+        expected = merge_sort(rows, key=create_sort_key(sort_fields))
+        self.assertEqual(list(self.sorts.sort(rows, sort_fields)), expected)
+
+    def test_agrees_with_merge_sort(self):
+        rng = random.Random(39)
+        sorts = [
+            ['name'], ['-name'], ['founded_year'], ['-revenue'],
+            ['industry', '-founded_year'], ['-industry', 'name', 'revenue'],
+        ]
+        for sort_fields in sorts:
+            for size in (0, 1, 20, 300):
+                rows = sorted(rng.sample(self.rows, size), key=lambda row: row.id)
+                with self.subTest(sort=sort_fields, size=size):
+                    self.assertSortsLikeMergeSort(rows, sort_fields)
+        self.assertIsNone(self.sorts.sort(self.rows, ['country']))
+        self.assertIsNone(self.sorts.sort(self.rows, ['name', 'country']))
+
+    def test_deltas_keep_permutations_equal_to_rebuild(self):
+        rng = random.Random(40)
+        for _ in range(20):
+            ids = set(rng.sample(sorted(self.store.ids()), 5)) | {max(self.store.ids()) + 1}
+            fresh = [
+                CompanyRow(
+                    company_id, rng.choice(['Acme', 'Beta', f'Co {company_id}']),
+                    rng.choice(COUNTRIES), rng.choice(INDUSTRIES), rng.randint(1950, 2020),
+                    None, (),
+                )
+                for company_id in ids
+                if rng.random() > 0.3
+            ]
+            self.store.apply(ids, fresh)
+            self.assertTrue(self.sorts.matches(self.store.rows()))
+            self.assertSortsLikeMergeSort(self.store.rows(), ['industry', '-name'])
+
+    def test_multi_field_sort_of_rows_newer_than_the_index(self):
+        newer = CompanyRow(max(self.store.ids()) + 1000, 'Newer', 'UK', 'Retail', 2001, None, ())
+        rows = [*self.rows[:20], newer]
+        self.assertSortsLikeMergeSort(rows, ['industry', '-name'])
+
+    def test_walk_stops_once_page_is_full(self):
+        permutation = self.sorts.permutation('name')
+        walk = PermutationWalk(permutation, self.rows)
+        self.assertEqual(len(walk), len(self.rows))
+        page = walk[:10]
+        self.assertEqual([row.id for row in page], list(permutation[:10]))
+        self.assertEqual(walk._position, 10)
+
+    def test_queryset_sort_uses_index(self):
+        companies = SearchQuerySet(self.rows).sort('-founded_year,name', self.sorts)
+        expected = merge_sort(self.rows, key=create_sort_key(['-founded_year', 'name']))
+        self.assertEqual(companies.to_list(), expected)
+
+
+class TestSortIndexApi(APITestCase):
+    fixtures = ['test_companies.json']
+    URL = '/api/v1/companies/'
+
+    def setUp(self):
+        cache.clear()
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+
+    def test_same_order_as_merge_sort(self):
+        rows = dataset.get_store().rows()
+        for sort in ['name', '-revenue', 'industry,-founded_year']:
+            with self.subTest(sort=sort):
+                expected = merge_sort(rows, key=create_sort_key(sort.split(',')))
+                response = self.client.get(self.URL, {'sort': sort, 'page_size': 2})
+                names = [c['name'] for c in response.data['results']]
+                self.assertEqual(names, [row.name for row in expected[:2]])
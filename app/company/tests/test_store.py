@@ -0,0 +1,109 @@
+from datetime import timedelta
+from unittest import mock
+
+from company import dataset
+from company.models import Company, CompanyDetails, FinancialData
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+
+class TestCompanyStore(TestCase):
+    fixtures = ['test_companies.json']
+
+    def setUp(self):
+        dataset.reset_store()
+        self.addCleanup(dataset.reset_store)
+        self.store = dataset.get_store()
+        self.counts = self.store.listeners['value_counts']
+
+    def assertConsistent(self):
+        self.assertEqual(
+            dataset.check_store(self.store),
+            {'missing': [], 'extra': [], 'changed': [], 'listeners': []},
+        )
+
+    def test_signals_apply_insert_update_delete(self):
+        tech = self.counts.count('industry', 'Tech')
+        with self.captureOnCommitCallbacks(execute=True):
+            company = Company.objects.create(
+                name='Delta', country='USA', industry='Tech', founded_year=2020,
+            )
+            FinancialData.objects.create(company=company, year=2024, revenue=10, net_income=1)
+        self.assertEqual(self.store.get(company.id).financials[0].revenue, 10)
+        self.assertEqual(self.counts.count('industry', 'Tech'), tech + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            details = CompanyDetails.objects.get(company_id=1)
+            details.size = 'Tiny'
+            details.save()
+        self.assertEqual(self.store.get(1).details.size, 'Tiny')
+        self.assertEqual(self.counts.count('details__size', 'Tiny'), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            company.delete()
+        self.assertIsNone(self.store.get(company.id))
+        self.assertEqual(self.counts.count('industry', 'Tech'), tech)
+        self.assertConsistent()
+
+    @override_settings(COMPANY_STORE_FULL_RELOAD_FRACTION=1)
+    def test_refresh_catches_writes_that_bypass_signals(self):
+        Company.objects.filter(id=2).update(name='Beta Renamed', updated_at=timezone.now())
+        Company.objects.bulk_create(
+            [Company(name='Epsilon', country='UK', industry='Retail', founded_year=2001)],
+        )
+        self.assertTrue(dataset.check_store(self.store)['changed'])
+
+        delta = dataset.refresh_store(self.store)
+        self.assertEqual([row.name for row in delta.inserted], ['Epsilon'])
+        self.assertEqual([new.name for _, new in delta.updated], ['Beta Renamed'])
+        self.assertEqual(self.counts.count('industry', 'Retail'), 1)
+        self.assertConsistent()
+
+    @override_settings(COMPANY_STORE_FULL_RELOAD_FRACTION=1)
+    def test_refresh_rereads_the_lag_window(self):
+        # Stamped before the last check but committed after it, like an import batch.
+        stamped = self.store.checked_at - timedelta(seconds=1)
+        Company.objects.filter(id=2).update(name='Beta Late', updated_at=stamped)
+        delta = dataset.refresh_store(self.store)
+        self.assertEqual([new.name for _, new in delta.updated], ['Beta Late'])
+        self.assertConsistent()
+
+    def test_refreshes_without_writes_load_no_rows(self):
+        with mock.patch.object(Company.objects, 'rows') as rows:
+            for _ in range(2):
+                self.assertFalse(dataset.refresh_store(self.store))
+        rows.assert_not_called()
+
+    @override_settings(COMPANY_STORE_FULL_RELOAD_FRACTION=0, COMPANY_STORE_REFRESH_INTERVAL=0)
+    def test_store_is_reloaded_when_much_changed(self):
+        Company.objects.update(industry='Retail', updated_at=timezone.now())
+        self.assertIsNone(dataset.refresh_store(self.store))
+        self.assertTrue(dataset.check_store(self.store)['changed'])  # left as it was
+        store = dataset.get_store()
+        self.assertIsNot(store, self.store)
+        self.assertEqual({row.industry for row in store.rows()}, {'Retail'})
+
+    def test_check_endpoint_checks_and_repairs_the_served_store(self):
+        url = reverse('store-check')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        Company.objects.filter(id=2).update(name='Beta Renamed')  # no signal, no stamp
+
+        report = self.client.get(url).json()
+        self.assertEqual((report['consistent'], report['changed']), (False, [2]))
+        self.assertEqual(self.store.get(2).name, 'Beta Group')
+
+        report = self.client.post(url).json()
+        self.assertTrue(report['consistent'])
+        self.assertEqual(self.store.get(2).name, 'Beta Renamed')
+
+    def test_rows_by_id_are_looked_up_in_batches(self):
+        ids = list(Company.objects.values_list('id', flat=True))
+        with mock.patch('company.managers.ROWS_BATCH_SIZE', 2):
+            self.assertEqual(Company.objects.rows(reversed(ids)), Company.objects.rows())
+
+    def test_check_reports_stale_rows(self):
+        FinancialData.objects.filter(company_id=1).delete()  # signals queued but never committed
+        self.assertEqual(dataset.check_store(self.store)['changed'], [1])
@@ -1,6 +1,12 @@
-from .api import CompanyApi
+from .api import CompanyApi, CompanyBatchApi
+from .views import CompanyAsyncView, metrics_view, ready_view, store_check_view
 from django.urls import path
 
 urlpatterns = [
     path('companies/', CompanyApi.as_view(), name='company'),
+    path('companies/batch/', CompanyBatchApi.as_view(), name='company-batch'),
+    path('companies/async/', CompanyAsyncView.as_view(), name='company-async'),
+    path('metrics/', metrics_view, name='metrics'),
+    path('ready/', ready_view, name='ready'),
+    path('store/check/', store_check_view, name='store-check'),
 ]
@@ -3,6 +3,8 @@ from typing import Any
 
 from django.db.models import Model
 
+from ...rows import Row
+
 
 def get_all_related_field_values(obj: Any, field: str) -> list | None:
     """
@@ -11,6 +13,7 @@ def get_all_related_field_values(obj: Any, field: str) -> list | None:
     Returns all matching field values across:
       - Reverse-related (iterable) relationships (like `financials`)
       - Single-object (One-to-One/ForeignKey) related fields (`details`)
+      - The same shapes on `Row` records: tuples of rows and nested rows
     """
     values = []
 
@@ -29,8 +32,14 @@ def get_all_related_field_values(obj: Any, field: str) -> list | None:
             except Exception:
                 continue
 
+        # Reverse-related rows (like CompanyRow.financials)
+        elif isinstance(rel_attr, tuple):
+            for item in rel_attr:
+                if isinstance(item, Row) and hasattr(item, field):
+                    values.append(getattr(item, field))
+
         # Single-related object (One-to-One or ForeignKey)
-        elif isinstance(rel_attr, Model):
+        elif isinstance(rel_attr, (Model, Row)):
             if hasattr(rel_attr, field):
                 values.append(getattr(rel_attr, field))
 
@@ -59,6 +68,9 @@ def get_nested_field_generic(obj: Any, field: str) -> Any:
             if hasattr(current, 'all'):  # Reverse relation manager
                 remaining = '__'.join(parts[i + 1 :])
                 return [get_nested_field_generic(item, remaining) for item in current.all()]
+            if isinstance(current, tuple):  # Reverse relation on a Row record
+                remaining = '__'.join(parts[i + 1 :])
+                return [get_nested_field_generic(item, remaining) for item in current]
         else:
             current = getattr(current, part, None)
 
@@ -83,8 +95,11 @@ def try_cast(val: str) -> Any:
 
 
 def get_cache_key_from_request(request: Any) -> str:
+    return get_cache_key(request.path, request.GET)
+
+
+def get_cache_key(path: str, params: Any) -> str:
     # Include path and query string (sorted for consistency)
-    path = request.path
-    params = '&'.join(f'{k}={v}' for k, v in sorted(request.GET.items()))
+    params = '&'.join(f'{k}={v}' for k, v in sorted(params.items()))
     raw_key = f'{path}?{params}'
     return str(hashlib.md5(raw_key.encode()).hexdigest())
@@ -0,0 +1,207 @@
+"""
+Single-pass lexer and parser for the ``search`` and ``filter`` query strings.
+
+    search:     condition (condition)*                   all must match
+    filter:     condition ((AND | OR) condition)*        folded left to right
+    condition:  field op value
+    field:      word characters, e.g. ``details__size``
+    op:         >=  <=  :  >  <  =  ~
+    value:      "quoted text" | [item, item, ...] | word (word)*
+
+An unquoted value runs over the following words until one starts a new
+condition (``field op ...``) or, in a filter, is ``AND``/``OR`` in any case.
+A list (only after ``=`` or ``:``) matches if any item does; items are split
+on commas and may be quoted.
+Each character is looked at a bounded number of times, so parsing is linear
+in the length of the input whatever it contains. Malformed input raises
+``QuerySyntaxError`` with the position of the problem.
+"""
+
+import re
+from typing import NamedTuple
+
+from .fields import try_cast
+
+OPERATORS = ('>=', '<=', ':', '>', '<', '=', '~')
+KEYWORDS = ('AND', 'OR')
+LIST_OPERATORS = ('=', ':')
+
+_OPERATOR_CHARS = frozenset(op[0] for op in OPERATORS)
+
+# Single-class runs matched at a fixed position: no alternation, no backtracking.
+_SPACES = re.compile(r'\s*')
+_WORD = re.compile(r'\S*')
+_FIELD = re.compile(r'\w*')
+
+
+class QuerySyntaxError(ValueError):
+    def __init__(self, message: str, text: str, position: int):
+        self.message = message
+        self.text = text
+        self.position = position
+        super().__init__(f'{message} at position {position}')
+
+
+class Token(NamedTuple):
+    kind: str  # 'FIELD', 'OP', 'VALUE', 'LIST' or 'BOOL'
+    text: str
+    position: int
+
+
+def _skip_spaces(text: str, pos: int) -> int:
+    return _SPACES.match(text, pos).end()
+
+
+def _word_end(text: str, pos: int) -> int:
+    return _WORD.match(text, pos).end()
+
+
+def _starts_condition(text: str, pos: int, end: int) -> bool:
+    """Whether the word ``text[pos:end]`` begins with ``field op``."""
+    field_end = _FIELD.match(text, pos, end).end()
+    return pos < field_end < end and text[field_end] in _OPERATOR_CHARS
+
+
+def _list(text: str, pos: int, op: str, tokens: list[Token]) -> int:
+    """Reads ``[a, b]`` at ``pos`` into a LIST token; returns the position after it."""
+    if op not in LIST_OPERATORS:
+        raise QuerySyntaxError(f'a list needs {" or ".join(LIST_OPERATORS)}, not {op!r}', text, pos)
+    close = text.find(']', pos + 1)
+    if close == -1:
+        raise QuerySyntaxError('unterminated list', text, pos)
+    item_start = pos + 1
+    for item in text[pos + 1 : close].split(','):
+        if not item.strip():
+            raise QuerySyntaxError('expected a list item', text, item_start)
+        item_start += len(item) + 1
+    tokens.append(Token('LIST', text[pos + 1 : close], pos))
+    pos = close + 1
+    if pos < len(text) and not text[pos].isspace():
+        raise QuerySyntaxError('expected whitespace after list', text, pos)
+    return _skip_spaces(text, pos)
+
+
+def _item(text: str):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = text[1:-1]
+    return try_cast(text)
+
+
+def tokenize(text: str, keywords: bool = True) -> list[Token]:
+    """
+    Splits ``text`` into FIELD, OP, VALUE and (if ``keywords``) BOOL tokens.
+    Only checks the shape of each condition; token order is left to the parser.
+    """
+    tokens = []
+    length = len(text)
+    pos = _skip_spaces(text, 0)
+    while pos < length:
+        end = _word_end(text, pos)
+        if keywords and text[pos:end].upper() in KEYWORDS:
+            tokens.append(Token('BOOL', text[pos:end].upper(), pos))
+            pos = _skip_spaces(text, end)
+            continue
+
+        start = pos
+        pos = _FIELD.match(text, pos, end).end()
+        if pos == start:
+            raise QuerySyntaxError('expected a field name', text, start)
+        tokens.append(Token('FIELD', text[start:pos], start))
+
+        op = text[pos : pos + 2] if text[pos : pos + 2] in OPERATORS else text[pos : pos + 1]
+        if op not in OPERATORS:
+            raise QuerySyntaxError(
+                f'expected an operator ({" ".join(OPERATORS)}) after {text[start:pos]!r}',
+                text,
+                pos,
+            )
+        tokens.append(Token('OP', op, pos))
+        pos += len(op)
+
+        if pos >= length or text[pos].isspace():
+            raise QuerySyntaxError(f'expected a value after {op!r}', text, pos)
+        if text[pos] == '"':
+            close = text.find('"', pos + 1)
+            if close == -1:
+                raise QuerySyntaxError('unterminated quoted value', text, pos)
+            tokens.append(Token('VALUE', text[pos + 1 : close], pos))
+            pos = close + 1
+            if pos < length and not text[pos].isspace():
+                raise QuerySyntaxError('expected whitespace after quoted value', text, pos)
+            pos = _skip_spaces(text, pos)
+            continue
+        if text[pos] == '[':
+            pos = _list(text, pos, op, tokens)
+            continue
+
+        value_start = pos
+        value_end = _word_end(text, pos)
+        pos = _skip_spaces(text, value_end)
+        while pos < length:
+            end = _word_end(text, pos)
+            if keywords and text[pos:end].upper() in KEYWORDS:
+                break
+            if _starts_condition(text, pos, end):
+                break
+            value_end = end
+            pos = _skip_spaces(text, end)
+        tokens.append(Token('VALUE', text[value_start:value_end], value_start))
+    return tokens
+
+
+def _conditions(tokens: list[Token]) -> list:
+    """Turns the token stream into condition dicts and 'AND'/'OR' strings."""
+    expr = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == 'BOOL':
+            expr.append(token.text)
+            i += 1
+            continue
+        field, op, value = tokens[i : i + 3]
+        if value.kind == 'LIST':
+            parsed = tuple(_item(item) for item in value.text.split(','))
+        else:
+            parsed = try_cast(value.text)
+        expr.append({'field': field.text, 'op': op.text, 'value': parsed})
+        i += 3
+    return expr
+
+
+def parse_search(text: str) -> list[dict]:
+    """
+    'industry:Tech revenue>500000' ->
+    [{'field': 'industry', 'op': ':', 'value': 'Tech'}, {'field': 'revenue', ...}]
+    """
+    if not text:
+        return []
+    return _conditions(tokenize(text, keywords=False))
+
+
+def parse_filter(text: str) -> list:
+    """
+    'industry:Tech AND revenue>500000' ->
+    [{'field': 'industry', 'op': ':', 'value': 'Tech'}, 'AND', {'field': 'revenue', ...}]
+
+    Conditions and AND/OR must alternate, starting and ending with a condition.
+    """
+    if not text:
+        return []
+    tokens = tokenize(text)
+    expect_condition = True
+    for token in tokens:
+        if token.kind == 'BOOL':
+            if expect_condition:
+                raise QuerySyntaxError(
+                    f'expected a condition before {token.text}', text, token.position
+                )
+            expect_condition = True
+        elif token.kind == 'FIELD':
+            if not expect_condition:
+                raise QuerySyntaxError('expected AND or OR', text, token.position)
+            expect_condition = False
+    if tokens and expect_condition:
+        raise QuerySyntaxError(f'expected a condition after {tokens[-1].text}', text, len(text))
+    return _conditions(tokens)
@@ -1,13 +1,9 @@
 import difflib
 import operator
-import re
 from typing import Any
 
-from ..common.fields import (
-    get_all_related_field_values,
-    get_nested_field_generic,
-    try_cast,
-)
+from ..common.fields import get_all_related_field_values, get_nested_field_generic
+from .lexer import parse_search
 
 OPS = {
     '>': operator.gt,
@@ -19,7 +15,6 @@ OPS = {
     'AND': operator.and_,
     'OR': operator.or_,
 }
-FILTER_PATTERN = re.compile(r'(?P<field>\w+)(?P<op>>=|<=|:|>|<|=|~)(?P<value>.+)')
 
 
 def match(obj: Any, cond: dict) -> bool:
@@ -47,6 +42,10 @@ def _compare(attr: Any, op: str, val: Any) -> bool:
     if attr is None:
         return False
 
+    # IN list: industry=[Tech,Finance]
+    if isinstance(val, tuple):
+        return any(_compare(attr, op, v) for v in val)
+
     # Fuzzy string contains
     if op == '~' and isinstance(attr, str) and isinstance(val, str):
         # Check if value is "close" to any substring in attr
@@ -67,24 +66,11 @@ def _compare(attr: Any, op: str, val: Any) -> bool:
 
 def parse_query(raw_query: str) -> list[dict]:
     """
-    Parses a filter string like:
+    Parses a search string like:
         "industry:Tech revenue>500000 founded_year<=2015"
     Into:
         [{'field': 'industry', 'op': ':', 'value': 'Tech'}, ...]
+
+    Raises ``QuerySyntaxError`` for malformed input.
     """
-    if not raw_query:
-        return []
-
-    conditions = []
-    # Find all matches (handles quoted strings as one value)
-    for match in FILTER_PATTERN.finditer(raw_query):
-        field = match.group('field')
-        op = match.group('op')
-        value = match.group('value').strip()
-        # Remove quotes if present
-        if value.startswith('"') and value.endswith('"'):
-            value = value[1:-1]
-        value = try_cast(value)
-        conditions.append({'field': field, 'op': op, 'value': value})
-
-    return conditions
+    return parse_search(raw_query)
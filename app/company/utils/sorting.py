@@ -1,8 +1,14 @@
 from collections.abc import Callable
 from typing import Any
 
+from ..deadline import check_deadline
 from .common.fields import get_all_related_field_values, get_nested_field_generic
 
+# Sublists at least this long check the request deadline before being sorted,
+# and merges check it every MERGE_CHECK_INTERVAL + 1 merged elements.
+DEADLINE_CHECK_SIZE = 256
+MERGE_CHECK_INTERVAL = 4095
+
 
 def merge_sort(
     lst: list[Any],
@@ -25,6 +31,8 @@ def merge_sort(
     """
     if len(lst) <= 1:
         return lst
+    if len(lst) >= DEADLINE_CHECK_SIZE:
+        check_deadline('sort')
 
     mid = len(lst) // 2
     left = merge_sort(lst[:mid], key=key, reverse=reverse)
@@ -55,6 +63,8 @@ def _merge(
     i = j = 0
 
     while i < len(left) and j < len(right):
+        if (i + j) & MERGE_CHECK_INTERVAL == MERGE_CHECK_INTERVAL:
+            check_deadline('sort')
         if (key(left[i]) <= key(right[j])) ^ reverse:
             result.append(left[i])
             i += 1
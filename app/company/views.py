@@ -1,3 +1,175 @@
-from django.shortcuts import render
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-# Create your views here.
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from django.views.decorators.http import require_http_methods
+
+from . import prewarm, query_log
+from .admission import REJECT, Decision, admission, client_ident, over_budget_detail
+from .api import QueryTimedOut
+from .dataset import aget_companies, check_store, get_store, repair_store
+from .deadline import QueryTimeout, deadline, request_deadline
+from .instrumentation import increment, metrics, span
+from .projection import parse_fields
+from .query import CompanyQuery, run_query
+from .serializers import CompanySerializer
+from .utils.common.fields import get_cache_key_from_request
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.COMPANY_ASYNC_WORKERS,
+    thread_name_prefix='company-query',
+)
+
+# Cache backends that keep entries in this process (see ``_cache_get``).
+IN_MEMORY_CACHES = (LocMemCache, DummyCache)
+
+
+def _execute(
+    companies,
+    query: CompanyQuery,
+    client: str,
+    expires_at: float | None,
+    allow_partial: bool,
+    fields: tuple[str, ...] | None = None,
+) -> tuple[Decision, list | None, str | None]:
+    """
+    Admits and runs ``query`` for ``client``: the admission ``Decision``, then
+    the serialized rows (None when rejected, or for a timeout without
+    partials) and the X-Partial-Result note.
+    """
+    with admission(client, query, companies) as decision:
+        if decision.action == REJECT:
+            return decision, None, None
+        partial = None
+        try:
+            with deadline(expires_at):
+                companies = run_query(companies, query)
+        except QueryTimeout as exc:
+            if not allow_partial or exc.partial is None:
+                return decision, None, None
+            increment('partial_results')
+            companies, partial = exc.partial, exc.describe()
+        with span('serialize'):
+            return decision, CompanySerializer(companies, many=True, fields=fields).data, partial
+
+
+async def _cache_get(key: str):
+    # In-memory backends answer in microseconds; their async methods would hop to a thread.
+    if isinstance(caches['default'], IN_MEMORY_CACHES):
+        return cache.get(key)
+    return await cache.aget(key)
+
+
+async def _cache_set(key: str, data, timeout: int) -> None:
+    if isinstance(caches['default'], IN_MEMORY_CACHES):
+        cache.set(key, data, timeout=timeout)
+    else:
+        await cache.aset(key, data, timeout=timeout)
+
+
+class CompanyAsyncView(View):
+    """
+    GET /api/v1/companies/async/?sort=industry,-founded_year
+
+    Async-native variant of ``CompanyApi`` for ASGI deployments: cache hits and
+    an already loaded dataset are served on the event loop, and the CPU-bound
+    admission estimate and search/filter/sort/serialize stages run on a small
+    executor so slow clients do not pin a worker thread each.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        query_log.record(request.GET)
+        cache_key = get_cache_key_from_request(request)
+        with span('cache'):
+            cache_data = await _cache_get(cache_key)
+        if cache_data:
+            increment('cache_hits')
+            return JsonResponse(cache_data, safe=False, headers={'X-Cache': 'HIT'})
+        increment('cache_misses')
+
+        query = CompanyQuery.from_params(request.GET)
+        errors = query.syntax_errors()
+        try:
+            expires_at = request_deadline(request.GET)
+        except ValueError as exc:
+            errors['timeout_ms'] = str(exc)
+        try:
+            fields = parse_fields(request.GET.get('fields'))
+        except ValueError as exc:
+            errors['fields'] = str(exc)
+        if errors:
+            return JsonResponse({k: [v] for k, v in errors.items()}, status=400)
+        with span('load'):
+            companies = await aget_companies()
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the current context so stage timings reach this request's trace.
+        execute = functools.partial(
+            contextvars.copy_context().run,
+            _execute,
+            companies,
+            query,
+            client_ident(request, await request.auser()),
+            expires_at,
+            request.GET.get('allow_partial') in ('1', 'true'),
+            fields,
+        )
+        decision, data, partial = await loop.run_in_executor(_executor, execute)
+        if decision.action == REJECT:
+            return JsonResponse({'detail': over_budget_detail(decision)}, status=429)
+        if data is None:
+            return JsonResponse({'detail': QueryTimedOut.default_detail}, status=503)
+        if partial:
+            return JsonResponse(
+                data, safe=False, headers={'X-Cache': 'MISS', 'X-Partial-Result': partial},
+            )
+
+        await _cache_set(cache_key, data, timeout=600)  # Cache for 10 minutes
+        return JsonResponse(data, safe=False, headers={'X-Cache': 'MISS'})
+
+
+def metrics_view(request):
+    """
+    GET /api/v1/metrics/
+
+    Per-process stage latency histograms and cache/row counters in the
+    Prometheus text format. Empty unless COMPANY_INSTRUMENTATION_ENABLED is set.
+    """
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4')
+
+
+def ready_view(request):
+    """
+    GET /api/v1/ready/
+
+    200 once this worker can serve traffic, 503 while the startup cache
+    prewarm (COMPANY_PREWARM_ON_STARTUP) is still running.
+    """
+    ready = prewarm.is_ready()
+    return JsonResponse({'ready': ready}, status=200 if ready else 503)
+
+
+@require_http_methods(['GET', 'POST'])
+def store_check_view(request):
+    """
+    GET /api/v1/store/check/
+
+    Staff only. Diffs the store this worker serves against the database (see
+    ``dataset.check_store``); POST also repairs what differs and checks again.
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'detail': 'Staff only.'}, status=403)
+    store = get_store()
+    report = check_store(store)
+    if request.method == 'POST' and any(report.values()):
+        repair_store(store, report)
+        report = check_store(store)
+    return JsonResponse(
+        {'consistent': not any(report.values()), 'companies': len(store), **report},
+    )
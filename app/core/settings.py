@@ -50,6 +50,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'company.middleware.ServerTimingMiddleware',
+    'company.middleware.PrewarmMiddleware',
 ]
 
 
@@ -59,6 +61,122 @@ CACHES = {
     },
 }
 
+# Company dataset snapshot: a read-only memory-mapped file shared by all workers.
+# Unset to load companies from the database on every request.
+COMPANY_SNAPSHOT_PATH = os.getenv('COMPANY_SNAPSHOT_PATH')
+# Seconds between dataset version checks; a changed version rebuilds the snapshot.
+COMPANY_SNAPSHOT_CHECK_INTERVAL = 30
+
+# Seconds between catch-up refreshes of the in-process company store from `updated_at`
+# (signals apply same-process writes immediately).
+COMPANY_STORE_REFRESH_INTERVAL = 5
+# Seconds before the previous refresh that each refresh looks back for rows it has not
+# seen, for writes whose transaction committed after it stamped `updated_at` (keep above
+# the longest write transaction, e.g. an `import_companies` batch, and above
+# COMPANY_SNAPSHOT_CHECK_INTERVAL).
+COMPANY_STORE_REFRESH_LAG = 60
+# Above this fraction of changed companies a refresh reloads every row.
+COMPANY_STORE_FULL_RELOAD_FRACTION = 0.2
+# Low-cardinality fields with precomputed value counts.
+COMPANY_CATEGORICAL_FIELDS = ['industry', 'country', 'details__size', 'details__company_type']
+# Fields with hash indexes answering `=` / `:` (and `field=[a,b]`) without a scan.
+COMPANY_INDEXED_FIELDS = COMPANY_CATEGORICAL_FIELDS
+# Matching company ids kept per normalized search/filter (total ids across entries).
+COMPANY_RESULT_CACHE_MAX_IDS = 5_000_000
+# Sort fields with maintained id permutations (both directions; `revenue` is max over financials).
+COMPANY_SORT_FIELDS = ['name', 'founded_year', 'industry', 'revenue']
+# `?page=`/`?page_size=` pagination of the companies endpoint.
+COMPANY_PAGE_SIZE = 50
+COMPANY_MAX_PAGE_SIZE = 1000
+
+# Executor threads for the CPU-bound stages of the async companies endpoint.
+COMPANY_ASYNC_WORKERS = 4
+
+# Maximum number of query specs accepted by the batch companies endpoint.
+COMPANY_BATCH_MAX_QUERIES = 50
+
+# Per-stage timings (Server-Timing header + /api/v1/metrics/); off by default.
+COMPANY_INSTRUMENTATION_ENABLED = os.getenv('COMPANY_INSTRUMENTATION_ENABLED', '') == '1'
+# Also record tracemalloc peak memory per stage (expensive; for diagnosis only).
+COMPANY_INSTRUMENTATION_TRACEMALLOC = False
+
+# Queries slower than this (ms) are written with their plan to the slow-query log.
+# None disables the log.
+COMPANY_SLOW_QUERY_MS = 500
+COMPANY_SLOW_QUERY_LOG = os.getenv('COMPANY_SLOW_QUERY_LOG', BASE_DIR / 'slow_queries.log')
+
+# Normalized query frequencies, merged across workers into this JSON file every
+# COMPANY_QUERY_LOG_FLUSH_INTERVAL seconds (keeping the most frequent entries). Unset to disable.
+COMPANY_QUERY_LOG_PATH = os.getenv('COMPANY_QUERY_LOG_PATH')
+COMPANY_QUERY_LOG_FLUSH_INTERVAL = 60
+COMPANY_QUERY_LOG_MAX_ENTRIES = 10_000
+# Replay the most frequent logged queries from each worker's first request (a readiness
+# probe is enough); /api/v1/ready/ returns 503 until done.
+COMPANY_PREWARM_ON_STARTUP = os.getenv('COMPANY_PREWARM_ON_STARTUP', '') == '1'
+COMPANY_PREWARM_TOP_N = 200
+COMPANY_PREWARM_BUDGET_S = 30
+COMPANY_PREWARM_CONCURRENCY = 4
+
+# Time budget per companies query (ms), checked between chunks and while sorting. Requests may
+# lower it with `timeout_ms`; `allow_partial=1` returns the rows matched so far instead of 503.
+# None disables it.
+COMPANY_QUERY_TIMEOUT_MS = 10_000
+
+# Chunked search/filter: a chunk holds at most this many bytes of rows (estimated from a sample,
+# financials included) and, once a chunk has been timed, takes about COMPANY_CHUNK_TARGET_MS.
+COMPANY_CHUNK_MEMORY_BUDGET_BYTES = 4 * 1024 * 1024
+COMPANY_CHUNK_TARGET_MS = 25
+COMPANY_CHUNK_MIN_SIZE = 64
+COMPANY_CHUNK_MAX_SIZE = 10_000
+# Un-paginated JSON responses whose rows are estimated over this size are serialized and streamed
+# chunk by chunk (and not cached) instead of being built in memory at once.
+COMPANY_RESPONSE_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Admission control: queries whose estimated cost (from the compiled plan) is over this many ms
+# are rejected with 429 ('reject') or served as forced pages that fit the budget ('downgrade';
+# rejected when search/filter/sort alone are over it). None disables the budget.
+COMPANY_QUERY_COST_BUDGET_MS = 5000
+COMPANY_QUERY_OVER_BUDGET = 'downgrade'
+# Per client (user or address): queries and summed estimated cost (ms) in flight.
+COMPANY_CLIENT_MAX_CONCURRENT = 8
+COMPANY_CLIENT_MAX_INFLIGHT_COST_MS = 10000
+# Rejections and downgrades are logged here (set the `company.admission` logger to DEBUG to
+# also log admitted queries).
+COMPANY_ADMISSION_LOG = os.getenv('COMPANY_ADMISSION_LOG', BASE_DIR / 'admission.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': COMPANY_SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+        'admission': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': COMPANY_ADMISSION_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'company.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'company.admission': {
+            'handlers': ['admission'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [